@@ -4,16 +4,33 @@ Programme principal MPVRP-CC
 
 import argparse
 import sys
+import time
 from pathlib import Path
 
 # Ajouter src au path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from parser import parse_instance
-from solver_simple import SimpleSolver
-from solution_writer import write_solution, format_solution_summary
+from solver_simple import SimpleSolver, DEFAULT_K_NEIGHBORS
+from solver_savings import SavingsSolver
+from solver_products import ProductDecompositionSolver
+from decomposition import DecompositionSolver, CLUSTER_METHODS
+from depot_policy import DEPOT_POLICIES
+from anytime import AnytimeSolver, parallel_multi_start_improver
+from alns import ALNSParams, alns_improver
+from elite_pool import ElitePool
+from route_pool import RoutePool, DEFAULT_CAPACITY as DEFAULT_ROUTE_POOL
+from solution_writer import write_solution, write_solution_text, format_solution, format_solution_summary
+from solution_reader import load_warm_start, best_solution
 from validator import validate_solution
 from api_client import MPVRPAPIClient, print_verification_result
+from result_cache import ResultCache, cache_key, DEFAULT_MAX_MB
+from solver_config import DEFAULTS, DEFAULT_CONFIG_PATH, instance_class, load_config, resolve_parameters
+from portfolio import Portfolio, DEFAULT_PORTFOLIO_PATH, extract_features
+import telemetry
+
+
+DEFAULT_RESULT_CACHE = Path("solutions") / "result_cache.db"
 
 
 def solve_instance_file(
@@ -21,41 +38,325 @@ def solve_instance_file(
     output_path: Path = None,
     changeover_weight: float = 0.5,
     verify_api: bool = False,
-    verbose: bool = True
+    verbose: bool = True,
+    time_limit: float = None,
+    trace_path: Path = None,
+    seed: int = None,
+    engine: str = "greedy",
+    iterations: int = None,
+    constructor: str = "greedy",
+    k_neighbors: int = DEFAULT_K_NEIGHBORS,
+    depot_policy: str = "ratio",
+    target_gap: float = None,
+    warm_start=None,
+    elite=None,
+    restarts: int = 1,
+    memory_budget: float = None,
+    workers: int = 1,
+    regions: int = None,
+    cluster: str = "sweep",
+    region_iterations: int = 0,
+    result_cache: ResultCache = None,
+    sla: float = None,
+    portfolio: Portfolio = None,
+    exact_options: dict = None,
+    recombine: float = None,
+    route_pool_size: int = DEFAULT_ROUTE_POOL
 ) -> bool:
-    """Résout une instance"""
+    """
+    Résout une instance (mode anytime si time_limit est fourni)
+    
+    warm_start: True pour repartir de la solution déjà présente dans
+    output_path, ou chemin d'une solution; la meilleure entre elle et la
+    construction initiale sert de point de départ.
+    elite: True pour le pool élite <sortie>.elite.json, ou chemin d'un pool;
+    sa meilleure solution est aussi candidate au départ, les redémarrages
+    ALNS (restarts) y puisent leurs points de départ et il est sauvegardé
+    en fin de résolution.
+    memory_budget: Budget (Mo) de la matrice des distances; au-delà, les
+    distances sont calculées à la volée.
+    workers: Processus pour les redémarrages gloutons (instance partagée),
+    pour les régions de la décomposition et pour les produits
+    (constructor="products")
+    regions: Si fourni, construction par décomposition géographique en
+    autant de régions (découpage cluster, region_iterations ALNS par région)
+    Les phases sont émises dans le flux de télémétrie s'il est actif
+    (telemetry.recording).
+    result_cache: Cache des résultats; une instance de même contenu déjà
+    résolue avec les mêmes paramètres (et le même code) est restituée sans
+    résolution. Ignoré avec warm_start / elite, qui dépendent de fichiers
+    externes, et pour les recherches bornées par le temps (anytime, SLA,
+    modèle exact, recombinaison) sans seed: relancer doit alors chercher
+    à nouveau, pas restituer l'ancien résultat.
+    sla: Budget de latence (secondes, de la lecture à l'export): le
+    portefeuille (portfolio, sinon calibration par défaut) choisit le
+    constructeur et le temps d'ALNS d'après les caractéristiques de
+    l'instance; constructor devient une préférence (None = choix libre),
+    engine et time_limit sont remplacés.
+    exact_options: Paramètres de CPSATSolver pour constructor="exact"
+    (time_limit, workers, max_stops)
+    recombine: Si fourni, les mini-routes de toutes les solutions produites
+    (construction, démarrage à chaud, pool élite, recherche anytime) sont
+    récoltées dans un pool de route_pool_size mini-routes au plus, puis
+    recombinées par partitionnement CP-SAT en recombine secondes au plus
+    (threads: exact_options['workers']).
+    """
+    start = time.perf_counter()
     try:
         # 1. LECTURE
         if verbose:
             print(f"\n{'='*70}")
             print(f"Instance: {instance_path.name}")
             print(f"{'='*70}")
+        
+        if output_path is None:
+            output_path = Path("solutions") / f"Sol_{instance_path.name}"
+        
+        # 0. CACHE DES RÉSULTATS
+        key = None
+        timed_search = (time_limit is not None or engine == "alns" or target_gap is not None
+                        or sla is not None or constructor == "exact" or bool(recombine))
+        reproducible = not timed_search or seed is not None
+        if result_cache is not None and not warm_start and not elite and reproducible:
+            lookup_start = time.perf_counter()
+            solver_name = f"decompose:{cluster}" if regions else constructor
+            key = cache_key(instance_path.read_bytes(), f"{solver_name}+{engine}", {
+                'changeover_weight': changeover_weight,
+                'time_limit': time_limit,
+                'seed': seed,
+                'iterations': iterations,
+                'k_neighbors': k_neighbors,
+                'depot_policy': depot_policy,
+                'target_gap': target_gap,
+                'restarts': restarts,
+                'workers': workers,
+                'regions': regions,
+                'region_iterations': region_iterations,
+                'sla': sla,
+                'exact': exact_options,
+                'recombine': recombine,
+                'route_pool': route_pool_size if recombine else None,
+            })
+            cached = result_cache.get(key)
+            if cached is not None:
+                write_solution_text(cached.solution, output_path)
+                lookup_time = time.perf_counter() - lookup_start
+                telemetry.emit('cache_hit', key=key[:16], duration=round(lookup_time, 6))
+                if verbose:
+                    print(f"\n♻️  Résultat en cache ({1000 * lookup_time:.1f} ms, {cached.hits} utilisation(s))")
+                    print(f"   • Coût: {cached.metrics.get('total_cost', float('nan')):.2f}")
+                    print(f"   📄 {output_path}")
+                if verify_api:
+                    verify_with_api(instance_path, output_path, verbose)
+                return True
+        
+        if verbose:
             print("\n1️⃣  Lecture...", end=" ")
         
-        instance = parse_instance(instance_path)
+        with telemetry.phase("parse", instance=instance_path.name):
+            instance = parse_instance(instance_path)
+        if memory_budget is not None:
+            instance.set_memory_budget(int(memory_budget * 2 ** 20))
         
         if verbose:
             print("✅")
             print(f"   • {instance.nb_stations} stations")
             print(f"   • {instance.nb_products} produits")
             print(f"   • {instance.nb_vehicles} véhicules")
+            if not instance.has_dense_distances():
+                print("   • Distances calculées à la volée (matrice dense hors budget mémoire)")
+        
+        # Portefeuille: stratégie et budget d'après les caractéristiques de l'instance
+        strategy = None
+        if sla is not None:
+            if portfolio is None:
+                portfolio = Portfolio.default()
+            features = extract_features(instance)
+            strategy = portfolio.select(features, sla - (time.perf_counter() - start), preferred=constructor)
+            selected_at = time.perf_counter()
+            constructor = strategy.constructor
+            engine = strategy.engine
+            time_limit = strategy.time_limit
+            telemetry.emit('portfolio', strategy=strategy.name, time_limit=time_limit,
+                           predicted_time=round(strategy.predicted_time, 6),
+                           within_budget=strategy.within_budget, features=features.as_dict())
+            if verbose:
+                print(f"\n🧭 Portefeuille: {strategy.describe()}")
         
         # 2. RÉSOLUTION
         if verbose:
             print(f"\n2️⃣  Résolution...", end=" ")
         
-        solver = SimpleSolver(instance, changeover_weight)
-        solution = solver.solve()
+        if regions:
+            builder = DecompositionSolver(
+                instance,
+                n_regions=regions,
+                method=cluster,
+                workers=workers,
+                changeover_weight=changeover_weight,
+                k_neighbors=k_neighbors,
+                region_iterations=region_iterations,
+                seed=seed
+            )
+        elif constructor == "savings":
+            builder = SavingsSolver(instance)
+        elif constructor == "exact":
+            # Import différé: OR-Tools n'est chargé que pour le modèle exact
+            from solver_cpsat import CPSATSolver
+            builder = CPSATSolver(instance, seed=seed, **(exact_options or {}))
+        elif constructor == "products":
+            # Pas de comparaison au glouton sous SLA: elle doublerait le temps de construction
+            builder = ProductDecompositionSolver(instance, workers=workers, compare=verbose and sla is None)
+        else:
+            builder = SimpleSolver(
+                instance,
+                changeover_weight,
+                k_neighbors=k_neighbors or None,
+                depot_policy=depot_policy
+            )
+        
+        with telemetry.phase("construction", constructor=type(builder).__name__):
+            built = builder.solve()
+        telemetry.emit('incumbent', cost=built.total_cost(), source="construction")
+        stored = None
+        if warm_start:
+            warm_path = output_path if warm_start is True else Path(warm_start)
+            stored = load_warm_start(instance, warm_path)
+        
+        pool = None
+        if elite:
+            elite_path = output_path.with_suffix(".elite.json") if elite is True else Path(elite)
+            try:
+                pool = ElitePool.load(instance, elite_path)
+            except ValueError as e:
+                print(f"\n⚠️  Pool élite ignoré: {e}")
+                pool = ElitePool(instance)
+        
+        initial = best_solution(built, stored, pool.best() if pool else None)
+        if initial is not built:
+            initial.resolution_time = built.resolution_time
+        
+        routes = None
+        if recombine:
+            routes = RoutePool(instance, capacity=route_pool_size)
+            routes.add(built)
+            if stored is not None:
+                routes.add(stored)
+            if pool is not None:
+                routes.add_all(entry.solution for entry in pool)
+        
+        anytime = time_limit is not None or engine == "alns" or target_gap is not None
+        if anytime:
+            # Anytime: l'incumbent est écrit dans output_path à chaque amélioration
+            if trace_path is None:
+                trace_path = output_path.with_suffix(".trace.jsonl")
+            improver = None
+            if engine == "greedy" and workers > 1:
+                improver = parallel_multi_start_improver(workers)
+            if engine == "alns":
+                if iterations is None and time_limit is None:
+                    iterations = ALNSParams.iterations
+                improver = alns_improver(ALNSParams(
+                    iterations=iterations,
+                    seed=seed,
+                    neighbours=k_neighbors or None
+                ), restarts=restarts)
+            if strategy is not None:
+                # Échéance du SLA: temps réel de la construction déduit
+                time_limit = strategy.remaining_search(time.perf_counter() - selected_at)
+            solver = AnytimeSolver(
+                instance,
+                output_path=output_path,
+                time_limit=time_limit,
+                trace_path=trace_path,
+                changeover_weight=changeover_weight,
+                seed=seed,
+                improver=improver,
+                target_gap=target_gap,
+                elite=pool,
+                route_pool=routes
+            )
+            with telemetry.phase("anytime", engine=engine, time_limit=time_limit):
+                solution = solver.solve(initial=initial)
+        else:
+            solution = initial
+        
+        recombiner = None
+        if routes is not None:
+            # Import différé: OR-Tools n'est chargé que pour la recombinaison
+            from recombination import SetPartitioningRecombiner
+            workers_option = {'workers': exact_options['workers']} if exact_options and 'workers' in exact_options else {}
+            recombiner = SetPartitioningRecombiner(instance, routes, time_limit=recombine, seed=seed, **workers_option)
+            searched = solution
+            with telemetry.phase("recombination", columns=len(routes)):
+                solution = recombiner.solve(searched)
+            if solution is not searched:
+                solution.resolution_time = searched.resolution_time + recombiner.stats['elapsed']
+                telemetry.emit('incumbent', cost=solution.total_cost(), source="recombination")
+        
+        if pool is not None:
+            pool.add(built)
+            pool.add(solution)
+            pool.save(elite_path)
         
         if verbose:
             print("✅")
             print(f"   • Coût: {solution.total_cost():.2f}")
+            if regions:
+                stats = builder.stats
+                print(f"   • Décomposition: {stats['regions']} régions ({stats['method']}), "
+                      f"chemin critique {stats['critical_path']:.2f}s / séquentiel {stats['sequential_time']:.2f}s, "
+                      f"{stats['boundary_stations']} stations de frontière")
+            elif constructor == "products":
+                stats = builder.stats
+                print(f"   • Décomposition par produit: {stats['products']} produits, "
+                      f"chemin critique {stats['critical_path']:.2f}s / séquentiel {stats['sequential_time']:.2f}s, "
+                      f"réordonnancement -{stats['resequencing_gain']:.2f}")
+                if 'greedy_cost' in stats:
+                    print(f"   • Glouton monolithique: {stats['greedy_cost']:.2f} en {stats['greedy_time']:.2f}s "
+                          f"(coût x{stats['cost_ratio']:.3f}, accélération x{stats['speedup']:.2f})")
+            elif constructor == "exact":
+                stats = builder.stats
+                scope = ("modèle complet" if stats['complete']
+                         else f"mini-routes ≤ {stats['max_stops']} stations")
+                print(f"   • CP-SAT: {stats['status']}, borne du modèle {stats['bound']:.2f} "
+                      f"(écart {100 * stats['gap']:.1f}%, {scope}), {stats['workers']} workers, "
+                      f"{stats['search_time']:.1f}s")
+                print(f"   • Borne inférieure prouvée: {stats['lower_bound']:.2f} "
+                      f"(écart {100 * stats['proven_gap']:.1f}%), glouton {stats['greedy_cost']:.2f}"
+                      + ("" if stats['source'] == "cpsat" else " (retenu)"))
+            if recombiner is not None:
+                stats = recombiner.stats
+                print(f"   • Recombinaison: {stats['columns']} mini-routes ({routes.stats['solutions']} solutions récoltées), "
+                      f"CP-SAT {stats['status']}, {stats['selected']} retenues, "
+                      f"{stats['incumbent_cost']:.2f} → {stats['cost']:.2f}"
+                      + (" (incumbent conservé)" if stats['source'] != "recombination" else "")
+                      + f", {stats['search_time']:.1f}s")
+            if stored is not None:
+                origin = "solution stockée" if initial is stored else "construction"
+                print(f"   • Démarrage à chaud: {stored.total_cost():.2f} (départ: {origin})")
+            if pool is not None:
+                print(f"   • Pool élite: {len(pool)} solution(s), diversité {pool.diversity():.2f} ({elite_path})")
+            if anytime:
+                print(f"   • Améliorations: {solver.nb_improvements}")
+                print(f"   • Trace: {trace_path}")
+            if anytime and solver.memory_report:
+                report = solver.memory_report
+                print(f"   • Mémoire partagée: {report['shared_segment'] / 2**20:.1f} Mo pour "
+                      f"{report['workers']} workers (sans partage: {report['private_total'] / 2**20:.1f} Mo)")
+            if anytime and solver.engine_stats:
+                stats = solver.engine_stats
+                print(f"   • Itérations: {stats['iterations']} "
+                      f"({stats['iterations_per_second']:.1f} it/s)")
         
         # 3. VALIDATION
         if verbose:
             print("\n3️⃣  Validation locale...", end=" ")
         
+        validation_start = time.perf_counter()
         is_valid, errors = validate_solution(solution)
+        telemetry.emit('validation', kind="local", valid=is_valid, errors=len(errors),
+                       duration=round(time.perf_counter() - validation_start, 6))
         
         if is_valid:
             if verbose:
@@ -67,35 +368,45 @@ def solve_instance_file(
             return False
         
         # 4. EXPORT
-        if output_path is None:
-            output_path = Path("solutions") / f"Sol_{instance_path.name}"
-        
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
         if verbose:
             print(f"\n4️⃣  Export...", end=" ")
         
-        write_solution(solution, output_path)
+        with telemetry.phase("export"):
+            write_solution(solution, output_path)
         
         if verbose:
             print("✅")
             print(f"   📄 {output_path}")
         
+        if sla is not None:
+            elapsed = time.perf_counter() - start
+            telemetry.emit('sla', sla=sla, elapsed=round(elapsed, 6), met=elapsed <= sla)
+            if verbose:
+                status = "✅" if elapsed <= sla else "⚠️  dépassé"
+                print(f"   ⏱️  SLA: {elapsed:.3f}s / {sla:.3f}s {status}")
+        
+        if key is not None:
+            result_cache.put(key, format_solution(solution), {
+                'total_cost': solution.total_cost(),
+                'distance': solution.total_distance(),
+                'transition_cost': solution.total_transition_cost(),
+                'transitions': solution.total_transitions(),
+                'vehicles_used': solution.nb_vehicles_used(),
+                'resolution_time': solution.resolution_time,
+            })
+        
         # 5. VALIDATION API
         if verify_api:
-            if verbose:
-                print("\n5️⃣  Vérification API...")
-            
-            client = MPVRPAPIClient()
-            
-            if not client.health_check():
-                print("   ⚠️  API indisponible")
-            else:
-                result = client.verify_solution(instance_path, output_path)
-                print_verification_result(result)
+            verify_with_api(instance_path, output_path, verbose)
         
         if verbose:
-            print("\n" + format_solution_summary(solution))
+            # Modèle CP-SAT complet: sa borne prouvée vaut pour toute solution de l'instance
+            proven = None
+            if constructor == "exact" and not regions and builder.stats['complete']:
+                proven = builder.stats['lower_bound']
+            print("\n" + format_solution_summary(solution, lower_bound=proven))
         
         return True
     
@@ -106,6 +417,23 @@ def solve_instance_file(
         return False
 
 
+def verify_with_api(instance_path: Path, output_path: Path, verbose: bool = True):
+    """Vérification de la solution écrite par l'API"""
+    if verbose:
+        print("\n5️⃣  Vérification API...")
+    
+    client = MPVRPAPIClient()
+    
+    if not client.health_check():
+        print("   ⚠️  API indisponible")
+    else:
+        api_start = time.perf_counter()
+        result = client.verify_solution(instance_path, output_path)
+        telemetry.emit('validation', kind="api", valid=result.get('feasible', False),
+                       duration=round(time.perf_counter() - api_start, 6))
+        print_verification_result(result)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="MPVRP-CC Solver",
@@ -115,18 +443,106 @@ Exemples:
   python main.py instances/small/MPVRP_S_001.dat
   python main.py instances/small/MPVRP_S_001.dat --verify
   python main.py instances/small/MPVRP_S_001.dat -o ma_solution.dat
+  python main.py instances/large/MPVRP_L_001.dat --time-limit 30
+  python main.py instances/large/MPVRP_L_001.dat --engine alns --time-limit 60
+  python main.py instances/large/MPVRP_L_001.dat --engine alns --time-limit 60 --warm-start
+  python main.py instances/large/MPVRP_L_001.dat --decompose 8 --workers 8
+  python main.py instances/large/MPVRP_L_001.dat --sla 2
+  python main.py instances/small/MPVRP_S_001.dat --constructor exact --exact-time-limit 30
+  python main.py instances/medium/MPVRP_M_001.dat --time-limit 30 --recombine 10
+  python main.py --serve --socket /tmp/mpvrp.sock --workers 2
         """
     )
     
     parser.add_argument('instance', nargs='?', help="Fichier instance (.dat)")
     parser.add_argument('-o', '--output', help="Fichier sortie")
-    parser.add_argument('-w', '--weight', type=float, default=0.5, help="Poids changeover (default: 0.5)")
+    parser.add_argument('-w', '--weight', type=float,
+                        help=f"Poids changeover (default: configuration, sinon {DEFAULTS['changeover_weight']})")
     parser.add_argument('--verify', action='store_true', help="Valider avec API")
     parser.add_argument('-q', '--quiet', action='store_true', help="Mode silencieux")
+    parser.add_argument('-t', '--time-limit', type=float, help="Budget de temps en secondes (mode anytime)")
+    parser.add_argument('--trace', help="Trace JSONL des améliorations (default: <sortie>.trace.jsonl)")
+    parser.add_argument('--seed', type=int, help="Graine aléatoire")
+    parser.add_argument('--engine', choices=['greedy', 'alns'], default='greedy',
+                        help="Phase d'amélioration: redémarrages gloutons ou ALNS (default: greedy)")
+    parser.add_argument('--iterations', type=int, help="Nombre d'itérations ALNS")
+    parser.add_argument('--constructor', choices=['greedy', 'savings', 'products', 'exact'],
+                        help="Construction initiale: plus proche voisin, Clarke-Wright, "
+                             "décomposition par produit ou modèle CP-SAT (petites instances) "
+                             "(default: configuration, sinon greedy)")
+    parser.add_argument('--exact-time-limit', type=float, metavar='S',
+                        help="Temps max. du modèle CP-SAT (--constructor exact, default: 60)")
+    parser.add_argument('--exact-workers', type=int, metavar='N',
+                        help="Threads de recherche CP-SAT (--constructor exact, --recombine; default: 8)")
+    parser.add_argument('--max-stops', type=int, metavar='N',
+                        help="Stations par mini-route dans le modèle CP-SAT (default: 3)")
+    parser.add_argument('--recombine', type=float, metavar='S',
+                        help="Recombinaison des mini-routes récoltées par partitionnement CP-SAT "
+                             "(S secondes au plus) en fin de résolution")
+    parser.add_argument('--route-pool', type=int, default=DEFAULT_ROUTE_POOL, metavar='N',
+                        help=f"Mini-routes conservées pour la recombinaison (default: {DEFAULT_ROUTE_POOL})")
+    parser.add_argument('-k', '--neighbours', type=int,
+                        help="Taille des listes de voisins candidats, 0 = parcours complet "
+                             f"(default: configuration, sinon {DEFAULT_K_NEIGHBORS})")
+    parser.add_argument('--depot-policy', choices=sorted(DEPOT_POLICIES),
+                        help="Choix du dépôt par le glouton (default: configuration, sinon ratio)")
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG_PATH),
+                        help=f"Paramètres réglés par classe d'instances, scripts/tune.py (default: {DEFAULT_CONFIG_PATH})")
+    parser.add_argument('--no-config', action='store_true',
+                        help="Ignorer le fichier de configuration")
+    parser.add_argument('--sla', type=float, metavar='S',
+                        help="Budget de latence: stratégie et temps d'ALNS choisis par le portefeuille "
+                             "(remplace --engine / --time-limit)")
+    parser.add_argument('--portfolio', default=str(DEFAULT_PORTFOLIO_PATH),
+                        help="Calibration du portefeuille, scripts/portfolio.py "
+                             f"(default: {DEFAULT_PORTFOLIO_PATH}, sinon CSV de benchmark)")
+    parser.add_argument('--target-gap', type=float,
+                        help="Arrêt quand l'écart à la borne inférieure est <= cette valeur (ex: 0.05)")
+    parser.add_argument('--warm-start', nargs='?', const=True, metavar='SOLUTION',
+                        help="Repartir de la meilleure solution stockée (default: le fichier de sortie)")
+    parser.add_argument('--elite', nargs='?', const=True, metavar='POOL',
+                        help="Pool élite persistant (default: <sortie>.elite.json)")
+    parser.add_argument('--memory-budget', type=float, metavar='MO',
+                        help="Mémoire max. de la matrice des distances, au-delà calcul à la volée (default: 1024)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processus pour les redémarrages gloutons, instance en mémoire partagée (default: 1)")
+    parser.add_argument('--restarts', type=int, default=1,
+                        help="Nombre d'ALNS successifs, repartant du pool élite (default: 1)")
+    parser.add_argument('--decompose', type=int, metavar='K',
+                        help="Construction par décomposition en K régions résolues en parallèle (--workers)")
+    parser.add_argument('--cluster', choices=CLUSTER_METHODS, default='sweep',
+                        help="Découpage des régions (default: sweep)")
+    parser.add_argument('--region-iterations', type=int, default=0,
+                        help="Itérations ALNS par région après le glouton (default: 0)")
+    parser.add_argument('--telemetry', metavar='JSONL',
+                        help="Flux d'événements de la résolution (voir scripts/telemetry_view.py)")
+    parser.add_argument('--telemetry-interval', type=float, default=telemetry.DEFAULT_INTERVAL,
+                        metavar='S', help="Intervalle d'échantillonnage de la télémétrie "
+                                          f"(default: {telemetry.DEFAULT_INTERVAL}s)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ignorer le cache des résultats (ni lecture ni écriture)")
+    parser.add_argument('--result-cache', metavar='DB', default=str(DEFAULT_RESULT_CACHE),
+                        help=f"Base du cache des résultats (default: {DEFAULT_RESULT_CACHE})")
+    parser.add_argument('--result-cache-mb', type=float, default=DEFAULT_MAX_MB, metavar='MO',
+                        help=f"Taille max. du cache des résultats, éviction LRU (default: {DEFAULT_MAX_MB:.0f})")
+    parser.add_argument('--serve', action='store_true',
+                        help="Lancer le démon de résolution (HTTP local ou socket Unix)")
+    parser.add_argument('--port', type=int, default=8765, help="Port du démon (default: 8765)")
+    parser.add_argument('--socket', metavar='PATH', help="Socket Unix du démon (remplace --port)")
+    parser.add_argument('--cache-size', type=int, default=16,
+                        help="Instances gardées en cache par worker du démon (default: 16)")
     
     args = parser.parse_args()
     
-    if args.instance:
+    if args.serve:
+        from daemon import serve
+        serve(
+            port=args.port,
+            socket_path=args.socket,
+            workers=max(1, args.workers),
+            cache_size=args.cache_size
+        )
+    elif args.instance:
         instance_path = Path(args.instance)
         
         if not instance_path.exists():
@@ -135,13 +551,83 @@ Exemples:
         
         output_path = Path(args.output) if args.output else None
         
-        success = solve_instance_file(
-            instance_path,
-            output_path,
-            args.weight,
-            args.verify,
-            not args.quiet
-        )
+        if args.sla is not None and args.decompose:
+            print("❌ Erreur: --sla et --decompose sont incompatibles")
+            sys.exit(1)
+        if args.sla is not None and args.recombine:
+            # Le temps de recombinaison n'entre pas dans le budget du portefeuille
+            print("❌ Erreur: --sla et --recombine sont incompatibles")
+            sys.exit(1)
+        
+        # Paramètres: ligne de commande > configuration réglée (classe de l'instance) > défauts
+        try:
+            config = {} if args.no_config else load_config(args.config)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Configuration ignorée: {e}")
+            config = {}
+        cls = instance_class(instance_path.name)
+        parameters = resolve_parameters(config, cls, {
+            'changeover_weight': args.weight,
+            'constructor': args.constructor,
+            'depot_policy': args.depot_policy,
+            'k_neighbors': args.neighbours,
+        })
+        if cls in config.get('classes', {}) and not args.quiet:
+            print(f"⚙️  Configuration {args.config} ({cls}): "
+                  + ", ".join(f"{k}={v}" for k, v in parameters.items()))
+        
+        # Avec un SLA, le portefeuille choisit le constructeur s'il n'est ni
+        # demandé ni réglé pour la classe
+        constructor = parameters['constructor']
+        portfolio = None
+        if args.sla is not None:
+            if args.constructor is None and 'constructor' not in config.get('classes', {}).get(cls, {}):
+                constructor = None
+            try:
+                portfolio = Portfolio.default(args.portfolio)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️  Calibration du portefeuille ignorée: {e}")
+                portfolio = Portfolio.from_benchmarks()
+        
+        result_cache = None if args.no_cache else ResultCache(args.result_cache, args.result_cache_mb)
+        
+        with telemetry.recording(args.telemetry, args.telemetry_interval, instance=instance_path.name):
+            success = solve_instance_file(
+                instance_path,
+                output_path,
+                parameters['changeover_weight'],
+                args.verify,
+                not args.quiet,
+                time_limit=args.time_limit,
+                trace_path=Path(args.trace) if args.trace else None,
+                seed=args.seed,
+                engine=args.engine,
+                iterations=args.iterations,
+                constructor=constructor,
+                k_neighbors=parameters['k_neighbors'],
+                depot_policy=parameters['depot_policy'],
+                target_gap=args.target_gap,
+                warm_start=args.warm_start,
+                elite=args.elite,
+                restarts=args.restarts,
+                memory_budget=args.memory_budget,
+                workers=args.workers,
+                regions=args.decompose,
+                cluster=args.cluster,
+                region_iterations=args.region_iterations,
+                result_cache=result_cache,
+                sla=args.sla,
+                portfolio=portfolio,
+                exact_options={k: v for k, v in (
+                    ('time_limit', args.exact_time_limit),
+                    ('workers', args.exact_workers),
+                    ('max_stops', args.max_stops),
+                ) if v is not None},
+                recombine=args.recombine,
+                route_pool_size=args.route_pool
+            )
+        if result_cache is not None:
+            result_cache.close()
         
         sys.exit(0 if success else 1)
     else:
@@ -0,0 +1,96 @@
+"""
+Calibration et inspection du portefeuille d'algorithmes
+
+Usage:
+    python scripts/portfolio.py calibrate solutions/batch_results*.csv --instances instances/
+    python scripts/portfolio.py select instances/large/MPVRP_L_001.dat --sla 2
+
+Pour comparer les constructeurs, lancer d'abord solve_batch.py avec chacun
+(--constructor greedy / savings / products) et calibrer sur tous les CSV.
+"""
+
+import sys
+import glob
+from pathlib import Path
+
+# Ajouter src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from parser import parse_instance
+from portfolio import Portfolio, DEFAULT_PORTFOLIO_PATH, extract_features
+
+
+def calibrate(csv_paths, instance_dirs, output_path: Path):
+    """Ajuste les modèles de temps et les références de qualité, puis les enregistre"""
+    portfolio = Portfolio.calibrate(csv_paths, instance_dirs)
+    if not portfolio.latency:
+        print("❌ Aucune mesure exploitable dans les CSV")
+        sys.exit(1)
+    
+    print(f"\n{'='*70}")
+    print("CALIBRATION DU PORTEFEUILLE")
+    print(f"{'='*70}")
+    print(f"CSV: {len(csv_paths)}")
+    for constructor, model in sorted(portfolio.latency.items()):
+        a, b, c = model.coef
+        print(f"   {constructor:<10} t ≈ e^{a:.2f} · stations^{b:.2f} · produits^{c:.2f} "
+              f"(x{model.margin:.2f} + {1000 * model.slack:.1f} ms, {model.samples} mesures)")
+    compared = [r for r in portfolio.references if len(r['ratios']) > 1]
+    located = [r for r in portfolio.references if r.get('features')]
+    print(f"Instances: {len(portfolio.references)}, {len(compared)} avec plusieurs constructeurs, "
+          f"{len(located)} avec caractéristiques")
+    
+    portfolio.save(output_path)
+    print(f"\n📄 Calibration: {output_path}")
+    print(f"{'='*70}\n")
+
+
+def select(instance_paths, sla: float, portfolio_path: Path, preferred: str = None):
+    """Caractéristiques et stratégie retenue pour chaque instance"""
+    portfolio = Portfolio.default(portfolio_path)
+    for path in instance_paths:
+        instance = parse_instance(path)
+        features = extract_features(instance)
+        strategy = portfolio.select(features, sla, preferred)
+        print(f"\n{Path(path).name}")
+        for name, value in features.as_dict().items():
+            print(f"   {name:<26} {value:.3f}" if isinstance(value, float) else f"   {name:<26} {value}")
+        print(f"   🧭 {strategy.describe()}")
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Portefeuille d'algorithmes")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    p_calibrate = subparsers.add_parser('calibrate', help="Calibrer sur des CSV de solve_batch.py")
+    p_calibrate.add_argument('csv', nargs='+', help="CSV de benchmark (motifs glob acceptés)")
+    p_calibrate.add_argument('--instances', nargs='*', default=[],
+                             help="Dossiers des instances mesurées (choix par caractéristiques)")
+    p_calibrate.add_argument('-o', '--output', default=str(DEFAULT_PORTFOLIO_PATH),
+                             help=f"Fichier de calibration (default: {DEFAULT_PORTFOLIO_PATH})")
+    
+    p_select = subparsers.add_parser('select', help="Stratégie retenue pour des instances")
+    p_select.add_argument('instances', nargs='+', help="Fichiers instance (.dat)")
+    p_select.add_argument('--sla', type=float, required=True, help="Budget de latence (secondes)")
+    p_select.add_argument('--constructor', choices=['greedy', 'savings', 'products'],
+                          help="Constructeur préféré")
+    p_select.add_argument('--portfolio', default=str(DEFAULT_PORTFOLIO_PATH),
+                          help=f"Calibration (default: {DEFAULT_PORTFOLIO_PATH}, sinon CSV de benchmark)")
+    
+    args = parser.parse_args()
+    
+    if args.command == 'calibrate':
+        csv_paths = sorted({p for pattern in args.csv for p in (glob.glob(pattern) or [pattern])})
+        missing = [p for p in csv_paths if not Path(p).exists()]
+        if missing:
+            print(f"❌ CSV introuvable: {', '.join(missing)}")
+            sys.exit(1)
+        calibrate(csv_paths, args.instances, Path(args.output))
+    else:
+        select(args.instances, args.sla, Path(args.portfolio), args.constructor)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Consultation de l'historique des batchs (base SQLite de solve_batch)
+
+Usage:
+    python scripts/results_db.py runs
+    python scripts/results_db.py compare 3 5
+    python scripts/results_db.py history MPVRP_S_001.dat
+"""
+
+import sys
+from pathlib import Path
+
+# Ajouter src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from results_store import ResultsStore
+
+
+DEFAULT_DB = Path("solutions") / "results.db"
+
+
+def print_runs(store: ResultsStore):
+    """Liste des runs enregistrés"""
+    runs = store.runs()
+    if not runs:
+        print("Aucun run enregistré")
+        return
+    
+    print(f"{'Run':>5}  {'Date':<19}  {'Révision':<14}  {'Inst.':>5}  {'Coût moyen':>12}  Paramètres")
+    print("-" * 100)
+    for run in runs:
+        avg_cost = f"{run['avg_cost']:.2f}" if run['avg_cost'] is not None else "-"
+        print(f"{run['run_id']:>5}  {run['started_at']:<19}  {run['git_revision'] or '-':<14}  "
+              f"{run['nb_instances']:>5}  {avg_cost:>12}  {run['parameters']}")
+
+
+def print_comparison(store: ResultsStore, run_a: int, run_b: int):
+    """Accélérations et écarts de coût par instance entre deux runs"""
+    rows = store.compare(run_a, run_b)
+    if not rows:
+        print(f"❌ Aucune instance commune aux runs #{run_a} et #{run_b}")
+        return
+    
+    print(f"\n{'='*96}")
+    print(f"COMPARAISON RUN #{run_a} -> RUN #{run_b}")
+    print(f"{'='*96}")
+    print(f"{'Instance':<28} {'Coût A':>11} {'Coût B':>11} {'Δ coût':>10} {'Δ %':>7} "
+          f"{'Temps A':>8} {'Temps B':>8} {'Accél.':>7}")
+    print("-" * 96)
+    
+    for r in rows:
+        print(f"{r['instance']:<28} {r['cost_a']:>11.2f} {r['cost_b']:>11.2f} "
+              f"{r['cost_delta']:>+10.2f} {r['cost_delta_pct']:>+6.2f}% "
+              f"{r['time_a']:>7.3f}s {r['time_b']:>7.3f}s {r['speedup']:>6.2f}x")
+    
+    # Synthèse
+    n = len(rows)
+    better = sum(1 for r in rows if r['cost_delta'] < -1e-9)
+    worse = sum(1 for r in rows if r['cost_delta'] > 1e-9)
+    total_a = sum(r['cost_a'] for r in rows)
+    total_b = sum(r['cost_b'] for r in rows)
+    time_a = sum(r['time_a'] for r in rows)
+    time_b = sum(r['time_b'] for r in rows)
+    
+    print("-" * 96)
+    print(f"Instances communes: {n}  (meilleures: {better}, moins bonnes: {worse}, "
+          f"identiques: {n - better - worse})")
+    print(f"Coût total: {total_a:.2f} -> {total_b:.2f} "
+          f"({100 * (total_b - total_a) / total_a if total_a else 0.0:+.2f}%)")
+    print(f"Temps total: {time_a:.2f}s -> {time_b:.2f}s "
+          f"(accélération {time_a / time_b if time_b else float('inf'):.2f}x)")
+    print(f"{'='*96}\n")
+
+
+def print_history(store: ResultsStore, instance: str):
+    """Résultats d'une instance sur tous les runs"""
+    rows = store.history(instance)
+    if not rows:
+        print(f"❌ Aucun résultat pour {instance}")
+        return
+    
+    print(f"{'Run':>5}  {'Révision':<14}  {'Coût':>11}  {'Gap':>6}  {'Temps':>8}")
+    print("-" * 54)
+    for r in rows:
+        gap = f"{100 * r['gap']:.1f}%" if r['gap'] is not None else "-"
+        print(f"{r['run_id']:>5}  {r['git_revision'] or '-':<14}  {r['total_cost']:>11.2f}  "
+              f"{gap:>6}  {r['solve_time']:>7.3f}s")
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Historique des batchs")
+    parser.add_argument('--db', default=str(DEFAULT_DB), help="Base SQLite (défaut: solutions/results.db)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    
+    sub.add_parser('runs', help="Lister les runs")
+    
+    compare = sub.add_parser('compare', help="Comparer deux runs")
+    compare.add_argument('run_a', type=int, help="Run de référence")
+    compare.add_argument('run_b', type=int, help="Run comparé")
+    
+    history = sub.add_parser('history', help="Historique d'une instance")
+    history.add_argument('instance', help="Nom du fichier d'instance")
+    
+    args = parser.parse_args()
+    
+    db_path = Path(args.db)
+    if not db_path.exists():
+        print(f"❌ Base introuvable: {db_path}")
+        sys.exit(1)
+    
+    with ResultsStore(db_path) as store:
+        if args.command == 'runs':
+            print_runs(store)
+        elif args.command == 'compare':
+            print_comparison(store, args.run_a, args.run_b)
+        else:
+            print_history(store, args.instance)
+
+
+if __name__ == "__main__":
+    main()
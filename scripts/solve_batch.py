@@ -3,25 +3,147 @@ Résolution en batch de plusieurs instances
 """
 
 import sys
+import os
 from pathlib import Path
 import time
 import csv
+import json
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List
 
 # Ajouter src au path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from parser import parse_instance
 from solver_simple import SimpleSolver
+from solver_savings import SavingsSolver
+from solver_products import ProductDecompositionSolver
+from depot_policy import DEPOT_POLICIES
+from alns import ALNS, ALNSParams
 from solution_writer import write_solution
+from solution_reader import load_warm_start, best_solution
 from validator import validate_solution
+from bounds import compute_lower_bound
 from api_client import MPVRPAPIClient
+from results_store import ResultsStore
+from solver_config import DEFAULT_CONFIG_PATH, instance_class, load_config, resolve_parameters
+from portfolio import Portfolio, DEFAULT_PORTFOLIO_PATH, extract_features
+import telemetry
+
+
+JOURNAL_NAME = "batch_journal.jsonl"
+DB_NAME = "results.db"
+DEFAULT_API_WORKERS = 4
+
+
+def load_journal(journal_path: Path) -> Dict[str, dict]:
+    """
+    Lit le journal des instances terminées.
+    
+    Une ligne tronquée (arrêt brutal pendant l'écriture) est ignorée;
+    pour une même instance, la dernière entrée l'emporte.
+    """
+    entries = {}
+    if not journal_path.exists():
+        return entries
+    
+    with open(journal_path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(entry, dict) and 'instance' in entry:
+                entries[entry['instance']] = entry
+    
+    return entries
+
+
+def append_journal(journal_path: Path, result: dict):
+    """Ajoute un résultat au journal et force l'écriture sur disque"""
+    with open(journal_path, 'a') as f:
+        f.write(json.dumps(result) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def is_completed(entry: dict, solution_path: Path) -> bool:
+    """Instance déjà résolue: entrée valide au journal et fichier solution présent"""
+    return (
+        entry is not None
+        and entry.get('valid_local') is True
+        and solution_path.exists()
+        and solution_path.stat().st_size > 0
+    )
+
+
+def apply_api_result(result: dict, api_result: dict, prefix: str = ""):
+    """Reporte la réponse de l'API dans le résultat (colonne valid_api)"""
+    result['valid_api'] = api_result.get('feasible', False)
+    
+    if result['valid_api']:
+        print(f"{prefix}✅")
+    else:
+        print(f"{prefix}❌")
+        errors = api_result.get('errors', [])
+        for error in errors[:2]:
+            print(f"      - {error}")
+
+
+@contextmanager
+def timed(timings: Dict[str, float], name: str):
+    """Durée murale (perf_counter) d'une étape, cumulée dans timings[name]"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+
+def verify_api_timed(client: MPVRPAPIClient, instance_path: Path, solution_path: Path) -> dict:
+    """Vérification API, durée émise dans la télémétrie"""
+    start = time.perf_counter()
+    api_result = client.verify_solution(instance_path, solution_path)
+    telemetry.emit('validation', kind="api", instance=instance_path.name,
+                   valid=api_result.get('feasible', False),
+                   duration=round(time.perf_counter() - start, 6))
+    return api_result
+
+
+def write_results_csv(csv_path: Path, results: List[dict]):
+    """Écrit le CSV (colonnes = union des clés, dans l'ordre d'apparition)"""
+    fieldnames = []
+    for r in results:
+        for key in r:
+            if key not in fieldnames:
+                fieldnames.append(key)
+    
+    tmp_path = csv_path.with_name(f".{csv_path.name}.tmp")
+    with open(tmp_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, restval='')
+        writer.writeheader()
+        writer.writerows(results)
+    os.replace(tmp_path, csv_path)
 
 
 def solve_batch(
     instance_dir: Path,
     output_dir: Path = None,
     verify_api: bool = False,
-    changeover_weight: float = 0.5
+    changeover_weight: float = None,
+    constructor: str = None,
+    depot_policy: str = None,
+    resume: bool = False,
+    db_path: Path = None,
+    api_workers: int = DEFAULT_API_WORKERS,
+    warm_start: bool = False,
+    config: dict = None,
+    sla: float = None,
+    portfolio: Portfolio = None
 ):
     """
     Résout toutes les instances d'un dossier
@@ -31,9 +153,40 @@ def solve_batch(
         output_dir: Dossier de sortie pour les solutions
         verify_api: Vérifier avec l'API
         changeover_weight: Poids du coût de changeover
+        constructor: Construction initiale ("greedy", "savings" ou "products")
+        depot_policy: Politique de choix du dépôt du glouton
+            (None pour ces trois paramètres: valeur de la configuration
+            réglée pour la classe de l'instance, sinon valeur par défaut)
+        resume: Reprendre un batch interrompu (instances déjà au journal sautées)
+        db_path: Base SQLite de l'historique (défaut: <output_dir>/results.db)
+        api_workers: Vérifications API simultanées pendant la résolution
+            (0 = vérification bloquante après chaque instance)
+        warm_start: Garder la solution déjà présente dans output_dir si elle
+            est meilleure que la nouvelle construction
+        config: Configuration réglée par classe d'instances (scripts/tune.py)
+        sla: Budget de latence par instance (secondes, de la lecture à
+            l'écriture): le portefeuille choisit le constructeur (sauf s'il
+            est imposé ou réglé) et le temps d'ALNS après la construction
+        portfolio: Calibration du portefeuille (défaut: Portfolio.default())
+    
+    Chaque résultat est ajouté au journal (batch_journal.jsonl) dès la fin
+    de l'instance; le CSV final est reconstruit à partir du journal.
+    Chaque résultat porte aussi les temps murals par étape (lecture,
+    résolution, validation, écriture), le temps CPU et le pic de mémoire
+    résidente de l'instance.
+    Le run (paramètres, révision git) et ses résultats sont aussi enregistrés
+    dans la base SQLite, pour comparer les runs entre eux (scripts/results_db.py).
     """
     if output_dir is None:
         output_dir = Path("solutions")
+    config = config or {}
+    if sla is not None and portfolio is None:
+        portfolio = Portfolio.default()
+    overrides = {
+        'changeover_weight': changeover_weight,
+        'constructor': constructor,
+        'depot_policy': depot_policy,
+    }
     
     output_dir.mkdir(parents=True, exist_ok=True)
     
@@ -49,10 +202,40 @@ def solve_batch(
     print(f"{'='*70}")
     print(f"Instances trouvées: {len(instances)}")
     print(f"Dossier sortie: {output_dir}")
+    
+    # Journal: repris avec --resume, sinon recommencé
+    journal_path = output_dir / JOURNAL_NAME
+    if resume:
+        journal = load_journal(journal_path)
+        print(f"Reprise: {len(journal)} instance(s) au journal")
+    else:
+        journal = {}
+        journal_path.unlink(missing_ok=True)
+    
+    # Historique SQLite: un run par exécution
+    store = ResultsStore(db_path or output_dir / DB_NAME)
+    run_id = store.start_run(
+        {
+            'changeover_weight': changeover_weight,
+            'constructor': constructor,
+            'depot_policy': depot_policy,
+            'verify_api': verify_api,
+            'resume': resume,
+            'warm_start': warm_start,
+            'tuned_classes': config.get('classes'),
+            'sla': sla,
+        },
+        instance_dir=instance_dir
+    )
+    print(f"Run: #{run_id} ({store.db_path})")
+    if config.get('classes'):
+        print(f"Configuration réglée: {', '.join(config['classes'])}")
+    if sla is not None:
+        print(f"SLA: {sla:.2f}s par instance (portefeuille: {', '.join(sorted(portfolio.latency)) or 'non calibré'})")
+    
     print(f"{'='*70}\n")
     
-    # Résultats
-    results = []
+    skipped = 0
     
     # Client API
     client = None
@@ -62,23 +245,102 @@ def solve_batch(
             print("⚠️  API indisponible, vérification désactivée\n")
             verify_api = False
     
+    # Vérification en tâche de fond: la résolution continue pendant les
+    # appels API, avec au plus api_workers requêtes en vol
+    executor = None
+    pending = {}
+    if verify_api and api_workers > 0:
+        executor = ThreadPoolExecutor(max_workers=api_workers)
+    
+    def collect(futures):
+        """Intègre les vérifications terminées au journal et à l'historique"""
+        for future in futures:
+            result = pending.pop(future)
+            try:
+                api_result = future.result()
+            except Exception as e:
+                api_result = {'feasible': False, 'errors': [f"Erreur inattendue: {e}"]}
+            apply_api_result(result, api_result, prefix=f"   🌐 API {result['instance']}: ")
+            append_journal(journal_path, result)
+            store.record(run_id, result)
+    
     # Résoudre chaque instance
     for i, instance_path in enumerate(instances, 1):
         print(f"\n[{i}/{len(instances)}] {instance_path.name}")
+        telemetry.emit('instance', instance=instance_path.name, index=i, total=len(instances))
         print("-" * 70)
         
+        solution_path = output_dir / f"Sol_{instance_path.name}"
+        if resume and is_completed(journal.get(instance_path.name), solution_path):
+            print("⏭️  Déjà résolue (journal)")
+            # Reprise dans l'historique: le run complet reste comparable aux autres
+            store.record(run_id, journal[instance_path.name])
+            skipped += 1
+            continue
+        
         try:
+            # Mesures de l'instance: temps mural et CPU, pic de mémoire résidente
+            timings = {}
+            peak_reset = telemetry.reset_peak_memory()
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            
             # Parsing
-            instance = parse_instance(instance_path)
+            with timed(timings, 'parse'), telemetry.phase("parse", instance=instance_path.name):
+                instance = parse_instance(instance_path)
             
             # Résolution
-            start = time.time()
-            solver = SimpleSolver(instance, changeover_weight)
-            solution = solver.solve()
-            solve_time = time.time() - start
+            cls = instance_class(instance_path.name, instance.nb_stations)
+            parameters = resolve_parameters(config, cls, overrides)
+            strategy = None
+            if sla is not None:
+                preferred = constructor or config.get('classes', {}).get(cls, {}).get('constructor')
+                strategy = portfolio.select(extract_features(instance),
+                                            sla - (time.perf_counter() - wall_start), preferred)
+                selected_at = time.perf_counter()
+                parameters['constructor'] = strategy.constructor
+                telemetry.emit('portfolio', instance=instance_path.name, strategy=strategy.name,
+                               time_limit=strategy.time_limit, within_budget=strategy.within_budget)
+                print(f"🧭 {strategy.describe()}")
+            solve_cpu_start = time.process_time()
+            with timed(timings, 'solve'):
+                with timed(timings, 'construct'):
+                    if parameters['constructor'] == "savings":
+                        solver = SavingsSolver(instance)
+                    elif parameters['constructor'] == "products":
+                        solver = ProductDecompositionSolver(instance)
+                    else:
+                        solver = SimpleSolver(
+                            instance,
+                            parameters['changeover_weight'],
+                            k_neighbors=parameters['k_neighbors'] or None,
+                            depot_policy=parameters['depot_policy']
+                        )
+                    with telemetry.phase("construction", instance=instance_path.name,
+                                         constructor=parameters['constructor']):
+                        solution = solver.solve()
+                # Démarrage à chaud avant l'ALNS: il part de la meilleure des deux
+                warm_started = False
+                if warm_start:
+                    stored = load_warm_start(instance, solution_path)
+                    if best_solution(solution, stored) is stored:
+                        solution, warm_started = stored, True
+                if strategy is not None and strategy.time_limit is not None:
+                    params = ALNSParams(iterations=None, neighbours=parameters['k_neighbors'] or None)
+                    engine = ALNS(instance, params)
+                    # Échéance du SLA: construction, démarrage à chaud et initialisation déduits
+                    params.time_limit = strategy.remaining_search(time.perf_counter() - selected_at)
+                    if params.time_limit > 0:
+                        with telemetry.phase("alns", instance=instance_path.name, time_limit=params.time_limit):
+                            solution = engine.run(solution)
+            solve_time = timings['solve']
+            solve_cpu_time = time.process_time() - solve_cpu_start
             
             # Validation locale
-            is_valid, errors = validate_solution(solution)
+            with timed(timings, 'validate'):
+                is_valid, errors = validate_solution(solution)
+            telemetry.emit('validation', kind="local", instance=instance_path.name, valid=is_valid,
+                           errors=len(errors), duration=round(timings['validate'], 6))
             
             if not is_valid:
                 print(f"❌ Solution invalide ({len(errors)} erreurs)")
@@ -87,10 +349,13 @@ def solve_batch(
                 continue
             
             # Export
-            solution_path = output_dir / f"Sol_{instance_path.name}"
-            write_solution(solution, solution_path)
+            with timed(timings, 'write'), telemetry.phase("export", instance=instance_path.name):
+                write_solution(solution, solution_path)
             
             # Métriques
+            bound = compute_lower_bound(instance)
+            wall_time = time.perf_counter() - wall_start
+            cpu_time = time.process_time() - cpu_start
             result = {
                 'instance': instance_path.name,
                 'stations': instance.nb_stations,
@@ -100,51 +365,104 @@ def solve_batch(
                 'transition_cost': solution.total_transition_cost(),
                 'total_cost': solution.total_cost(),
                 'transitions': solution.total_transitions(),
+                'lower_bound': bound.total,
+                'gap': bound.gap(solution.total_cost()),
                 'solve_time': solve_time,
+                'construct_time': timings['construct'],
                 'valid_local': is_valid,
-                'valid_api': None
+                'valid_api': None,
+                'warm_start': warm_started,
+                'constructor': parameters['constructor'],
+                'strategy': strategy.name if strategy else parameters['constructor'],
+                'sla': sla,
+                'within_sla': wall_time <= sla if sla is not None else None,
+                'changeover_weight': parameters['changeover_weight'],
+                'parse_time': timings['parse'],
+                'validate_time': timings['validate'],
+                'write_time': timings['write'],
+                'wall_time': wall_time,
+                'cpu_time': cpu_time,
+                'solve_cpu_time': solve_cpu_time,
+                'peak_rss_mb': telemetry.peak_memory_mb(),
+                'peak_rss_scope': "instance" if peak_reset else "process"
             }
             
-            print(f"✅ Résolu en {solve_time:.2f}s")
+            telemetry.emit('incumbent', instance=instance_path.name, cost=solution.total_cost(),
+                           source="warm_start" if warm_started else parameters['constructor'], elapsed=round(solve_time, 4))
+            telemetry.sample_memory(instance=instance_path.name)
+            
+            print(f"✅ Résolu en {solve_time:.2f}s" + (" (départ: solution stockée)" if warm_started else ""))
             print(f"   Coût total: {solution.total_cost():.2f}")
             print(f"   Distance: {solution.total_distance():.2f}")
             print(f"   Transition: {solution.total_transition_cost():.2f}")
+            print(f"   Borne inf.: {bound.total:.2f} (gap {100 * result['gap']:.1f}%)")
+            print(f"   Temps: {wall_time:.3f}s mural, {cpu_time:.3f}s CPU "
+                  f"(lecture {timings['parse']:.3f}s, résolution {solve_time:.3f}s, "
+                  f"validation {timings['validate']:.3f}s, écriture {timings['write']:.3f}s)")
+            if sla is not None:
+                print(f"   SLA: {wall_time:.3f}s / {sla:.3f}s " + ("✅" if result['within_sla'] else "⚠️  dépassé"))
+            if result['peak_rss_mb'] is not None:
+                print(f"   Mémoire: pic {result['peak_rss_mb']:.1f} Mo"
+                      + ("" if peak_reset else " (processus)"))
             
             # Vérification API
-            if verify_api:
+            if verify_api and executor is None:
                 print("   Vérification API...", end=" ")
-                api_result = client.verify_solution(instance_path, solution_path)
-                result['valid_api'] = api_result.get('feasible', False)
-                
-                if result['valid_api']:
-                    print("✅")
-                else:
-                    print("❌")
-                    errors = api_result.get('errors', [])
-                    for error in errors[:2]:
-                        print(f"      - {error}")
+                api_result = verify_api_timed(client, instance_path, solution_path)
+                apply_api_result(result, api_result)
             
-            results.append(result)
+            append_journal(journal_path, result)
+            journal[instance_path.name] = result
+            store.record(run_id, result)
             
+            if executor is not None:
+                # Requêtes en vol bornées: attendre qu'une vérification se termine
+                if len(pending) >= api_workers:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                future = executor.submit(verify_api_timed, client, instance_path, solution_path)
+                pending[future] = result
+                print(f"   Vérification API en arrière-plan ({len(pending)} en cours)")
+        
         except Exception as e:
             print(f"❌ Erreur: {e}")
             import traceback
             traceback.print_exc()
     
+    # Vérifications restantes
+    if executor is not None:
+        if pending:
+            print(f"\n⏳ Attente de {len(pending)} vérification(s) API...")
+            collect(list(pending))
+        executor.shutdown()
+    
     # Rapport final
     print(f"\n{'='*70}")
     print("RAPPORT FINAL")
     print(f"{'='*70}")
     
+    # Résultats reconstruits depuis le journal, dans l'ordre des instances
+    results = [journal[p.name] for p in instances if p.name in journal]
+    
     if results:
         print(f"\nInstances résolues: {len(results)}/{len(instances)}")
+        if skipped:
+            print(f"Reprises du journal: {skipped}")
         
         # Statistiques
         avg_cost = sum(r['total_cost'] for r in results) / len(results)
         avg_time = sum(r['solve_time'] for r in results) / len(results)
+        avg_gap = sum(r.get('gap', 0.0) for r in results) / len(results)
         
         print(f"\nCoût moyen: {avg_cost:.2f}")
+        print(f"Gap moyen: {100 * avg_gap:.1f}%")
         print(f"Temps moyen: {avg_time:.2f}s")
+        print_resource_report(results)
+        
+        with_sla = [r for r in results if r.get('within_sla') is not None]
+        if with_sla:
+            met = sum(1 for r in with_sla if r['within_sla'])
+            print(f"SLA respecté: {met}/{len(with_sla)}")
         
         if verify_api:
             valid_api = sum(1 for r in results if r['valid_api'])
@@ -152,16 +470,42 @@ def solve_batch(
         
         # Export CSV
         csv_path = output_dir / "batch_results.csv"
-        with open(csv_path, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=results[0].keys())
-            writer.writeheader()
-            writer.writerows(results)
+        write_results_csv(csv_path, results)
         
         print(f"\n📊 Rapport détaillé: {csv_path}")
     
+    print(f"🗄️  Historique: run #{run_id} dans {store.db_path}")
+    store.close()
+    
     print(f"{'='*70}\n")
 
 
+def print_resource_report(results: List[dict]):
+    """Temps CPU / mural par étape et pics mémoire (dimensionnement des workers)"""
+    # Les entrées de journaux plus anciens n'ont pas ces colonnes
+    measured = [r for r in results if r.get('cpu_time') is not None]
+    if not measured:
+        return
+    
+    n = len(measured)
+    wall = sum(r['wall_time'] for r in measured)
+    cpu = sum(r['cpu_time'] for r in measured)
+    print(f"\nTemps mural total: {wall:.2f}s, CPU: {cpu:.2f}s (CPU/mural {cpu / wall if wall > 0 else 0:.2f})")
+    for key, label in (('parse_time', "Lecture"), ('solve_time', "Résolution"),
+                       ('validate_time', "Validation"), ('write_time', "Écriture"),
+                       ('cpu_time', "CPU / instance")):
+        values = [r[key] for r in measured]
+        print(f"   {label:<15} moyenne {sum(values) / n:.3f}s, max {max(values):.3f}s")
+    
+    peaks = [r for r in measured if r.get('peak_rss_mb') is not None]
+    if peaks:
+        heaviest = max(peaks, key=lambda r: r['peak_rss_mb'])
+        values = sorted(r['peak_rss_mb'] for r in peaks)
+        scope = "" if all(r.get('peak_rss_scope') == "instance" for r in peaks) else " (pic du processus)"
+        print(f"Mémoire résidente: pic max {heaviest['peak_rss_mb']:.1f} Mo ({heaviest['instance']}), "
+              f"médiane {values[len(values) // 2]:.1f} Mo{scope}")
+
+
 def main():
     import argparse
     
@@ -169,7 +513,29 @@ def main():
     parser.add_argument('instance_dir', help="Dossier d'instances")
     parser.add_argument('-o', '--output', help="Dossier de sortie")
     parser.add_argument('--verify', action='store_true', help="Vérifier avec API")
-    parser.add_argument('-w', '--weight', type=float, default=0.5, help="Poids changeover")
+    parser.add_argument('-w', '--weight', type=float, help="Poids changeover (default: configuration, sinon 0.5)")
+    parser.add_argument('--constructor', choices=['greedy', 'savings', 'products'],
+                        help="Construction initiale (default: configuration, sinon greedy)")
+    parser.add_argument('--depot-policy', choices=sorted(DEPOT_POLICIES),
+                        help="Choix du dépôt par le glouton (default: configuration, sinon ratio)")
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG_PATH),
+                        help=f"Paramètres réglés par classe d'instances (default: {DEFAULT_CONFIG_PATH})")
+    parser.add_argument('--no-config', action='store_true', help="Ignorer le fichier de configuration")
+    parser.add_argument('--sla', type=float, metavar='S',
+                        help="Budget de latence par instance: stratégie et temps d'ALNS choisis par le portefeuille")
+    parser.add_argument('--portfolio', default=str(DEFAULT_PORTFOLIO_PATH),
+                        help=f"Calibration du portefeuille (default: {DEFAULT_PORTFOLIO_PATH}, sinon CSV de benchmark)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Reprendre un batch interrompu à partir du journal")
+    parser.add_argument('--api-workers', type=int, default=DEFAULT_API_WORKERS,
+                        help="Vérifications API simultanées (0 = bloquant après chaque instance)")
+    parser.add_argument('--warm-start', action='store_true',
+                        help="Conserver les solutions existantes de la sortie si elles sont meilleures")
+    parser.add_argument('--db', help="Base SQLite de l'historique (défaut: <sortie>/results.db)")
+    parser.add_argument('--telemetry', metavar='JSONL',
+                        help="Flux d'événements du batch (voir scripts/telemetry_view.py)")
+    parser.add_argument('--telemetry-interval', type=float, default=telemetry.DEFAULT_INTERVAL,
+                        metavar='S', help="Intervalle d'échantillonnage de la télémétrie")
     
     args = parser.parse_args()
     
@@ -180,7 +546,14 @@ def main():
         print(f"❌ Dossier introuvable: {instance_dir}")
         sys.exit(1)
     
-    solve_batch(instance_dir, output_dir, args.verify, args.weight)
+    with telemetry.recording(args.telemetry, args.telemetry_interval, instance_dir=str(instance_dir)):
+        solve_batch(
+            instance_dir, output_dir, args.verify, args.weight,
+            args.constructor, args.depot_policy, args.resume,
+            Path(args.db) if args.db else None, args.api_workers, args.warm_start,
+            {} if args.no_config else load_config(args.config),
+            args.sla, Portfolio.default(args.portfolio) if args.sla is not None else None
+        )
 
 
 if __name__ == "__main__":
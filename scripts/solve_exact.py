@@ -0,0 +1,146 @@
+"""
+Solutions de référence des petites instances (modèle CP-SAT)
+
+Usage:
+    python scripts/solve_exact.py instances/small --time-limit 60 --workers 8
+    python scripts/solve_exact.py instances/small --complete -o solutions/exact
+
+Chaque solution est écrite par write_solution; exact_results.csv donne
+le statut, le coût, les bornes prouvées et l'écart du glouton à la borne.
+"""
+
+import sys
+import csv
+import os
+from pathlib import Path
+
+# Ajouter src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from parser import parse_instance
+from solver_cpsat import CPSATSolver, DEFAULT_MAX_STOPS, DEFAULT_TIME_LIMIT, DEFAULT_WORKERS
+from solution_writer import write_solution
+from validator import validate_solution
+
+
+# Avec --complete, max_stops monte jusqu'au nombre de stations demandant un
+# même produit, sans dépasser cette valeur (motifs en stations^max_stops)
+COMPLETE_MAX_STOPS = 6
+
+
+def solve_exact(
+    instance_dir: Path,
+    output_dir: Path,
+    time_limit: float = DEFAULT_TIME_LIMIT,
+    workers: int = DEFAULT_WORKERS,
+    max_stops: int = DEFAULT_MAX_STOPS,
+    complete: bool = False,
+    seed: int = None
+):
+    """Résout chaque instance du dossier avec CPSATSolver"""
+    instances = sorted(instance_dir.glob("*.dat"))
+    if not instances:
+        print(f"❌ Aucune instance trouvée dans {instance_dir}")
+        return
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    print(f"\n{'='*70}")
+    print("SOLUTIONS DE RÉFÉRENCE (CP-SAT)")
+    print(f"{'='*70}")
+    print(f"Instances: {len(instances)}, {time_limit:.0f}s et {workers} workers par instance")
+    print(f"{'='*70}")
+    
+    results = []
+    for i, instance_path in enumerate(instances, 1):
+        print(f"\n[{i}/{len(instances)}] {instance_path.name}")
+        instance = parse_instance(instance_path)
+        stops = max_stops
+        if complete:
+            needed = max(sum(1 for s in instance.stations if s.demands[p] > 0) for p in range(instance.nb_products))
+            stops = max(max_stops, min(needed, COMPLETE_MAX_STOPS))
+        
+        solver = CPSATSolver(instance, time_limit=time_limit, workers=workers, max_stops=stops, seed=seed)
+        solution = solver.solve()
+        stats = solver.stats
+        is_valid, errors = validate_solution(solution)
+        if not is_valid:
+            print(f"❌ Solution invalide: {errors[0]}")
+            continue
+        write_solution(solution, output_dir / f"Sol_{instance_path.name}")
+        
+        greedy_gap = (stats['greedy_cost'] - stats['lower_bound']) / stats['greedy_cost'] if stats['greedy_cost'] else 0.0
+        results.append({
+            'instance': instance_path.name,
+            'stations': instance.nb_stations,
+            'products': instance.nb_products,
+            'status': stats['status'],
+            'complete': stats['complete'],
+            'max_stops': stats['max_stops'],
+            'total_cost': stats['cost'],
+            'model_bound': stats['bound'],
+            'lower_bound': stats['lower_bound'],
+            'proven_gap': stats['proven_gap'],
+            'optimal': stats['status'] == "optimal" and stats['complete'],
+            'greedy_cost': stats['greedy_cost'],
+            'greedy_gap': greedy_gap,
+            'source': stats['source'],
+            'patterns': stats['patterns'],
+            'search_time': stats['search_time'],
+            'elapsed': stats['elapsed'],
+        })
+        
+        optimal = results[-1]['optimal']
+        print(f"   {'✅ optimum prouvé' if optimal else '🔶 ' + stats['status']}: {stats['cost']:.2f}, "
+              f"borne {stats['lower_bound']:.2f} (écart {100 * stats['proven_gap']:.1f}%), "
+              f"glouton {stats['greedy_cost']:.2f} (écart {100 * greedy_gap:.1f}%), "
+              f"{stats['elapsed']:.1f}s")
+    
+    if not results:
+        return
+    
+    csv_path = output_dir / "exact_results.csv"
+    tmp_path = csv_path.with_name(f".{csv_path.name}.tmp")
+    with open(tmp_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0]))
+        writer.writeheader()
+        writer.writerows(results)
+    os.replace(tmp_path, csv_path)
+    
+    proven = sum(1 for r in results if r['optimal'])
+    print(f"\n{'='*70}")
+    print(f"Optimums prouvés: {proven}/{len(results)}")
+    print(f"Écart moyen prouvé: {100 * sum(r['proven_gap'] for r in results) / len(results):.1f}%")
+    print(f"Écart moyen du glouton à la borne: {100 * sum(r['greedy_gap'] for r in results) / len(results):.1f}%")
+    print(f"📊 {csv_path}")
+    print(f"{'='*70}\n")
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Solutions de référence CP-SAT")
+    parser.add_argument('instance_dir', help="Dossier d'instances (petites)")
+    parser.add_argument('-o', '--output', default="solutions/exact", help="Dossier de sortie (default: solutions/exact)")
+    parser.add_argument('--time-limit', type=float, default=DEFAULT_TIME_LIMIT,
+                        help=f"Temps max. par instance (default: {DEFAULT_TIME_LIMIT:.0f})")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"Threads de recherche CP-SAT (default: {DEFAULT_WORKERS})")
+    parser.add_argument('--max-stops', type=int, default=DEFAULT_MAX_STOPS,
+                        help=f"Stations par mini-route (default: {DEFAULT_MAX_STOPS})")
+    parser.add_argument('--complete', action='store_true',
+                        help=f"Modèle complet quand il faut au plus {COMPLETE_MAX_STOPS} stations par mini-route")
+    parser.add_argument('--seed', type=int, help="Graine CP-SAT")
+    
+    args = parser.parse_args()
+    
+    instance_dir = Path(args.instance_dir)
+    if not instance_dir.exists():
+        print(f"❌ Dossier introuvable: {instance_dir}")
+        sys.exit(1)
+    
+    solve_exact(instance_dir, Path(args.output), args.time_limit, args.workers,
+                args.max_stops, args.complete, args.seed)
+
+
+if __name__ == "__main__":
+    main()
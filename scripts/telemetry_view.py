@@ -0,0 +1,224 @@
+"""
+Lecture d'un flux de télémétrie (--telemetry de main.py / solve_batch.py)
+
+Usage:
+    python scripts/telemetry_view.py run.jsonl            # chronologie après le run
+    python scripts/telemetry_view.py run.jsonl --follow   # progression en direct
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, List
+
+
+BAR_WIDTH = 30
+MAX_PHASE_ROWS = 40
+
+
+def parse_event(line: str):
+    """Événement d'une ligne, None si elle est vide ou tronquée"""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        event = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    return event if isinstance(event, dict) and 'event' in event else None
+
+
+def read_events(path: Path) -> List[dict]:
+    with open(path, 'r') as f:
+        return [e for e in map(parse_event, f) if e is not None]
+
+
+def follow_events(path: Path, poll: float = 0.2) -> Iterator[dict]:
+    """Événements au fil de l'eau, jusqu'à l'événement 'end'"""
+    while not path.exists():
+        time.sleep(poll)
+    with open(path, 'r') as f:
+        partial = ""
+        while True:
+            chunk = f.readline()
+            if not chunk:
+                time.sleep(poll)
+                continue
+            partial += chunk
+            if not partial.endswith("\n"):
+                continue
+            event = parse_event(partial)
+            partial = ""
+            if event is None:
+                continue
+            yield event
+            if event['event'] == 'end':
+                return
+
+
+def _memory(event: dict) -> str:
+    parts = []
+    if 'rss_mb' in event:
+        parts.append(f"{event['rss_mb']:.0f} Mo")
+    if 'peak_mb' in event:
+        parts.append(f"pic {event['peak_mb']:.0f} Mo")
+    return ", ".join(parts)
+
+
+def _fields(event: dict, skip=()) -> str:
+    ignored = {'t', 'event', 'phase', 'duration', 'status', 'rss_mb', 'peak_mb'} | set(skip)
+    return " ".join(f"{k}={v}" for k, v in event.items() if k not in ignored and v is not None)
+
+
+def format_event(event: dict) -> str:
+    """Ligne de progression d'un événement"""
+    t = f"{event['t']:>9.2f}s"
+    kind = event['event']
+    if kind == 'start':
+        return f"{t}  🚀 Début (pid {event.get('pid')}) {_fields(event, ('pid', 'argv'))}"
+    if kind == 'end':
+        return f"{t}  🏁 Fin ({_memory(event)})"
+    if kind == 'instance':
+        return f"{t}  📂 [{event.get('index')}/{event.get('total')}] {event.get('instance')}"
+    if kind == 'phase_start':
+        return f"{t}  ▶️  {event['phase']} {_fields(event)}"
+    if kind == 'phase_end':
+        status = "" if event.get('status') == 'ok' else f" ❌ {event.get('status')}"
+        return f"{t}  ⏹️  {event['phase']} en {event['duration']:.3f}s ({_memory(event)}){status}"
+    if kind == 'incumbent':
+        return f"{t}  ⭐ Coût {event['cost']:.2f} ({event.get('source', '')})"
+    if kind == 'operators':
+        best = ", ".join(f"{name} {op['weight']:.2f}" for name, op in event['destroy'].items())
+        label = "Opérateurs (fin)" if event.get('final') else "Opérateurs"
+        return (f"{t}  ⚙️  {label}: it {event['iteration']} ({event['iterations_per_second']:.0f} it/s), "
+                f"meilleur {event['best_cost']:.2f}, courant {event['current_cost']:.2f} | {best}")
+    if kind == 'memory':
+        return f"{t}  💾 Mémoire {_memory(event)}"
+    if kind == 'validation':
+        status = "✅" if event.get('valid') else "❌"
+        return f"{t}  🔍 Validation {event.get('kind')} {status} en {event['duration'] * 1000:.1f} ms"
+    if kind == 'timings':
+        summary = ", ".join(f"{name} x{v['count']} ({v['total']:.3f}s)" for name, v in event['timings'].items())
+        return f"{t}  ⏱️  Durées cumulées: {summary}"
+    return f"{t}  {kind} {_fields(event)}"
+
+
+def print_phase_summary(ends: List[dict], slowest: int = 10):
+    """Phases agrégées par nom (batchs), puis les plus longues"""
+    by_name = {}
+    for e in ends:
+        by_name.setdefault(e['phase'], []).append(e['duration'])
+    print(f"\n{'Phase':<16}  {'Nombre':>7}  {'Total':>9}  {'Moyenne':>9}  {'Max':>9}")
+    print("-" * 70)
+    for name, durations in by_name.items():
+        print(f"{name:<16}  {len(durations):>7}  {sum(durations):>8.3f}s  "
+              f"{sum(durations) / len(durations):>8.3f}s  {max(durations):>8.3f}s")
+    print(f"\nPhases les plus longues:")
+    for e in sorted(ends, key=lambda e: -e['duration'])[:slowest]:
+        print(f"   {e['t'] - e['duration']:>8.2f}s  {e['duration']:>8.3f}s  {e['phase']} {e.get('instance', '')}")
+
+
+def print_timeline(events: List[dict]):
+    """Chronologie après le run: phases, améliorations, opérateurs, mémoire, validations"""
+    if not events:
+        print("Aucun événement")
+        return
+    
+    total = max(e['t'] for e in events) or 1.0
+    print(f"\n{'='*70}")
+    print(f"CHRONOLOGIE ({total:.2f}s, {len(events)} événements)")
+    print(f"{'='*70}")
+    
+    # Phases (imbrication d'après l'ordre début / fin)
+    ends = [e for e in events if e['event'] == 'phase_end']
+    if len(ends) > MAX_PHASE_ROWS:
+        print_phase_summary(ends)
+    else:
+        print(f"\n{'Début':>9}  {'Durée':>9}  {'Phase':<32}  Répartition")
+        print("-" * 70)
+        depth = 0
+        for e in events:
+            if e['event'] == 'phase_start':
+                depth += 1
+            elif e['event'] == 'phase_end':
+                depth = max(depth - 1, 0)
+                begin = e['t'] - e['duration']
+                offset = int(BAR_WIDTH * begin / total)
+                width = max(1, int(BAR_WIDTH * e['duration'] / total))
+                label = ("  " * depth + e['phase'] + (f" {e['instance']}" if 'instance' in e else ""))[:32]
+                print(f"{begin:>8.2f}s  {e['duration']:>8.3f}s  {label:<32}  "
+                      f"{' ' * offset}{'█' * min(width, BAR_WIDTH - offset)}")
+    
+    # Améliorations
+    improvements = [e for e in events if e['event'] == 'incumbent']
+    if improvements:
+        print(f"\n⭐ Améliorations: {len(improvements)}")
+        shown = improvements if len(improvements) <= 20 else improvements[:10] + improvements[-10:]
+        previous = None
+        for e in shown:
+            gain = f"  (-{previous - e['cost']:.2f})" if previous is not None and previous > e['cost'] else ""
+            where = f" {e['instance']}" if 'instance' in e else ""
+            print(f"   {e['t']:>8.2f}s  {e['cost']:>14.2f}  {e.get('source', '')}{where}{gain}")
+            previous = e['cost'] if 'instance' not in e else None
+    
+    # Opérateurs: dernier échantillon
+    operators = [e for e in events if e['event'] == 'operators']
+    if operators:
+        last = operators[-1]
+        print(f"\n⚙️  Opérateurs ({last['iteration']} itérations, {last['iterations_per_second']:.0f} it/s)")
+        for group in ('destroy', 'repair'):
+            for name, op in last[group].items():
+                print(f"   {group:<8} {name:<12} poids {op['weight']:>7.3f}  usages {op['uses']:>7}")
+    
+    # Mémoire
+    peaks = [e['peak_mb'] for e in events if 'peak_mb' in e]
+    rss = [e['rss_mb'] for e in events if 'rss_mb' in e]
+    if peaks or rss:
+        print(f"\n💾 Mémoire: pic {max(peaks, default=0):.0f} Mo, résidente max. observée {max(rss, default=0):.0f} Mo")
+    
+    # Validations
+    validations = {}
+    for e in events:
+        if e['event'] == 'validation':
+            validations.setdefault(e.get('kind', '?'), []).append(e)
+    timings = [e for e in events if e['event'] == 'timings']
+    if validations or timings:
+        print("\n🔍 Validations")
+        for kind, items in validations.items():
+            durations = [v['duration'] for v in items]
+            invalid = sum(1 for v in items if not v.get('valid'))
+            print(f"   {kind:<10} x{len(items):<5} total {sum(durations):.3f}s  max {max(durations) * 1000:.1f} ms"
+                  + (f"  ❌ {invalid} invalide(s)" if invalid else ""))
+        if timings:
+            for name, v in timings[-1]['timings'].items():
+                print(f"   {name:<10} x{v['count']:<5} total {v['total']:.3f}s  max {v['max'] * 1000:.1f} ms (cumul)")
+    
+    print(f"{'='*70}\n")
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Lecture d'un flux de télémétrie")
+    parser.add_argument('telemetry', help="Fichier JSONL (--telemetry)")
+    parser.add_argument('-f', '--follow', action='store_true',
+                        help="Afficher la progression en direct, puis la chronologie")
+    args = parser.parse_args()
+    
+    path = Path(args.telemetry)
+    if args.follow:
+        try:
+            for event in follow_events(path):
+                print(format_event(event), flush=True)
+        except KeyboardInterrupt:
+            print()
+    elif not path.exists():
+        print(f"❌ Fichier introuvable: {path}")
+        sys.exit(1)
+    
+    print_timeline(read_events(path))
+
+
+if __name__ == "__main__":
+    main()
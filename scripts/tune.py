@@ -0,0 +1,149 @@
+"""
+Réglage des paramètres du solveur par classe d'instances (course F-Race)
+
+Usage:
+    python scripts/tune.py instances/small instances/medium instances/large --budget 3600 --workers 8
+    python scripts/tune.py instances/large --configs 32 --iterations 200 -o solver_config.json
+
+La meilleure configuration de chaque classe est écrite dans le fichier de
+configuration (default: solver_config.json), lu par main.py et solve_batch.py.
+"""
+
+import sys
+import random
+from datetime import datetime
+from pathlib import Path
+
+# Ajouter src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from tuning import Race, Evaluator, sample_configurations
+from solver_config import (
+    INSTANCE_CLASSES, DEFAULT_CONFIG_PATH, instance_class, load_config, save_config
+)
+from results_store import git_revision
+
+
+def group_instances(directories):
+    """Instances des dossiers, regroupées par classe"""
+    groups = {}
+    for directory in directories:
+        for path in sorted(Path(directory).glob("*.dat")):
+            groups.setdefault(instance_class(path.name), []).append(path)
+    return {cls: groups[cls] for cls in INSTANCE_CLASSES if cls in groups}
+
+
+def format_config(config: dict) -> str:
+    return ", ".join(f"{k}={v}" for k, v in config.items())
+
+
+def tune(
+    directories,
+    output_path: Path,
+    cpu_budget: float = 600.0,
+    workers: int = 1,
+    nb_configs: int = 24,
+    first_test: int = 5,
+    alpha: float = 0.05,
+    iterations: int = 0,
+    seed: int = 0
+):
+    """
+    Course par classe d'instances; le budget CPU est partagé entre les
+    classes (la part non utilisée par une classe passe aux suivantes).
+    """
+    groups = group_instances(directories)
+    if not groups:
+        print("❌ Aucune instance trouvée")
+        return
+    
+    rng = random.Random(seed)
+    config = load_config(output_path)
+    config.setdefault('classes', {})
+    report = {}
+    
+    print(f"\n{'='*70}")
+    print("RÉGLAGE DES PARAMÈTRES (racing)")
+    print(f"{'='*70}")
+    print(f"Classes: {', '.join(f'{c} ({len(p)})' for c, p in groups.items())}")
+    print(f"Budget CPU: {cpu_budget:.0f}s, {workers} worker(s), {nb_configs} configurations par classe")
+    print(f"{'='*70}")
+    
+    remaining = cpu_budget
+    with Evaluator(workers) as evaluator:
+        for k, (cls, instances) in enumerate(groups.items()):
+            budget = remaining / (len(groups) - k)
+            order = list(instances)
+            rng.shuffle(order)
+            configurations = sample_configurations(nb_configs, rng, iterations=iterations)
+            
+            print(f"\n🏁 {cls}: {len(configurations)} configurations, {len(order)} instances, "
+                  f"budget CPU {budget:.0f}s")
+            race = Race(configurations, order, evaluator, budget, first_test=first_test,
+                        alpha=alpha, iterations=iterations, seed=seed)
+            result = race.run()
+            remaining -= result.cpu_time
+            
+            gain = f", gain vs défaut {100 * result.default_gain:.1f}%" if result.default_gain is not None else ""
+            print(f"   ✅ {result.instances_used} instances, {result.evaluations} évaluations, "
+                  f"CPU {result.cpu_time:.1f}s (mur {result.wall_time:.1f}s), "
+                  f"{len(result.survivors)} survivante(s){gain}")
+            print(f"   ⭐ {format_config(result.best)}")
+            
+            config['classes'][cls] = result.best
+            report[cls] = {
+                'instances': result.instances_used,
+                'configurations': len(configurations),
+                'survivors': len(result.survivors),
+                'evaluations': result.evaluations,
+                'cpu_time': round(result.cpu_time, 2),
+                'wall_time': round(result.wall_time, 2),
+                'gain_vs_default': result.default_gain,
+            }
+    
+    config['tuning'] = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': git_revision(),
+        'cpu_budget': cpu_budget,
+        'iterations': iterations,
+        'alpha': alpha,
+        'seed': seed,
+        'classes': report,
+    }
+    save_config(config, output_path)
+    print(f"\n📄 Configuration: {output_path}")
+    print(f"{'='*70}\n")
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Réglage des paramètres par course")
+    parser.add_argument('instance_dirs', nargs='+', help="Dossiers d'instances (classes S/M/L d'après les noms)")
+    parser.add_argument('-o', '--output', default=str(DEFAULT_CONFIG_PATH),
+                        help=f"Fichier de configuration (default: {DEFAULT_CONFIG_PATH})")
+    parser.add_argument('--budget', type=float, default=600.0, help="Temps CPU total en secondes (default: 600)")
+    parser.add_argument('--workers', type=int, default=1, help="Processus d'évaluation (default: 1)")
+    parser.add_argument('--configs', type=int, default=24, help="Configurations par classe (default: 24)")
+    parser.add_argument('--first-test', type=int, default=5,
+                        help="Instances évaluées avant la première élimination (default: 5)")
+    parser.add_argument('--alpha', type=float, default=0.05, help="Seuil des tests (default: 0.05)")
+    parser.add_argument('--iterations', type=int, default=0,
+                        help="Itérations ALNS après la construction (default: 0)")
+    parser.add_argument('--seed', type=int, default=0, help="Graine (default: 0)")
+    
+    args = parser.parse_args()
+    
+    for directory in args.instance_dirs:
+        if not Path(directory).exists():
+            print(f"❌ Dossier introuvable: {directory}")
+            sys.exit(1)
+    
+    tune(
+        args.instance_dirs, Path(args.output), args.budget, args.workers,
+        args.configs, args.first_test, args.alpha, args.iterations, args.seed
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,9 @@ from models import (
 )
 from parser import parse_instance
 from solver_simple import SimpleSolver
+from solver_savings import SavingsSolver
+from anytime import AnytimeSolver
+from alns import ALNS, ALNSParams
 from solution_writer import write_solution, format_solution_summary
 from validator import validate_solution
 from api_client import MPVRPAPIClient, print_verification_result
@@ -21,7 +24,7 @@ __all__ = [
     'Instance', 'Solution', 'Vehicle', 'Depot', 'Garage', 'Station',
     'VehicleRoute', 'MiniRoute', 'Delivery',
     'parse_instance',
-    'SimpleSolver',
+    'SimpleSolver', 'SavingsSolver', 'AnytimeSolver', 'ALNS', 'ALNSParams',
     'write_solution', 'format_solution_summary',
     'validate_solution',
     'MPVRPAPIClient', 'print_verification_result'
@@ -0,0 +1,869 @@
+"""
+Recherche adaptative à grand voisinage (ALNS)
+Destruction / réparation de livraisons avec poids adaptatifs et recuit simulé
+"""
+
+import math
+import random
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from models import Instance, Solution, VehicleRoute, MiniRoute, Delivery
+from bounds import compute_lower_bound
+import telemetry
+
+
+INF = float('inf')
+
+
+@dataclass
+class ALNSParams:
+    """Paramètres de l'ALNS"""
+    iterations: Optional[int] = 5000
+    time_limit: Optional[float] = None
+    min_removal: int = 4
+    max_removal: int = 40
+    max_removal_ratio: float = 0.2
+    # Recuit: une dégradation de start_worsening (relative) est acceptée avec p=0.5
+    start_worsening: float = 0.005
+    end_temperature_ratio: float = 0.01
+    # Poids adaptatifs (Ropke & Pisinger)
+    segment_length: int = 100
+    reaction: float = 0.1
+    score_best: float = 33.0
+    score_better: float = 9.0
+    score_accepted: float = 13.0
+    # Aléa des opérateurs "worst" et "related" (plus grand = plus déterministe)
+    determinism: float = 4.0
+    # Taille des listes de voisins candidats (None = parcours complet)
+    neighbours: Optional[int] = 20
+    # Arrêt dès que (coût - borne inférieure) / coût <= target_gap
+    target_gap: Optional[float] = None
+    seed: Optional[int] = None
+
+
+@dataclass
+class Request:
+    """Livraison retirée, à réinsérer"""
+    station_id: int
+    product: int
+    quantity: int
+
+
+class _RowLists(dict):
+    """Lignes de la matrice dense converties en listes Python à la première lecture"""
+    
+    def __init__(self, matrix):
+        super().__init__()
+        self.matrix = matrix
+    
+    def __missing__(self, i: int) -> List[float]:
+        row = self[i] = self.matrix[i].tolist()
+        return row
+
+
+@dataclass
+class _Slot:
+    """Position d'une livraison dans la solution courante"""
+    vehicle: int
+    mini_route: MiniRoute
+    delivery: Delivery
+
+
+class ALNS:
+    """Moteur ALNS sur les livraisons (station, produit, quantité)"""
+    
+    # Copie de la matrice dense en listes Python (accès scalaire rapide):
+    # O(n²) à la construction, rentable seulement sur une recherche longue;
+    # sinon les lignes sont converties à la demande
+    dense_lists = True
+    
+    def __init__(self, instance: Instance, params: Optional[ALNSParams] = None):
+        self.instance = instance
+        self.params = params or ALNSParams()
+        self.rng = random.Random(self.params.seed)
+        
+        # Listes Python si la matrice est dense, sinon accès par lignes mises en cache
+        self.matrix = instance.distance_matrix()
+        if not instance.has_dense_distances():
+            self.dist = self.matrix
+        elif self.dense_lists:
+            self.dist = self.matrix.tolist()
+        else:
+            self.dist = _RowLists(self.matrix)
+        self.trans = instance.transition_costs
+        self.depot_nodes = {d.id: instance.depot_node(d.id) for d in instance.depots}
+        self.station_nodes = {s.id: instance.station_node(s.id) for s in instance.stations}
+        
+        # Listes de voisins: station_id -> ids des k stations les plus proches
+        self.near = None
+        if self.params.neighbours:
+            lists = instance.nearest_stations(self.params.neighbours).tolist()
+            self.near = {
+                s.id: [instance.stations[j].id for j in lists[self.station_nodes[s.id]]]
+                for s in instance.stations
+            }
+        
+        self.vehicles = list(instance.vehicles)
+        self.capacity = [v.capacity for v in self.vehicles]
+        self.garage_nodes = [instance.garage_node(v.home_garage) for v in self.vehicles]
+        
+        self.destroy_ops: List[Tuple[str, Callable]] = [
+            ('random', self._destroy_random),
+            ('worst', self._destroy_worst),
+            ('related', self._destroy_related),
+            ('product', self._destroy_product),
+        ]
+        self.repair_ops: List[Tuple[str, Callable]] = [
+            ('greedy', self._repair_greedy),
+            ('regret', self._repair_regret),
+        ]
+        
+        self.stats: Dict = {}
+    
+    # ------------------------------------------------------------------
+    # Boucle principale
+    # ------------------------------------------------------------------
+    
+    def run(
+        self,
+        initial: Solution,
+        should_stop: Optional[Callable[[], bool]] = None,
+        on_improvement: Optional[Callable[[Solution], None]] = None,
+        focus: Optional[Iterable[int]] = None,
+        scope: Optional[Iterable[int]] = None
+    ) -> Solution:
+        """
+        Améliore une solution initiale valide.
+        
+        Args:
+            initial: Solution de départ (valide)
+            should_stop: Critère d'arrêt externe (échéance, SIGINT...)
+            on_improvement: Appelé avec chaque nouvelle meilleure solution
+            focus: Ids des stations dont les livraisons peuvent être retirées
+                (None = toutes)
+            scope: Indices des routes (véhicules) que la recherche peut
+                modifier, retraits et insertions (None = toutes)
+        
+        Returns:
+            Solution: Meilleure solution trouvée
+        """
+        self._load(initial)
+        if focus is not None:
+            self.focus = set(focus)
+        if scope is not None:
+            self.scope = sorted(set(scope))
+        solution = self._search(should_stop, on_improvement)
+        solution.resolution_time += initial.resolution_time
+        return solution
+    
+    def _search(
+        self,
+        should_stop: Optional[Callable[[], bool]] = None,
+        on_improvement: Optional[Callable[[Solution], None]] = None
+    ) -> Solution:
+        """Boucle destruction / réparation depuis l'état courant (voir _load)"""
+        params = self.params
+        start = time.perf_counter()
+        
+        initial_cost = self.total_cost
+        current_cost = self.total_cost
+        best_cost = current_cost
+        best_routes = self._clone_routes()
+        
+        bound = compute_lower_bound(self.instance) if params.target_gap is not None else None
+        
+        t_start = -params.start_worsening * max(current_cost, 1.0) / math.log(0.5)
+        t_end = t_start * params.end_temperature_ratio
+        
+        d_weights = [1.0] * len(self.destroy_ops)
+        r_weights = [1.0] * len(self.repair_ops)
+        d_scores = [0.0] * len(self.destroy_ops)
+        r_scores = [0.0] * len(self.repair_ops)
+        d_uses = [0] * len(self.destroy_ops)
+        r_uses = [0] * len(self.repair_ops)
+        d_total = [0] * len(self.destroy_ops)
+        r_total = [0] * len(self.repair_ops)
+        
+        nb_deliveries = len(self._slots())
+        iteration = 0
+        
+        while True:
+            progress = self._progress(iteration, start)
+            if progress >= 1.0 or (should_stop and should_stop()):
+                break
+            if bound is not None and bound.gap(best_cost) <= params.target_gap:
+                break
+            
+            temperature = t_start * (t_end / t_start) ** progress
+            
+            d_idx = self._roulette(d_weights)
+            r_idx = self._roulette(r_weights)
+            
+            self._begin_move()
+            upper = min(params.max_removal, max(params.min_removal,
+                        int(params.max_removal_ratio * nb_deliveries)))
+            nb_remove = self.rng.randint(min(params.min_removal, upper), upper)
+            
+            requests = self.destroy_ops[d_idx][1](nb_remove)
+            repaired = self.repair_ops[r_idx][1](requests)
+            
+            score = 0.0
+            if repaired:
+                self._refresh_costs()
+                new_cost = self.total_cost
+                delta = new_cost - current_cost
+                
+                if new_cost < best_cost - 1e-9:
+                    score = params.score_best
+                elif delta < -1e-9:
+                    score = params.score_better
+                
+                accepted = delta < 0 or self.rng.random() < math.exp(-delta / max(temperature, 1e-12))
+                if accepted and score == 0.0 and delta > 1e-9:
+                    score = params.score_accepted
+            else:
+                accepted = False
+            
+            if accepted:
+                self._commit_move()
+                current_cost = new_cost
+                if current_cost < best_cost - 1e-9:
+                    best_cost = current_cost
+                    best_routes = self._clone_routes()
+                    if on_improvement:
+                        on_improvement(self._build_solution(best_routes, time.perf_counter() - start))
+            else:
+                self._rollback_move()
+            
+            # Mise à jour des poids adaptatifs
+            d_scores[d_idx] += score
+            r_scores[r_idx] += score
+            d_uses[d_idx] += 1
+            r_uses[r_idx] += 1
+            d_total[d_idx] += 1
+            r_total[r_idx] += 1
+            
+            iteration += 1
+            if iteration % params.segment_length == 0:
+                self._update_weights(d_weights, d_scores, d_uses)
+                self._update_weights(r_weights, r_scores, r_uses)
+            if telemetry.due('operators'):
+                self._emit_operators(iteration, start, current_cost, best_cost, temperature,
+                                     d_weights, r_weights, d_total, r_total)
+                telemetry.sample_memory(iteration=iteration)
+        
+        elapsed = time.perf_counter() - start
+        self.stats = {
+            'iterations': iteration,
+            'elapsed': elapsed,
+            'iterations_per_second': iteration / elapsed if elapsed > 0 else 0.0,
+            'initial_cost': initial_cost,
+            'best_cost': best_cost,
+            'destroy_weights': {name: w for (name, _), w in zip(self.destroy_ops, d_weights)},
+            'repair_weights': {name: w for (name, _), w in zip(self.repair_ops, r_weights)},
+            'destroy_uses': {name: n for (name, _), n in zip(self.destroy_ops, d_total)},
+            'repair_uses': {name: n for (name, _), n in zip(self.repair_ops, r_total)},
+        }
+        
+        if telemetry.enabled():
+            self._emit_operators(iteration, start, current_cost, best_cost, None,
+                                 d_weights, r_weights, d_total, r_total, final=True)
+        
+        return self._build_solution(best_routes, elapsed)
+    
+    def _emit_operators(self, iteration, start, current_cost, best_cost, temperature,
+                        d_weights, r_weights, d_total, r_total, final=False):
+        """Événement de télémétrie: poids et usages des opérateurs"""
+        elapsed = time.perf_counter() - start
+        telemetry.emit(
+            'operators',
+            iteration=iteration,
+            iterations_per_second=round(iteration / elapsed, 1) if elapsed > 0 else 0.0,
+            current_cost=current_cost,
+            best_cost=best_cost,
+            temperature=temperature,
+            destroy={name: {'weight': round(w, 4), 'uses': n}
+                     for (name, _), w, n in zip(self.destroy_ops, d_weights, d_total)},
+            repair={name: {'weight': round(w, 4), 'uses': n}
+                    for (name, _), w, n in zip(self.repair_ops, r_weights, r_total)},
+            final=final
+        )
+    
+    def _progress(self, iteration: int, start: float) -> float:
+        """Avancement dans [0, 1] selon le budget d'itérations et/ou de temps"""
+        progress = 0.0
+        if self.params.iterations:
+            progress = iteration / self.params.iterations
+        if self.params.time_limit:
+            progress = max(progress, (time.perf_counter() - start) / self.params.time_limit)
+        return progress
+    
+    def _roulette(self, weights: List[float]) -> int:
+        """Sélection proportionnelle aux poids"""
+        r = self.rng.random() * sum(weights)
+        for i, w in enumerate(weights):
+            r -= w
+            if r <= 0:
+                return i
+        return len(weights) - 1
+    
+    def _update_weights(self, weights: List[float], scores: List[float], uses: List[int]):
+        """Lissage des poids en fin de segment"""
+        reaction = self.params.reaction
+        for i in range(len(weights)):
+            if uses[i]:
+                weights[i] = max(0.05, (1 - reaction) * weights[i] + reaction * scores[i] / uses[i])
+            scores[i] = 0.0
+            uses[i] = 0
+    
+    # ------------------------------------------------------------------
+    # État courant et caches
+    # ------------------------------------------------------------------
+    
+    def _load(self, solution: Solution):
+        """Initialise l'état interne (une route par véhicule, stocks restants)"""
+        by_vehicle = {r.vehicle_id: r for r in solution.routes}
+        self.routes: List[VehicleRoute] = []
+        for v in self.vehicles:
+            route = by_vehicle.get(v.id)
+            if route is None:
+                route = VehicleRoute(v.id, v.home_garage, v.initial_product - 1)
+            self.routes.append(self._clone_route(route))
+        
+        # Stock restant (dépôt, produit)
+        self.slack = {d.id: list(d.stocks) for d in self.instance.depots}
+        for route in self.routes:
+            for mr in route.mini_routes:
+                self.slack[mr.depot_id][mr.product] -= mr.quantity_loaded
+        
+        # Cache des coûts par route: seules les routes modifiées sont recalculées
+        # (au chargement, lecture directe de la matrice: aucune ligne convertie)
+        self.route_costs = [self._route_cost(r, self.matrix) for r in self.routes]
+        self.total_cost = sum(d + t for d, t in self.route_costs)
+        self.versions = [0] * len(self.routes)
+        self._index_cache = {}
+        self._dirty = set()
+        self._backup = {}
+        self._slack_backup = None
+        self.focus = None
+        self.scope: Optional[List[int]] = None
+    
+    def _route_cost(self, route: VehicleRoute, dist=None) -> Tuple[float, float]:
+        """(distance, coût de transition) d'une route, par la matrice (défaut: self.dist)"""
+        if not route.mini_routes:
+            return 0.0, 0.0
+        
+        dist = self.dist if dist is None else dist
+        garage = self.instance.garage_node(route.home_garage)
+        prev = garage
+        product = route.initial_product
+        distance = 0.0
+        transition = 0.0
+        
+        for mr in route.mini_routes:
+            depot = self.depot_nodes[mr.depot_id]
+            distance += dist[prev][depot]
+            prev = depot
+            if mr.product != product:
+                transition += self.trans[product][mr.product]
+                product = mr.product
+            for dl in mr.deliveries:
+                node = self.station_nodes[dl.station_id]
+                distance += dist[prev][node]
+                prev = node
+        
+        distance += dist[prev][garage]
+        return float(distance), transition
+    
+    def _begin_move(self):
+        """Début d'un mouvement: sauvegardes paresseuses"""
+        self._backup = {}
+        self._dirty = set()
+        self._slack_backup = {d: list(s) for d, s in self.slack.items()}
+    
+    def _touch(self, v: int):
+        """Marque la route v comme modifiée (sauvegarde avant la 1re modification)"""
+        if v not in self._backup:
+            self._backup[v] = self._clone_route(self.routes[v])
+        self._dirty.add(v)
+        self.versions[v] += 1
+    
+    def _refresh_costs(self):
+        """Recalcule le coût des seules routes modifiées"""
+        for v in self._dirty:
+            old_d, old_t = self.route_costs[v]
+            self.route_costs[v] = self._route_cost(self.routes[v])
+            new_d, new_t = self.route_costs[v]
+            self.total_cost += (new_d + new_t) - (old_d + old_t)
+        self._dirty = set()
+    
+    def _commit_move(self):
+        self._backup = {}
+        self._slack_backup = None
+    
+    def _rollback_move(self):
+        """Restaure les routes et stocks d'avant le mouvement"""
+        for v, route in self._backup.items():
+            self.routes[v] = route
+            self.versions[v] += 1
+            old_d, old_t = self.route_costs[v]
+            self.route_costs[v] = self._route_cost(route)
+            new_d, new_t = self.route_costs[v]
+            self.total_cost += (new_d + new_t) - (old_d + old_t)
+        self.slack = self._slack_backup
+        self._backup = {}
+        self._dirty = set()
+    
+    @staticmethod
+    def _clone_route(route: VehicleRoute) -> VehicleRoute:
+        return VehicleRoute(
+            vehicle_id=route.vehicle_id,
+            home_garage=route.home_garage,
+            initial_product=route.initial_product,
+            mini_routes=[
+                MiniRoute(mr.product, mr.depot_id, mr.quantity_loaded,
+                          [Delivery(d.station_id, d.quantity) for d in mr.deliveries])
+                for mr in route.mini_routes
+            ]
+        )
+    
+    def _clone_routes(self) -> List[VehicleRoute]:
+        """Copie des routes; celles hors de self.scope, jamais modifiées, sont partagées"""
+        routes = list(self.routes)
+        for v in self._scope():
+            routes[v] = self._clone_route(routes[v])
+        return routes
+    
+    def _scope(self) -> Iterable[int]:
+        """Indices des routes modifiables"""
+        return range(len(self.routes)) if self.scope is None else self.scope
+    
+    def _build_solution(self, routes: List[VehicleRoute], elapsed: float) -> Solution:
+        """
+        Solution (routes non vides), métriques par la matrice (mêmes valeurs
+        que compute_metrics); les routes hors de self.scope, inchangées depuis
+        _load, reprennent leur coût en cache
+        """
+        solution = Solution(instance=self.instance, resolution_time=elapsed)
+        scope = None if self.scope is None else set(self.scope)
+        for v, route in enumerate(routes):
+            if not route.mini_routes:
+                continue
+            clone = self._clone_route(route)
+            costs = self._route_cost(route) if scope is None or v in scope else self.route_costs[v]
+            clone.total_distance, clone.total_transition_cost = costs
+            solution.routes.append(clone)
+        return solution
+    
+    def _slots(self) -> List[_Slot]:
+        """Livraisons de la solution courante (stations de self.focus si défini)"""
+        return [
+            _Slot(v, mr, dl)
+            for v in self._scope()
+            for mr in self.routes[v].mini_routes
+            for dl in mr.deliveries
+            if self.focus is None or dl.station_id in self.focus
+        ]
+    
+    def _remove(self, slot: _Slot) -> Request:
+        """Retire une livraison (et sa mini-route si elle devient vide)"""
+        self._touch(slot.vehicle)
+        route = self.routes[slot.vehicle]
+        
+        mr = slot.mini_route
+        mr.deliveries = [d for d in mr.deliveries if d is not slot.delivery]
+        mr.quantity_loaded -= slot.delivery.quantity
+        self.slack[mr.depot_id][mr.product] += slot.delivery.quantity
+        if not mr.deliveries:
+            route.mini_routes = [m for m in route.mini_routes if m is not mr]
+        
+        return Request(slot.delivery.station_id, mr.product, slot.delivery.quantity)
+    
+    # ------------------------------------------------------------------
+    # Opérateurs de destruction
+    # ------------------------------------------------------------------
+    
+    def _destroy_random(self, count: int) -> List[Request]:
+        """Retrait aléatoire"""
+        slots = self._slots()
+        chosen = self.rng.sample(slots, min(count, len(slots)))
+        return [self._remove(s) for s in chosen]
+    
+    def _removal_savings(self, vehicles: Optional[Iterable[int]] = None) -> List[Tuple[float, _Slot]]:
+        """Gain en distance du retrait de chaque livraison des routes vehicles (défaut: self.scope)"""
+        dist = self.dist
+        savings = []
+        focus = self.focus
+        for v in (self._scope() if vehicles is None else vehicles):
+            garage = self.garage_nodes[v]
+            mrs = self.routes[v].mini_routes
+            for k, mr in enumerate(mrs):
+                prev = self.depot_nodes[mr.depot_id]
+                after = self.depot_nodes[mrs[k + 1].depot_id] if k + 1 < len(mrs) else garage
+                nodes = [self.station_nodes[d.station_id] for d in mr.deliveries]
+                for i, dl in enumerate(mr.deliveries):
+                    node = nodes[i]
+                    nxt = nodes[i + 1] if i + 1 < len(nodes) else after
+                    if focus is None or dl.station_id in focus:
+                        gain = dist[prev][node] + dist[node][nxt] - dist[prev][nxt]
+                        savings.append((gain, _Slot(v, mr, dl)))
+                    prev = node
+        return savings
+    
+    def _destroy_worst(self, count: int) -> List[Request]:
+        """
+        Retrait des livraisons les plus coûteuses en distance (randomisé).
+        
+        Les gains sont calculés une fois; après chaque retrait, seuls ceux de
+        la route modifiée sont recalculés (les autres restent exacts).
+        """
+        def key(entry):
+            return -entry[0]
+        
+        savings = sorted(self._removal_savings(), key=key)
+        requests = []
+        for _ in range(count):
+            if not savings:
+                break
+            idx = int(len(savings) * self.rng.random() ** self.params.determinism)
+            v = savings[idx][1].vehicle
+            requests.append(self._remove(savings[idx][1]))
+            # Liste presque triée: la fusion par sorted() est quasi linéaire
+            savings = [entry for entry in savings if entry[1].vehicle != v]
+            savings = sorted(savings + self._removal_savings((v,)), key=key)
+        return requests
+    
+    def _destroy_related(self, count: int) -> List[Request]:
+        """Retrait de livraisons géographiquement proches d'une livraison graine"""
+        slots = self._slots()
+        if not slots:
+            return []
+        
+        seed = self.rng.choice(slots)
+        seed_id = seed.delivery.station_id
+        
+        close = []
+        if self.near is not None:
+            rank = {sid: r for r, sid in enumerate(self.near[seed_id], 1)}
+            rank[seed_id] = 0
+            close = [s for s in slots if s.delivery.station_id in rank]
+        
+        if len(close) >= count:
+            close.sort(key=lambda s: rank[s.delivery.station_id])
+            slots = close
+        else:
+            # Repli: tri complet par distance à la graine
+            row = self.dist[self.station_nodes[seed_id]]
+            slots.sort(key=lambda s: row[self.station_nodes[s.delivery.station_id]])
+        
+        chosen = []
+        remaining = slots
+        while remaining and len(chosen) < count:
+            idx = int(len(remaining) * self.rng.random() ** self.params.determinism)
+            chosen.append(remaining.pop(idx))
+        return [self._remove(s) for s in chosen]
+    
+    def _destroy_product(self, count: int) -> List[Request]:
+        """Retrait de mini-routes entières d'un même produit"""
+        by_product: Dict[int, List[Tuple[int, MiniRoute]]] = {}
+        for v in self._scope():
+            for mr in self.routes[v].mini_routes:
+                if self.focus is None or any(d.station_id in self.focus for d in mr.deliveries):
+                    by_product.setdefault(mr.product, []).append((v, mr))
+        if not by_product:
+            return []
+        
+        product = self.rng.choice(sorted(by_product))
+        candidates = by_product[product]
+        self.rng.shuffle(candidates)
+        
+        requests = []
+        for v, mr in candidates:
+            if len(requests) >= count:
+                break
+            for dl in list(mr.deliveries):
+                if self.focus is None or dl.station_id in self.focus:
+                    requests.append(self._remove(_Slot(v, mr, dl)))
+        return requests
+    
+    # ------------------------------------------------------------------
+    # Opérateurs de réparation
+    # ------------------------------------------------------------------
+    
+    def _candidate_routes(self) -> List[int]:
+        """
+        Routes non vides + un véhicule vide (le plus capacitaire) par
+        garage/produit initial, parmi les routes de self.scope
+        """
+        candidates = []
+        empty: Dict[Tuple[int, int], int] = {}
+        for v in self._scope():
+            route = self.routes[v]
+            if route.mini_routes:
+                candidates.append(v)
+            else:
+                key = (route.home_garage, route.initial_product)
+                if key not in empty or self.capacity[v] > self.capacity[empty[key]]:
+                    empty[key] = v
+        return candidates + list(empty.values())
+    
+    def _t(self, a: Optional[int], b: Optional[int]) -> float:
+        if a is None or b is None or a == b:
+            return 0.0
+        return self.trans[a][b]
+    
+    def _route_index(self, v: int) -> Dict[int, List[int]]:
+        """Index station -> mini-routes de la route v (reconstruit si la route a changé)"""
+        entry = self._index_cache.get(v)
+        if entry is not None and entry[0] == self.versions[v]:
+            return entry[1]
+        index: Dict[int, List[int]] = {}
+        for k, mr in enumerate(self.routes[v].mini_routes):
+            for dl in mr.deliveries:
+                index.setdefault(dl.station_id, []).append(k)
+        self._index_cache[v] = (self.versions[v], index)
+        return index
+    
+    def _best_insertion(self, v: int, req: Request, full: bool = False) -> Tuple[float, Optional[tuple]]:
+        """
+        Meilleure insertion d'une livraison dans la route v.
+        
+        Avec les listes de voisins, seules les mini-routes visitant une voisine
+        de la station (et les positions qui les entourent) sont évaluées;
+        full=True force le parcours complet.
+        
+        Mouvements:
+        - ('merge', k): la mini-route k visite déjà la station
+        - ('insert', k, i): insertion en position i de la mini-route k
+        - ('new', k, depot_id): nouvelle mini-route en position k
+        """
+        q = req.quantity
+        cap = self.capacity[v]
+        if q > cap:
+            return INF, None
+        
+        dist = self.dist
+        p = req.product
+        s = self.station_nodes[req.station_id]
+        route = self.routes[v]
+        mrs = route.mini_routes
+        garage = self.garage_nodes[v]
+        depots = [(d, self.depot_nodes[d]) for d, st in self.slack.items() if st[p] >= q]
+        
+        if full or self.near is None:
+            near_ks = range(len(mrs))
+            new_ks = range(len(mrs) + 1)
+        else:
+            index = self._route_index(v)
+            found = set(index.get(req.station_id, ()))
+            for station_id in self.near[req.station_id]:
+                found.update(index.get(station_id, ()))
+            near_ks = sorted(found)
+            new_ks = sorted(found | {k + 1 for k in found} | {0, len(mrs)})
+        
+        best_cost, best_move = INF, None
+        
+        # Nouvelle mini-route entre k-1 et k
+        if depots:
+            for k in new_ks:
+                if k > 0:
+                    prev_end = self.station_nodes[mrs[k - 1].deliveries[-1].station_id]
+                    prev_p = mrs[k - 1].product
+                else:
+                    prev_end, prev_p = garage, route.initial_product
+                if k < len(mrs):
+                    next_start, next_p = self.depot_nodes[mrs[k].depot_id], mrs[k].product
+                else:
+                    next_start, next_p = garage, None
+                
+                base = dist[prev_end][next_start]
+                t_delta = self._t(prev_p, p) + self._t(p, next_p) - self._t(prev_p, next_p)
+                row_prev = dist[prev_end]
+                to_next = dist[s][next_start]
+                for depot_id, dn in depots:
+                    c = row_prev[dn] + dist[dn][s] + to_next - base + t_delta
+                    if c < best_cost:
+                        best_cost, best_move = c, ('new', k, depot_id)
+        
+        # Insertion dans une mini-route existante du même produit
+        for k in near_ks:
+            mr = mrs[k]
+            if (mr.product != p or mr.quantity_loaded + q > cap
+                    or self.slack[mr.depot_id][p] < q):
+                continue
+            if any(d.station_id == req.station_id for d in mr.deliveries):
+                return 0.0, ('merge', k)
+            after = self.depot_nodes[mrs[k + 1].depot_id] if k + 1 < len(mrs) else garage
+            prev = self.depot_nodes[mr.depot_id]
+            for i, dl in enumerate(mr.deliveries):
+                node = self.station_nodes[dl.station_id]
+                c = dist[prev][s] + dist[s][node] - dist[prev][node]
+                if c < best_cost:
+                    best_cost, best_move = c, ('insert', k, i)
+                prev = node
+            c = dist[prev][s] + dist[s][after] - dist[prev][after]
+            if c < best_cost:
+                best_cost, best_move = c, ('insert', k, len(mr.deliveries))
+        
+        return best_cost, best_move
+    
+    def _apply(self, v: int, req: Request, move: tuple):
+        """Applique un mouvement d'insertion"""
+        self._touch(v)
+        route = self.routes[v]
+        kind, k = move[0], move[1]
+        
+        if kind == 'new':
+            mr = MiniRoute(req.product, move[2], 0)
+            route.mini_routes.insert(k, mr)
+        else:
+            mr = route.mini_routes[k]
+        
+        if kind == 'merge':
+            target = next(d for d in mr.deliveries if d.station_id == req.station_id)
+            target.quantity += req.quantity
+        elif kind == 'insert':
+            mr.deliveries.insert(move[2], Delivery(req.station_id, req.quantity))
+        else:
+            mr.deliveries.append(Delivery(req.station_id, req.quantity))
+        
+        mr.quantity_loaded += req.quantity
+        self.slack[mr.depot_id][req.product] -= req.quantity
+    
+    def _cached_insertion(self, cache, r: int, v: int, req: Request,
+                          depots: tuple) -> Tuple[float, Optional[tuple]]:
+        """
+        Insertion mise en cache: (requête, route) -> (version, dépôts, coût, mouvement).
+        
+        L'entrée reste valide tant que la route n'a pas changé et que l'ensemble
+        des dépôts pouvant fournir la quantité (depots) est le même.
+        """
+        entry = cache.get((r, v))
+        if entry is not None and entry[0] == self.versions[v] and entry[1] == depots:
+            return entry[2], entry[3]
+        cost, move = self._best_insertion(v, req)
+        cache[(r, v)] = (self.versions[v], depots, cost, move)
+        return cost, move
+    
+    def _slack_key(self, req: Request) -> tuple:
+        """Dépôts pouvant servir la requête (les stocks changent d'une route à l'autre)"""
+        return tuple(d for d, st in self.slack.items() if st[req.product] >= req.quantity)
+    
+    def _repair_greedy(self, requests: List[Request]) -> bool:
+        """Insère à chaque pas la requête la moins chère à sa meilleure position"""
+        return self._repair(requests, regret=False)
+    
+    def _repair_regret(self, requests: List[Request]) -> bool:
+        """Insère à chaque pas la requête de plus grand regret-2"""
+        return self._repair(requests, regret=True)
+    
+    def _repair(self, requests: List[Request], regret: bool) -> bool:
+        pending = list(range(len(requests)))
+        self.rng.shuffle(pending)
+        cache: Dict = {}
+        
+        while pending:
+            candidates = self._candidate_routes()
+            best_key = None
+            best_choice = None
+            
+            for r in pending:
+                req = requests[r]
+                depots = self._slack_key(req)
+                first = (INF, None, None)
+                second = INF
+                for v in candidates:
+                    cost, move = self._cached_insertion(cache, r, v, req, depots)
+                    if cost < first[0]:
+                        second = first[0]
+                        first = (cost, v, move)
+                    elif cost < second:
+                        second = cost
+                
+                if first[1] is None:
+                    # Repli: parcours complet des routes
+                    for v in candidates:
+                        cost, move = self._best_insertion(v, req, full=True)
+                        if cost < first[0]:
+                            second = first[0]
+                            first = (cost, v, move)
+                        elif cost < second:
+                            second = cost
+                    if first[1] is None:
+                        return False
+                
+                if regret:
+                    # Plus grand regret d'abord; départage par le coût
+                    key = (-(second - first[0]) if second < INF else -INF, first[0])
+                else:
+                    key = (first[0],)
+                
+                if best_key is None or key < best_key:
+                    best_key = key
+                    best_choice = (r, first[1], first[2])
+            
+            r, v, move = best_choice
+            self._apply(v, requests[r], move)
+            pending.remove(r)
+        
+        return True
+
+
+def alns_improver(params: Optional[ALNSParams] = None, restarts: int = 1):
+    """
+    Adaptateur pour AnytimeSolver: ALNS depuis l'incumbent du pilote.
+    
+    Avec restarts > 1 et un pool élite sur le pilote, le budget (temps ou
+    itérations) est partagé entre plusieurs ALNS, chacun repartant d'une
+    solution tirée dans le pool; la solution finale de chaque ALNS y est
+    proposée.
+    """
+    def improve(driver):
+        base = params or ALNSParams(iterations=None)
+        nb_runs = max(1, restarts)
+        for k in range(nb_runs):
+            if driver.should_stop():
+                break
+            run_params = replace(base)
+            if run_params.seed is None:
+                run_params.seed = driver.rng.randrange(2 ** 31)
+            elif k:
+                run_params.seed = base.seed + k
+            if run_params.iterations is not None:
+                run_params.iterations = max(1, run_params.iterations // nb_runs)
+            if run_params.time_limit is None and driver.time_limit is not None:
+                # Le recuit s'étale sur la part restante du budget
+                run_params.time_limit = driver.remaining() / (nb_runs - k)
+            elif run_params.time_limit is not None:
+                run_params.time_limit = run_params.time_limit / nb_runs
+            
+            start = driver.best
+            if k and driver.elite is not None and len(driver.elite):
+                start = driver.elite.seed(driver.rng)
+            
+            engine = ALNS(driver.instance, run_params)
+            final = engine.run(
+                start,
+                should_stop=driver.should_stop,
+                on_improvement=lambda sol: driver.offer(sol, source="alns")
+            )
+            driver.offer(final, source="alns")
+            driver.engine_stats = _merge_stats(driver.engine_stats if k else {}, engine.stats)
+    return improve
+
+
+def _merge_stats(previous: dict, stats: dict) -> dict:
+    """Cumule les statistiques de plusieurs ALNS successifs"""
+    if not previous:
+        return dict(stats)
+    merged = dict(stats)
+    merged['iterations'] = previous['iterations'] + stats['iterations']
+    merged['elapsed'] = previous['elapsed'] + stats['elapsed']
+    merged['initial_cost'] = previous['initial_cost']
+    merged['best_cost'] = min(previous['best_cost'], stats['best_cost'])
+    merged['iterations_per_second'] = (
+        merged['iterations'] / merged['elapsed'] if merged['elapsed'] > 0 else 0.0
+    )
+    return merged
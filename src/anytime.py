@@ -0,0 +1,257 @@
+"""
+Résolution anytime avec budget de temps
+Maintient une solution incumbente valide, écrite atomiquement à chaque amélioration
+"""
+
+import json
+import multiprocessing
+import random
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, CancelledError, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+from models import Instance, Solution
+from solver_simple import SimpleSolver, DEFAULT_K_NEIGHBORS
+from solution_writer import write_solution
+from validator import validate_solution
+from bounds import compute_lower_bound
+from elite_pool import ElitePool
+from route_pool import RoutePool
+from shared_instance import SharedInstance, init_worker, worker_instance
+import telemetry
+
+
+# Un "improver" reçoit le pilote et propose des solutions via driver.offer()
+# tant que driver.should_stop() est faux.
+Improver = Callable[['AnytimeSolver'], None]
+
+
+def multi_start_improver(driver: 'AnytimeSolver'):
+    """Redémarrages gloutons aléatoires (poids changeover et ordre des véhicules)"""
+    while not driver.should_stop():
+        weight = driver.rng.uniform(0.0, 2.0 * max(driver.changeover_weight, 0.5))
+        solver = SimpleSolver(driver.instance, weight, rng=driver.rng)
+        driver.offer(solver.solve(), source="multi_start")
+
+
+def _greedy_restart(weight: float, seed: int):
+    """Tâche worker: glouton aléatoire sur l'instance partagée, retourne les routes"""
+    solver = SimpleSolver(worker_instance(), weight, rng=random.Random(seed))
+    return solver.solve().routes
+
+
+def parallel_multi_start_improver(n_workers: int, mp_context: str = "spawn") -> Improver:
+    """
+    Redémarrages gloutons aléatoires répartis sur n_workers processus.
+    
+    L'instance et ses précalculs sont publiés une fois en mémoire partagée;
+    les workers s'y attachent sans copie et ne renvoient que des routes.
+    """
+    def improve(driver: 'AnytimeSolver'):
+        with SharedInstance(driver.instance, k_neighbors=DEFAULT_K_NEIGHBORS) as shared:
+            driver.memory_report = shared.memory_report(n_workers)
+            pool = ProcessPoolExecutor(
+                max_workers=n_workers,
+                mp_context=multiprocessing.get_context(mp_context),
+                initializer=init_worker,
+                initargs=(shared.handle,)
+            )
+            pending = set()
+            stopped = False
+            try:
+                while not stopped and not driver.should_stop():
+                    while len(pending) < n_workers:
+                        weight = driver.rng.uniform(0.0, 2.0 * max(driver.changeover_weight, 0.5))
+                        pending.add(pool.submit(_greedy_restart, weight, driver.rng.randrange(2 ** 31)))
+                    
+                    # Attente bornée pour surveiller l'échéance et les interruptions
+                    done, pending = wait(pending, timeout=min(0.5, driver.remaining()),
+                                         return_when=FIRST_COMPLETED)
+                    for future in done:
+                        try:
+                            routes = future.result()
+                        except (CancelledError, KeyboardInterrupt):
+                            # Tâche annulée ou worker interrompu: on s'arrête sur l'incumbent
+                            stopped = True
+                            continue
+                        driver.offer(Solution(instance=driver.instance, routes=routes),
+                                     source="multi_start")
+            except BrokenProcessPool as e:
+                pool.shutdown(wait=False, cancel_futures=True)
+                if not driver.should_stop():
+                    print(f"\n⚠️  Workers indisponibles ({e}), redémarrages séquentiels")
+                    multi_start_improver(driver)
+            finally:
+                pool.shutdown(wait=True, cancel_futures=True)
+    return improve
+
+
+class AnytimeSolver:
+    """Pilote anytime: améliore l'incumbent jusqu'à l'échéance ou un SIGINT"""
+    
+    def __init__(
+        self,
+        instance: Instance,
+        output_path: Optional[Union[str, Path]] = None,
+        time_limit: Optional[float] = 60.0,
+        trace_path: Optional[Union[str, Path]] = None,
+        changeover_weight: float = 0.5,
+        seed: Optional[int] = None,
+        improver: Optional[Improver] = None,
+        target_gap: Optional[float] = None,
+        elite: Optional[ElitePool] = None,
+        route_pool: Optional[RoutePool] = None
+    ):
+        self.instance = instance
+        self.output_path = Path(output_path) if output_path else None
+        self.time_limit = time_limit
+        self.trace_path = Path(trace_path) if trace_path else None
+        self.changeover_weight = changeover_weight
+        self.rng = random.Random(seed)
+        self.improver = improver or multi_start_improver
+        
+        # Arrêt anticipé quand l'écart à la borne inférieure est assez petit
+        self.target_gap = target_gap
+        self.lower_bound = compute_lower_bound(instance) if target_gap is not None else None
+        
+        # Pool élite alimenté par les solutions proposées (points de départ des redémarrages)
+        self.elite = elite
+        
+        # Pool de mini-routes: toutes les solutions proposées y sont récoltées
+        self.route_pool = route_pool
+        
+        self.best: Optional[Solution] = None
+        self.best_cost = float('inf')
+        self.nb_improvements = 0
+        self.engine_stats = {}
+        self.memory_report = {}
+        
+        self._start = 0.0
+        self._deadline = 0.0
+        self._interrupted = False
+        self._trace_file = None
+        self._previous_sigint = None
+    
+    def solve(self, initial: Optional[Solution] = None) -> Solution:
+        """
+        Résout l'instance dans le budget de temps.
+        
+        Args:
+            initial: Solution de départ (sinon construite par SimpleSolver)
+        
+        Returns:
+            Solution: Meilleure solution valide trouvée
+        """
+        self._start = time.perf_counter()
+        self._deadline = self._start + self.time_limit if self.time_limit is not None else float('inf')
+        self._interrupted = False
+        
+        sigint_installed = self._install_sigint_handler()
+        
+        if self.trace_path:
+            self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+            self._trace_file = open(self.trace_path, 'w')
+        
+        try:
+            if initial is None:
+                initial = SimpleSolver(self.instance, self.changeover_weight).solve()
+            self.offer(initial, source="initial")
+            
+            if not self.should_stop():
+                self.improver(self)
+        finally:
+            if self._trace_file:
+                self._trace_file.close()
+                self._trace_file = None
+            if sigint_installed:
+                signal.signal(signal.SIGINT, self._previous_sigint)
+        
+        if self.best is None:
+            raise RuntimeError("Aucune solution valide trouvée dans le temps imparti")
+        
+        return self.best
+    
+    def elapsed(self) -> float:
+        """Temps écoulé depuis le début de la résolution"""
+        return time.perf_counter() - self._start
+    
+    def remaining(self) -> float:
+        """Temps restant avant l'échéance"""
+        return max(0.0, self._deadline - time.perf_counter())
+    
+    def should_stop(self) -> bool:
+        """Échéance atteinte, interruption demandée ou écart cible atteint?"""
+        if self._interrupted or time.perf_counter() >= self._deadline:
+            return True
+        return (self.lower_bound is not None and self.best is not None
+                and self.lower_bound.gap(self.best_cost) <= self.target_gap)
+    
+    def offer(self, solution: Solution, source: str = "") -> bool:
+        """
+        Propose une solution candidate.
+        
+        Elle devient l'incumbent si elle est valide et strictement meilleure;
+        elle est alors écrite atomiquement et tracée. Les solutions valides
+        sont aussi proposées au pool élite, s'il y en a un; toutes les
+        candidates sont récoltées dans le pool de mini-routes.
+        
+        Returns:
+            bool: True si l'incumbent a été amélioré
+        """
+        if self.route_pool is not None:
+            self.route_pool.add(solution)
+        cost = solution.total_cost()
+        improves = cost < self.best_cost
+        if not improves and (self.elite is None or not self.elite.accepts_cost(cost)):
+            return False
+        
+        validation_start = time.perf_counter()
+        is_valid, _ = validate_solution(solution)
+        telemetry.timing('validation', time.perf_counter() - validation_start)
+        if not is_valid:
+            return False
+        
+        if self.elite is not None:
+            self.elite.add(solution)
+        if not improves:
+            return False
+        
+        elapsed = self.elapsed()
+        self.best = solution.copy()
+        self.best.resolution_time = elapsed
+        self.best_cost = cost
+        self.nb_improvements += 1
+        if self.route_pool is not None:
+            self.route_pool.protect(self.best)
+        
+        if self.output_path:
+            write_solution(self.best, self.output_path)
+        
+        telemetry.emit('incumbent', cost=cost, source=source, elapsed=round(elapsed, 4),
+                       improvement=self.nb_improvements)
+        telemetry.sample_memory()
+        
+        if self._trace_file:
+            record = {"time": round(elapsed, 4), "cost": cost, "source": source}
+            self._trace_file.write(json.dumps(record) + "\n")
+            self._trace_file.flush()
+        
+        return True
+    
+    def _install_sigint_handler(self) -> bool:
+        """Premier SIGINT: arrêt propre. Second SIGINT: interruption immédiate."""
+        if threading.current_thread() is not threading.main_thread():
+            return False
+        
+        def handler(signum, frame):
+            if self._interrupted:
+                raise KeyboardInterrupt
+            self._interrupted = True
+        
+        self._previous_sigint = signal.getsignal(signal.SIGINT) or signal.default_int_handler
+        signal.signal(signal.SIGINT, handler)
+        return True
@@ -0,0 +1,157 @@
+"""
+Évaluation vectorisée d'un lot de solutions
+Les solutions sont aplaties en séquences de visites (nœuds) et de produits,
+complétées à taille fixe, puis évaluées par gathers et réductions NumPy.
+
+Les sommes sont séquentielles (cumsum) et suivent l'ordre de compute_metrics
+puis de Solution.total_*: les résultats sont identiques au bit près à
+Solution.total_cost() (tests/test_batch_eval.py).
+
+API autonome, pour scripts et analyses qui comparent beaucoup de solutions
+d'une même instance: les solveurs n'en dépendent pas, ils évaluent une
+solution à la fois (compute_metrics) au fil de sa construction.
+"""
+
+from dataclasses import dataclass
+from typing import List, Sequence
+
+import numpy as np
+
+from models import Instance, Solution
+
+
+@dataclass
+class VisitBatch:
+    """
+    Lot de solutions sous forme de séquences complétées.
+    
+    nodes[s, r, :]    nœuds visités par la route r de la solution s
+                      (garage, dépôt, stations, ..., garage), complétés en
+                      répétant le dernier nœud (tronçons de longueur nulle)
+    products[s, r, :] produit initial puis produit de chaque mini-route,
+                      complétés en répétant le dernier produit (sans transition)
+    Les routes absentes (solutions ayant moins de routes) sont entièrement
+    complétées et contribuent 0.
+    """
+    nodes: np.ndarray
+    products: np.ndarray
+    nb_mini_routes: np.ndarray
+    
+    @property
+    def nb_solutions(self) -> int:
+        return self.nodes.shape[0]
+
+
+@dataclass
+class BatchCosts:
+    """Coûts d'un lot de solutions (un élément par solution)"""
+    distance: np.ndarray
+    transition_cost: np.ndarray
+    transitions: np.ndarray
+    vehicles_used: np.ndarray
+    route_distance: np.ndarray
+    route_transition_cost: np.ndarray
+    
+    @property
+    def total_cost(self) -> np.ndarray:
+        return self.distance + self.transition_cost
+
+
+def encode_solutions(instance: Instance, solutions: Sequence[Solution]) -> VisitBatch:
+    """Aplatit les solutions en séquences de nœuds et de produits complétées"""
+    depot_nodes = {d.id: instance.depot_node(d.id) for d in instance.depots}
+    garage_nodes = {g.id: instance.garage_node(g.id) for g in instance.garages}
+    station_nodes = {s.id: instance.station_node(s.id) for s in instance.stations}
+    
+    node_seqs: List[List[List[int]]] = []
+    product_seqs: List[List[List[int]]] = []
+    max_routes, max_nodes, max_products = 1, 1, 1
+    
+    for solution in solutions:
+        sol_nodes, sol_products = [], []
+        for route in solution.routes:
+            garage = garage_nodes[route.home_garage]
+            seq = [garage]
+            products = [route.initial_product]
+            for mini_route in route.mini_routes:
+                seq.append(depot_nodes[mini_route.depot_id])
+                seq.extend(station_nodes[d.station_id] for d in mini_route.deliveries)
+                products.append(mini_route.product)
+            seq.append(garage)
+            
+            sol_nodes.append(seq)
+            sol_products.append(products)
+            max_nodes = max(max_nodes, len(seq))
+            max_products = max(max_products, len(products))
+        
+        node_seqs.append(sol_nodes)
+        product_seqs.append(sol_products)
+        max_routes = max(max_routes, len(sol_nodes))
+    
+    n = len(node_seqs)
+    nodes = np.zeros((n, max_routes, max_nodes), dtype=np.int32)
+    products = np.zeros((n, max_routes, max_products), dtype=np.int32)
+    nb_mini_routes = np.zeros((n, max_routes), dtype=np.int32)
+    
+    for s, (sol_nodes, sol_products) in enumerate(zip(node_seqs, product_seqs)):
+        for r, (seq, prods) in enumerate(zip(sol_nodes, sol_products)):
+            nodes[s, r, :len(seq)] = seq
+            nodes[s, r, len(seq):] = seq[-1]
+            products[s, r, :len(prods)] = prods
+            products[s, r, len(prods):] = prods[-1]
+            nb_mini_routes[s, r] = len(prods) - 1
+    
+    return VisitBatch(nodes, products, nb_mini_routes)
+
+
+def evaluate_batch(instance: Instance, batch: VisitBatch) -> BatchCosts:
+    """
+    Distance, coût et nombre de transitions de toutes les solutions du lot.
+    
+    Returns:
+        BatchCosts: Tableaux de taille nb_solutions (et nb_solutions x routes
+        pour les détails par route)
+    """
+    D = instance.distance_matrix()
+    T = np.asarray(instance.transition_costs, dtype=np.float64).reshape(
+        instance.nb_products, instance.nb_products
+    )
+    
+    # Distances des tronçons (complétion: tronçons i -> i de longueur nulle)
+    legs = D[batch.nodes[:, :, :-1], batch.nodes[:, :, 1:]]
+    route_distance = _sequential_sum(legs)
+    
+    # Transitions entre produits consécutifs
+    prev, cur = batch.products[:, :, :-1], batch.products[:, :, 1:]
+    changes = prev != cur
+    costs = np.where(changes, T[prev, cur], 0.0)
+    route_transition_cost = _sequential_sum(costs)
+    
+    return BatchCosts(
+        distance=_sequential_sum(route_distance),
+        transition_cost=_sequential_sum(route_transition_cost),
+        transitions=changes.sum(axis=(1, 2)),
+        vehicles_used=(batch.nb_mini_routes > 0).sum(axis=1),
+        route_distance=route_distance,
+        route_transition_cost=route_transition_cost
+    )
+
+
+def evaluate_solutions(solutions: Sequence[Solution]) -> BatchCosts:
+    """Encode puis évalue des solutions d'une même instance"""
+    if not solutions:
+        raise ValueError("Aucune solution à évaluer")
+    instance = solutions[0].instance
+    return evaluate_batch(instance, encode_solutions(instance, solutions))
+
+
+def _sequential_sum(values: np.ndarray) -> np.ndarray:
+    """
+    Somme sur le dernier axe dans l'ordre des éléments.
+    
+    np.sum utilise une sommation par paires; cumsum accumule de gauche à
+    droite comme les boucles Python, d'où des résultats identiques.
+    """
+    if values.shape[-1] == 0:
+        return np.zeros(values.shape[:-1], dtype=np.float64)
+    return np.cumsum(values, axis=-1)[..., -1]
@@ -0,0 +1,139 @@
+"""
+Bornes inférieures rapides et écart d'optimalité
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+
+from models import Instance, Solution
+
+
+@dataclass
+class LowerBound:
+    """Borne inférieure du coût total et ses composantes"""
+    trip_bound: float         # nb de tournées minimal x (arrivée au dépôt + dépôt -> station)
+    mst_bound: float          # arbres couvrants par produit + arrivées aux dépôts
+    radial_bound: float       # borne radiale: sum_s (r_in + r_out) * q_s / Q
+    return_bound: float       # retour au garage d'au moins un véhicule
+    changeover_bound: float   # entrées obligatoires dans les produits non initiaux
+    min_trips: Dict[int, int]
+    
+    @property
+    def distance(self) -> float:
+        return max(self.trip_bound + self.return_bound,
+                   self.mst_bound + self.return_bound,
+                   self.radial_bound)
+    
+    @property
+    def total(self) -> float:
+        return self.distance + self.changeover_bound
+    
+    def gap(self, cost: float) -> float:
+        """Écart relatif (coût - borne) / coût"""
+        if cost <= 0:
+            return 0.0
+        return max(0.0, (cost - self.total) / cost)
+
+
+def _mst_rooted(root_dist: np.ndarray, D, nodes: np.ndarray) -> float:
+    """
+    Prim O(n²) vectorisé sur les stations + une racine (dépôts contractés).
+    
+    Les distances entre stations sont lues ligne par ligne (pas de bloc n x n).
+    """
+    n = len(root_dist)
+    in_tree = np.zeros(n, dtype=bool)
+    best = root_dist.astype(np.float64, copy=True)
+    total = 0.0
+    for _ in range(n):
+        i = int(np.argmin(np.where(in_tree, np.inf, best)))
+        total += best[i]
+        in_tree[i] = True
+        best = np.minimum(best, D[nodes[i], nodes])
+    return total
+
+
+def compute_lower_bound(instance: Instance) -> LowerBound:
+    """
+    Borne inférieure du coût de toute solution réalisable (mise en cache).
+    
+    Distance:
+    - chaque mini-route du produit p arrive à un dépôt pourvu en p (depuis un
+      garage ou une station) et il en faut au moins ceil(demande_p / capacité_max);
+    - les trajets dépôt -> stations des mini-routes de p relient toutes les
+      stations demandant p à un dépôt: au moins l'arbre couvrant minimal où
+      les dépôts sont contractés en une racine;
+    - au moins un véhicule rentre au garage depuis une station;
+    - borne radiale: une tournée quitte un dépôt pourvu et finit à un dépôt ou
+      un garage, sa longueur dépasse donc r_in(s) + r_out(s) pour chacune de ses
+      stations, et au plus Q unités y sont livrées:
+      distance >= sum_s (r_in(s) + r_out(s)) * q_s / Q (retours inclus).
+    Changeover: chaque produit demandé qui n'est le produit initial d'aucun
+    véhicule impose au moins une transition entrante.
+    """
+    cached = instance._cache.get('lower_bound')
+    if cached is not None:
+        return cached
+    
+    D = instance.distance_matrix()
+    n_depots = len(instance.depots)
+    n_garages = len(instance.garages)
+    first_station = n_depots + n_garages
+    q_max = max(v.capacity for v in instance.vehicles)
+    
+    stock = np.array([d.stocks for d in instance.depots], dtype=np.int64).reshape(n_depots, -1)
+    demand = np.array([s.demands for s in instance.stations], dtype=np.int64).reshape(len(instance.stations), -1)
+    
+    trip_bound = 0.0
+    mst_bound = 0.0
+    radial_bound = 0.0
+    min_trips = {}
+    sources = np.r_[n_depots:instance.nb_nodes]   # garages et stations
+    # Sortie d'une tournée: vers un dépôt (tournée suivante) ou un garage
+    r_out = D[first_station:, :first_station].min(axis=1)
+    
+    for p in range(instance.nb_products):
+        stations = np.flatnonzero(demand[:, p] > 0)
+        if len(stations) == 0:
+            continue
+        depots = np.flatnonzero(stock[:, p] > 0)
+        if len(depots) == 0:
+            continue
+        
+        nodes = stations + first_station
+        trips = math.ceil(int(demand[stations, p].sum()) / q_max)
+        min_trips[p] = trips
+        
+        arrive = float(D[np.ix_(sources, depots)].min())
+        to_depots = D[np.ix_(nodes, depots)].min(axis=1)
+        
+        trip_bound += trips * (arrive + float(to_depots.min()))
+        mst_bound += trips * arrive + _mst_rooted(to_depots, D, nodes)
+        radial_bound += float(((to_depots + r_out[stations]) * demand[stations, p]).sum()) / q_max
+    
+    return_bound = 0.0
+    if demand.sum() > 0 and n_garages:
+        return_bound = float(D[first_station:, n_depots:first_station].min())
+    
+    initial_products = {v.initial_product - 1 for v in instance.vehicles}
+    changeover_bound = 0.0
+    for p in min_trips:
+        if p in initial_products:
+            continue
+        incoming = [instance.transition_costs[q][p] for q in range(instance.nb_products) if q != p]
+        if incoming:
+            changeover_bound += min(incoming)
+    
+    bound = LowerBound(
+        trip_bound, float(mst_bound), radial_bound, return_bound, changeover_bound, min_trips
+    )
+    instance._cache['lower_bound'] = bound
+    return bound
+
+
+def optimality_gap(solution: Solution) -> float:
+    """Écart relatif entre le coût de la solution et la borne inférieure"""
+    return compute_lower_bound(solution.instance).gap(solution.total_cost())
@@ -0,0 +1,413 @@
+"""
+Démon de résolution MPVRP-CC
+Serveur HTTP (port TCP local ou socket Unix) qui garde les instances parsées
+et leurs précalculs en cache (LRU) dans des processus workers, pour éviter
+démarrage de l'interpréteur, imports et parsing à chaque requête.
+
+Endpoints (JSON):
+    POST /solve     {"instance_path" | "instance", "time_limit", "engine", ...}
+    POST /validate  {"instance_path" | "instance", "solution_path" | "solution"}
+    GET  /stats     latences (p50/p90/p99), cache, requêtes
+    GET  /health
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import signal
+import socketserver
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from models import Instance
+from parser import parse_instance, parse_instance_text
+from solver_simple import SimpleSolver, DEFAULT_K_NEIGHBORS
+from solver_savings import SavingsSolver
+from anytime import AnytimeSolver
+from alns import ALNSParams, alns_improver
+from solution_writer import format_solution
+from solution_reader import read_solution, parse_solution_text
+from validator import validate_solution
+from bounds import compute_lower_bound
+from depot_policy import DEPOT_POLICIES
+
+
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_SIZE = 16
+LATENCY_WINDOW = 1000
+
+
+# ----------------------------------------------------------------------
+# Côté worker: cache LRU des instances et exécution des requêtes
+# ----------------------------------------------------------------------
+
+_instances: "OrderedDict[str, Instance]" = OrderedDict()
+_cache_size = DEFAULT_CACHE_SIZE
+
+
+def _init_worker(cache_size: int):
+    global _cache_size
+    _cache_size = cache_size
+
+
+def instance_key(request: Dict[str, Any]) -> str:
+    """Clé de cache: chemin + date de modification + taille, ou empreinte du contenu"""
+    if request.get('instance') is not None:
+        return "sha1:" + hashlib.sha1(request['instance'].encode()).hexdigest()
+    path = Path(request['instance_path']).resolve()
+    stat = path.stat()
+    return f"path:{path}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _get_instance(request: Dict[str, Any]) -> Tuple[Instance, bool]:
+    """Instance de la requête, depuis le cache du worker si possible"""
+    key = request['_key']
+    instance = _instances.get(key)
+    if instance is not None:
+        _instances.move_to_end(key)
+        return instance, True
+    
+    if request.get('instance') is not None:
+        instance = parse_instance_text(request['instance'], "<requête>")
+    else:
+        instance = parse_instance(request['instance_path'])
+    # Précalculs gardés avec l'instance
+    instance.distance_matrix()
+    compute_lower_bound(instance)
+    
+    _instances[key] = instance
+    if len(_instances) > _cache_size:
+        _instances.popitem(last=False)
+    return instance, False
+
+
+def _solve_task(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Résout une instance selon les paramètres de la requête"""
+    instance, cache_hit = _get_instance(request)
+    start = time.perf_counter()
+    
+    weight = float(request.get('changeover_weight', 0.5))
+    k_neighbors = int(request.get('k_neighbors', DEFAULT_K_NEIGHBORS))
+    if request.get('constructor', 'greedy') == 'savings':
+        builder = SavingsSolver(instance)
+    else:
+        builder = SimpleSolver(
+            instance, weight,
+            k_neighbors=k_neighbors or None,
+            depot_policy=request.get('depot_policy', 'ratio')
+        )
+    solution = builder.solve()
+    
+    time_limit = request.get('time_limit')
+    engine = request.get('engine', 'greedy')
+    iterations = request.get('iterations')
+    if time_limit is not None or engine == 'alns':
+        improver = None
+        if engine == 'alns':
+            if iterations is None and time_limit is None:
+                iterations = ALNSParams.iterations
+            improver = alns_improver(ALNSParams(
+                iterations=iterations,
+                seed=request.get('seed'),
+                neighbours=k_neighbors or None
+            ))
+        driver = AnytimeSolver(
+            instance,
+            time_limit=time_limit,
+            changeover_weight=weight,
+            seed=request.get('seed'),
+            improver=improver,
+            target_gap=request.get('target_gap')
+        )
+        solution = driver.solve(initial=solution)
+    
+    solve_time = time.perf_counter() - start
+    solution.resolution_time = solve_time
+    is_valid, errors = validate_solution(solution)
+    bound = compute_lower_bound(instance)
+    
+    return {
+        'valid': is_valid,
+        'errors': errors[:10],
+        'total_cost': solution.total_cost(),
+        'distance': solution.total_distance(),
+        'transition_cost': solution.total_transition_cost(),
+        'transitions': solution.total_transitions(),
+        'vehicles_used': solution.nb_vehicles_used(),
+        'lower_bound': bound.total,
+        'gap': bound.gap(solution.total_cost()),
+        'solve_time': solve_time,
+        'cache_hit': cache_hit,
+        'solution': format_solution(solution),
+    }
+
+
+def _validate_task(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Valide une solution (texte ou fichier) pour l'instance de la requête"""
+    instance, cache_hit = _get_instance(request)
+    if request.get('solution') is not None:
+        solution = parse_solution_text(instance, request['solution'], "<requête>")
+    else:
+        solution = read_solution(instance, request['solution_path'])
+    
+    is_valid, errors = validate_solution(solution)
+    return {
+        'valid': is_valid,
+        'errors': errors[:10],
+        'total_cost': solution.total_cost(),
+        'distance': solution.total_distance(),
+        'transition_cost': solution.total_transition_cost(),
+        'cache_hit': cache_hit,
+    }
+
+
+_TASKS = {'/solve': _solve_task, '/validate': _validate_task}
+
+# Champs de /solve: conversion (None accepté) et valeurs permises
+_SOLVE_FIELDS = {
+    'time_limit': float,
+    'iterations': int,
+    'seed': int,
+    'changeover_weight': float,
+    'k_neighbors': int,
+    'target_gap': float,
+}
+_SOLVE_CHOICES = {
+    'constructor': ('greedy', 'savings'),
+    'engine': ('greedy', 'alns'),
+    'depot_policy': tuple(sorted(DEPOT_POLICIES)),
+}
+
+
+def check_solve_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convertit et vérifie les paramètres d'une requête /solve.
+    
+    Raises:
+        ValueError: Champ non convertible, hors bornes ou valeur non supportée
+    """
+    request = dict(request)
+    for field, kind in _SOLVE_FIELDS.items():
+        value = request.get(field)
+        if value is None:
+            continue
+        if isinstance(value, bool) or (kind is int and isinstance(value, float) and not value.is_integer()):
+            raise ValueError(f"Champ '{field}': {kind.__name__} attendu, reçu {value!r}")
+        try:
+            value = kind(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Champ '{field}': {kind.__name__} attendu, reçu {value!r}") from None
+        if kind is float and not np.isfinite(value):
+            raise ValueError(f"Champ '{field}': valeur finie attendue, reçu {value!r}")
+        if field != 'seed' and value < 0:
+            raise ValueError(f"Champ '{field}': valeur positive attendue, reçu {value!r}")
+        request[field] = value
+    for field, allowed in _SOLVE_CHOICES.items():
+        value = request.get(field)
+        if value is not None and value not in allowed:
+            raise ValueError(f"Champ '{field}': {value!r} non supporté ({', '.join(allowed)})")
+    return request
+
+
+# ----------------------------------------------------------------------
+# Côté serveur: pool de workers, statistiques, HTTP
+# ----------------------------------------------------------------------
+
+class SolverDaemon:
+    """Pool de workers et statistiques du démon"""
+    
+    def __init__(self, workers: int = 2, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.workers = workers
+        self.cache_size = cache_size
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._latencies = {path: deque(maxlen=LATENCY_WINDOW) for path in _TASKS}
+        self._counts = {path: 0 for path in _TASKS}
+        self._errors = 0
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._pool = self._new_pool()
+    
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.cache_size,)
+        )
+    
+    def handle(self, path: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Exécute une requête dans le pool (relance le pool s'il est cassé)"""
+        if path not in _TASKS:
+            raise KeyError(path)
+        if not isinstance(request, dict):
+            raise ValueError(f"Corps de requête: objet JSON attendu, reçu {type(request).__name__}")
+        if request.get('instance') is None and request.get('instance_path') is None:
+            raise ValueError("Champ 'instance_path' ou 'instance' requis")
+        if path == '/solve':
+            request = check_solve_request(request)
+        request = dict(request, _key=instance_key(request))
+        
+        start = time.perf_counter()
+        try:
+            result = self._pool.submit(_TASKS[path], request).result()
+        except BrokenProcessPool:
+            with self._lock:
+                self._pool = self._new_pool()
+            result = self._pool.submit(_TASKS[path], request).result()
+        latency = time.perf_counter() - start
+        
+        with self._lock:
+            self._latencies[path].append(latency)
+            self._counts[path] += 1
+            if result.get('cache_hit'):
+                self._cache_hits += 1
+            else:
+                self._cache_misses += 1
+        
+        result['latency'] = latency
+        return result
+    
+    def record_error(self):
+        with self._lock:
+            self._errors += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Latences (s) p50/p90/p99 par endpoint, cache et compteurs"""
+        with self._lock:
+            latencies = {}
+            for path, values in self._latencies.items():
+                if not values:
+                    continue
+                p50, p90, p99 = np.percentile(list(values), [50, 90, 99])
+                latencies[path] = {
+                    'count': self._counts[path],
+                    'p50': p50, 'p90': p90, 'p99': p99,
+                    'max': max(values),
+                }
+            lookups = self._cache_hits + self._cache_misses
+            return {
+                'uptime': time.time() - self.started,
+                'workers': self.workers,
+                'latency': latencies,
+                'cache': {
+                    'size_per_worker': self.cache_size,
+                    'hits': self._cache_hits,
+                    'misses': self._cache_misses,
+                    'hit_rate': self._cache_hits / lookups if lookups else 0.0,
+                },
+                'errors': self._errors,
+            }
+    
+    def shutdown(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Requêtes HTTP JSON"""
+    
+    daemon: SolverDaemon = None
+    
+    def do_GET(self):
+        if self.path == '/health':
+            self._reply(200, {'status': 'ok'})
+        elif self.path == '/stats':
+            self._reply(200, self.daemon.stats())
+        else:
+            self._reply(404, {'error': f"Endpoint inconnu: {self.path}"})
+    
+    def do_POST(self):
+        if self.path not in _TASKS:
+            self._reply(404, {'error': f"Endpoint inconnu: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            self._reply(200, self.daemon.handle(self.path, request))
+        except (ValueError, KeyError, OSError) as e:
+            self.daemon.record_error()
+            self._reply(400, {'error': str(e)})
+        except Exception as e:
+            self.daemon.record_error()
+            self._reply(500, {'error': f"{type(e).__name__}: {e}"})
+    
+    def _reply(self, status: int, body: Dict[str, Any]):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def address_string(self):
+        # Socket Unix: pas d'adresse IP client
+        return self.client_address[0] if self.client_address else "unix"
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serveur HTTP sur socket Unix"""
+    daemon_threads = True
+    
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+
+def serve(
+    port: Optional[int] = DEFAULT_PORT,
+    socket_path: Optional[str] = None,
+    host: str = "127.0.0.1",
+    workers: int = 2,
+    cache_size: int = DEFAULT_CACHE_SIZE
+):
+    """
+    Lance le démon jusqu'à Ctrl+C.
+    
+    Args:
+        port: Port HTTP local (ignoré si socket_path est fourni)
+        socket_path: Chemin d'un socket Unix
+        host: Interface d'écoute HTTP
+        workers: Processus de résolution
+        cache_size: Instances gardées en cache par worker
+    """
+    daemon = SolverDaemon(workers, cache_size)
+    handler = type('Handler', (_Handler,), {'daemon': daemon})
+    
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = _UnixHTTPServer(socket_path, handler)
+        address = f"unix:{socket_path}"
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+        server.daemon_threads = True
+        address = f"http://{host}:{server.server_address[1]}"
+    
+    # SIGTERM (systemd, kill): même arrêt propre que Ctrl+C
+    signal.signal(signal.SIGTERM, _terminate)
+    print(f"🚀 Démon MPVRP-CC: {address} ({workers} workers, cache {cache_size} instances/worker)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⏹️  Arrêt du démon")
+    finally:
+        server.server_close()
+        daemon.shutdown()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def _terminate(signum, frame):
+    raise KeyboardInterrupt
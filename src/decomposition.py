@@ -0,0 +1,350 @@
+"""
+Décomposition géographique des grandes instances
+Les stations sont regroupées en régions (balayage angulaire ou k-means sur
+les coordonnées, vectorisés avec NumPy). Chaque région reçoit ses véhicules
+et une part des stocks des dépôts, est résolue dans un processus séparé,
+puis les routes sont fusionnées et une ALNS courte retravaille les stations
+situées en frontière de région.
+"""
+
+import multiprocessing
+import platform
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models import Instance, Solution, Depot, VehicleRoute
+from solver_simple import SimpleSolver, DEFAULT_K_NEIGHBORS, compute_metrics
+from alns import ALNS, ALNSParams
+from validator import validate_solution
+
+
+CLUSTER_METHODS = ('sweep', 'kmeans')
+
+# Phase de frontière: itérations ALNS par station de frontière, et durée au
+# plus cette part de la résolution des régions (le temps total suit les régions)
+BOUNDARY_ITERATIONS_PER_STATION = 2
+BOUNDARY_TIME_SHARE = 0.5
+
+
+def cluster_stations(
+    instance: Instance,
+    n_regions: int,
+    method: str = "sweep",
+    seed: Optional[int] = None
+) -> np.ndarray:
+    """
+    Région de chaque station (positions dans instance.stations).
+    
+    - sweep: tri par angle autour du barycentre des dépôts, coupé en secteurs
+      de demande totale égale;
+    - kmeans: k-means pondéré par la demande (Lloyd, initialisation k-means++).
+    
+    Returns:
+        np.ndarray (n_stations,): numéro de région dans [0, n_regions)
+    """
+    first = len(instance.depots) + len(instance.garages)
+    xy = np.asarray(instance.coordinates(), dtype=np.float64)[first:]
+    weights = np.array([max(s.total_demand(), 1) for s in instance.stations], dtype=np.float64)
+    n_regions = max(1, min(n_regions, len(xy)))
+    
+    if method == "sweep":
+        depots = np.asarray(instance.coordinates(), dtype=np.float64)[:len(instance.depots)]
+        labels = _sweep(xy, weights, n_regions, depots.mean(axis=0))
+    elif method == "kmeans":
+        labels = _kmeans(xy, weights, n_regions, np.random.default_rng(seed))
+    else:
+        raise ValueError(f"Méthode de découpage inconnue: {method} (choix: {', '.join(CLUSTER_METHODS)})")
+    # Numéros consécutifs (aucune région vide)
+    return np.unique(labels, return_inverse=True)[1].astype(np.intp)
+
+
+def _sweep(xy: np.ndarray, weights: np.ndarray, k: int, center: np.ndarray) -> np.ndarray:
+    """Secteurs angulaires de demande égale"""
+    angles = np.arctan2(xy[:, 1] - center[1], xy[:, 0] - center[0])
+    order = np.argsort(angles, kind='stable')
+    # Départ du balayage dans le plus grand vide angulaire (secteurs compacts)
+    sorted_angles = angles[order]
+    gaps = np.diff(np.append(sorted_angles, sorted_angles[0] + 2 * np.pi))
+    order = np.roll(order, -(int(np.argmax(gaps)) + 1))
+    
+    cumulative = np.cumsum(weights[order])
+    cuts = np.searchsorted(cumulative / cumulative[-1], np.arange(1, k) / k, side='right')
+    labels = np.empty(len(xy), dtype=np.intp)
+    labels[order] = np.searchsorted(cuts, np.arange(len(xy)), side='right')
+    return labels
+
+
+def _kmeans(xy: np.ndarray, weights: np.ndarray, k: int, rng: np.random.Generator,
+            iterations: int = 50) -> np.ndarray:
+    """k-means pondéré (k-means++ puis Lloyd)"""
+    centers = [xy[rng.choice(len(xy), p=weights / weights.sum())]]
+    for _ in range(1, k):
+        d2 = ((xy[:, None, :] - np.array(centers)[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+        p = d2 * weights
+        centers.append(xy[rng.choice(len(xy), p=p / p.sum())] if p.sum() > 0 else xy[rng.integers(len(xy))])
+    centers = np.array(centers)
+    
+    labels = np.zeros(len(xy), dtype=np.intp)
+    for it in range(iterations):
+        d2 = ((xy[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        new_labels = np.argmin(d2, axis=1)
+        if it and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        mass = np.bincount(labels, weights=weights, minlength=k)
+        for axis in range(2):
+            sums = np.bincount(labels, weights=weights * xy[:, axis], minlength=k)
+            centers[:, axis] = np.where(mass > 0, sums / np.maximum(mass, 1e-12), centers[:, axis])
+        # Région vide: recentrée sur la station la plus éloignée de son centre
+        for c in np.flatnonzero(mass == 0):
+            far = int(np.argmax(d2[np.arange(len(xy)), labels]))
+            centers[c] = xy[far]
+    return labels
+
+
+def split_instance(instance: Instance, labels: np.ndarray) -> List[Instance]:
+    """
+    Sous-instances par région (ids d'origine conservés).
+    
+    - Véhicules: chaque région reçoit d'abord le véhicule dont le garage est le
+      plus proche de son barycentre, puis les suivants (par capacité
+      décroissante) vont à la région la moins pourvue en capacité / demande.
+    - Stocks: pour chaque produit, la demande des régions est couverte par les
+      dépôts les plus proches (paires région-dépôt par distance croissante);
+      le stock restant est réparti au prorata de la demande.
+    Les budgets de stock des régions ne dépassent jamais les stocks des dépôts.
+    """
+    P = instance.nb_products
+    K = int(labels.max()) + 1
+    coords = np.asarray(instance.coordinates(), dtype=np.float64)
+    first = len(instance.depots) + len(instance.garages)
+    xy = coords[first:]
+    
+    demands = np.array([s.demands for s in instance.stations], dtype=np.int64).reshape(-1, P)
+    region_demand = np.zeros((K, P), dtype=np.int64)
+    np.add.at(region_demand, labels, demands)
+    totals = region_demand.sum(axis=1)
+    weights = np.maximum(demands.sum(axis=1), 1).astype(np.float64)
+    mass = np.bincount(labels, weights=weights, minlength=K)
+    centroids = np.stack([
+        np.bincount(labels, weights=weights * xy[:, a], minlength=K) / mass for a in range(2)
+    ], axis=1)
+    
+    # Véhicules
+    garage_xy = {g.id: coords[instance.garage_node(g.id)] for g in instance.garages}
+    vehicles = sorted(instance.vehicles, key=lambda v: -v.capacity)
+    assigned: List[list] = [[] for _ in range(K)]
+    capacity = np.zeros(K)
+    free = list(vehicles)
+    for c in np.argsort(-totals, kind='stable'):
+        if not free:
+            break
+        v = min(free, key=lambda v: np.hypot(*(garage_xy[v.home_garage] - centroids[c])))
+        free.remove(v)
+        assigned[c].append(v)
+        capacity[c] += v.capacity
+    for v in free:
+        c = int(np.argmax(totals / np.maximum(capacity, 1)))
+        assigned[c].append(v)
+        capacity[c] += v.capacity
+    
+    # Budgets de stock (régions x dépôts x produits)
+    stocks = np.array([d.stocks for d in instance.depots], dtype=np.int64).reshape(-1, P)
+    depot_xy = coords[:len(instance.depots)]
+    distance = np.hypot(*(centroids[:, None, :] - depot_xy[None, :, :]).transpose(2, 0, 1))
+    pairs = np.argsort(distance, axis=None, kind='stable')
+    budget = np.zeros((K, len(instance.depots), P), dtype=np.int64)
+    remaining = stocks.copy()
+    need = region_demand.copy()
+    for p in range(P):
+        for pair in pairs:
+            c, d = divmod(int(pair), len(instance.depots))
+            take = min(need[c, p], remaining[d, p])
+            if take > 0:
+                budget[c, d, p] += take
+                need[c, p] -= take
+                remaining[d, p] -= take
+    share = region_demand / np.maximum(region_demand.sum(axis=0), 1)
+    extra = np.floor(remaining[None, :, :] * share[:, None, :]).astype(np.int64)
+    budget += extra
+    
+    regions = []
+    for c in range(K):
+        members = np.flatnonzero(labels == c)
+        region = Instance(
+            uuid=f"{instance.uuid}/r{c}",
+            nb_products=P,
+            nb_depots=len(instance.depots),
+            nb_garages=len(instance.garages),
+            nb_stations=len(members),
+            nb_vehicles=len(assigned[c]),
+            transition_costs=instance.transition_costs,
+            vehicles=sorted(assigned[c], key=lambda v: v.id),
+            depots=[Depot(d.id, d.x, d.y, budget[c, j].tolist()) for j, d in enumerate(instance.depots)],
+            garages=instance.garages,
+            stations=[instance.stations[i] for i in members]
+        )
+        if 'memory_budget' in instance._cache:
+            region._cache['memory_budget'] = instance._cache['memory_budget']
+        regions.append(region)
+    return regions
+
+
+def boundary_stations(instance: Instance, labels: np.ndarray, k: int = 8) -> List[int]:
+    """Ids des stations dont un des k plus proches voisins est dans une autre région"""
+    if len(instance.stations) < 2:
+        return []
+    first = len(instance.depots) + len(instance.garages)
+    nearest = instance.nearest_stations(k)[first:]
+    on_boundary = (labels[nearest] != labels[:, None]).any(axis=1)
+    return [instance.stations[i].id for i in np.flatnonzero(on_boundary)]
+
+
+def _solve_region(region: Instance, weight: float, k_neighbors: int,
+                  iterations: int, seed: Optional[int]) -> Tuple[List[VehicleRoute], bool, float]:
+    """Tâche worker: glouton (+ ALNS) sur une région, retourne les routes"""
+    start = time.perf_counter()
+    solution = SimpleSolver(region, weight, k_neighbors=k_neighbors or None).solve()
+    if iterations and validate_solution(solution)[0]:
+        params = ALNSParams(iterations=iterations, seed=seed, neighbours=k_neighbors or None)
+        solution = ALNS(region, params).run(solution)
+    is_valid, _ = validate_solution(solution)
+    return solution.routes, is_valid, time.perf_counter() - start
+
+
+class DecompositionSolver:
+    """Résolution par régions en parallèle, fusion puis réparation des frontières"""
+    
+    def __init__(
+        self,
+        instance: Instance,
+        n_regions: int = 4,
+        method: str = "sweep",
+        workers: int = 1,
+        changeover_weight: float = 0.5,
+        k_neighbors: int = DEFAULT_K_NEIGHBORS,
+        region_iterations: int = 0,
+        boundary_iterations: int = 100,
+        seed: Optional[int] = None,
+        mp_context: str = "spawn"
+    ):
+        """
+        Args:
+            instance: Instance complète
+            n_regions: Nombre de régions (borné par les véhicules et les stations)
+            method: 'sweep' ou 'kmeans'
+            workers: Processus de résolution des régions (1 = séquentiel)
+            changeover_weight: Poids changeover du glouton
+            k_neighbors: Listes de voisins candidats (0 = parcours complet)
+            region_iterations: Itérations ALNS par région après le glouton
+            boundary_iterations: Itérations ALNS max. sur les stations de frontière
+                (BOUNDARY_ITERATIONS_PER_STATION par station, durée bornée par
+                BOUNDARY_TIME_SHARE de la résolution des régions)
+            seed: Graine (k-means, ALNS)
+        """
+        self.instance = instance
+        self.n_regions = max(1, min(n_regions, instance.nb_vehicles, instance.nb_stations))
+        self.method = method
+        self.workers = workers
+        self.changeover_weight = changeover_weight
+        self.k_neighbors = k_neighbors
+        self.region_iterations = region_iterations
+        self.boundary_iterations = boundary_iterations
+        self.seed = seed
+        self.mp_context = mp_context
+        self.stats: Dict = {}
+    
+    def solve(self) -> Solution:
+        """Résout l'instance (repli sur le glouton complet si une région échoue)"""
+        start = time.perf_counter()
+        labels = cluster_stations(self.instance, self.n_regions, self.method, self.seed)
+        regions = split_instance(self.instance, labels)
+        split_time = time.perf_counter() - start
+        
+        results = self._solve_regions(regions)
+        regions_time = time.perf_counter() - start - split_time
+        
+        solution = Solution(instance=self.instance, processor=platform.processor() or "Unknown")
+        for routes, _, _ in results:
+            solution.routes.extend(routes)
+        compute_metrics(solution)
+        merged_cost = solution.total_cost()
+        
+        boundary_start = time.perf_counter()
+        fallback = not all(is_valid for _, is_valid, _ in results)
+        boundary = []
+        if fallback:
+            print("\n⚠️  Décomposition: région(s) non résolue(s), repli sur le glouton complet")
+            solution = SimpleSolver(
+                self.instance, self.changeover_weight, k_neighbors=self.k_neighbors or None
+            ).solve()
+        elif self.boundary_iterations and len(regions) > 1:
+            boundary = boundary_stations(self.instance, labels)
+            # Seules les routes qui desservent une station de frontière sont retravaillées
+            on_boundary = set(boundary)
+            vehicle_index = {v.id: i for i, v in enumerate(self.instance.vehicles)}
+            scope = [
+                vehicle_index[route.vehicle_id] for route in solution.routes
+                if any(d.station_id in on_boundary for mr in route.mini_routes for d in mr.deliveries)
+            ]
+            if scope:
+                params = ALNSParams(
+                    iterations=min(self.boundary_iterations, BOUNDARY_ITERATIONS_PER_STATION * len(boundary)),
+                    time_limit=BOUNDARY_TIME_SHARE * regions_time,
+                    seed=self.seed,
+                    neighbours=self.k_neighbors or None
+                )
+                solution = ALNS(self.instance, params).run(solution, focus=boundary, scope=scope)
+        
+        boundary_time = time.perf_counter() - boundary_start
+        elapsed = time.perf_counter() - start
+        solution.resolution_time = elapsed
+        region_times = [t for _, _, t in results]
+        self.stats = {
+            'regions': len(regions),
+            'method': self.method,
+            'workers': self.workers,
+            'region_stations': [r.nb_stations for r in regions],
+            'region_vehicles': [r.nb_vehicles for r in regions],
+            'region_times': region_times,
+            'critical_path': max(region_times, default=0.0),
+            'sequential_time': sum(region_times),
+            'split_time': split_time,
+            'regions_wall': regions_time,
+            'merged_cost': merged_cost,
+            'boundary_stations': len(boundary),
+            'boundary_time': boundary_time,
+            'fallback': fallback,
+            'elapsed': elapsed,
+        }
+        return solution
+    
+    def _solve_regions(self, regions: List[Instance]) -> List[Tuple[List[VehicleRoute], bool, float]]:
+        """Résout les régions dans un pool de processus (ou séquentiellement)"""
+        args = [
+            (region, self.changeover_weight, self.k_neighbors, self.region_iterations,
+             None if self.seed is None else self.seed + c)
+            for c, region in enumerate(regions)
+        ]
+        if self.workers <= 1 or len(regions) == 1:
+            return [_solve_region(*a) for a in args]
+        
+        pool = ProcessPoolExecutor(
+            max_workers=min(self.workers, len(regions)),
+            mp_context=multiprocessing.get_context(self.mp_context)
+        )
+        try:
+            # Plus grosses régions d'abord: meilleur équilibrage du pool
+            order = sorted(range(len(args)), key=lambda c: -regions[c].nb_stations)
+            futures = {c: pool.submit(_solve_region, *args[c]) for c in order}
+            return [futures[c].result() for c in range(len(args))]
+        except BrokenProcessPool as e:
+            print(f"\n⚠️  Workers indisponibles ({e}), régions résolues séquentiellement")
+            pool.shutdown(wait=False, cancel_futures=True)
+            return [_solve_region(*a) for a in args]
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,130 @@
+"""
+Politiques de choix du dépôt pour SimpleSolver
+Chaque politique parcourt les dépôts par distance croissante et s'arrête dès
+qu'aucun dépôt plus lointain ne peut battre le meilleur score courant.
+"""
+
+from typing import Dict, Optional, Type
+
+
+class DepotPolicy:
+    """Politique de base: le solveur fournit le classement et les stocks restants"""
+    
+    name = "base"
+    
+    def choose(self, solver, pos_node: int, product: int, needed: int) -> Optional[int]:
+        """
+        Choisit un dépôt.
+        
+        Args:
+            solver: SimpleSolver (classement des dépôts, stocks restants)
+            pos_node: Nœud de la position courante
+            product: Produit à charger
+            needed: Quantité souhaitée (capacité bornée par la demande restante)
+        
+        Returns:
+            int: Position du dépôt dans instance.depots, ou None
+        """
+        raise NotImplementedError
+
+
+class RatioPolicy(DepotPolicy):
+    """distance / stock minimal (comportement historique)"""
+    
+    name = "ratio"
+    
+    def choose(self, solver, pos_node, product, needed):
+        if not solver.depots_with_stock[product]:
+            return None
+        
+        row = solver.dist[pos_node]
+        depot_nodes = solver.depot_nodes
+        stock = solver.depot_stock
+        # Borne inférieure du score d'un dépôt à distance d: d / stock_max
+        max_stock = max(solver.max_initial_stock[product], 1)
+        
+        best, best_key = None, None
+        for j in solver.depot_ranking[pos_node]:
+            distance = row[depot_nodes[j]]
+            if best_key is not None and distance / max_stock > best_key[0]:
+                break
+            remaining = stock[j][product]
+            if remaining <= 0:
+                continue
+            # Départage par l'ordre des dépôts, comme min() sur la liste complète
+            key = (distance / max(remaining, 1), j)
+            if best_key is None or key < best_key:
+                best, best_key = j, key
+        
+        return best
+
+
+class NearestPolicy(DepotPolicy):
+    """Dépôt le plus proche ayant assez de stock (sinon le plus fourni)"""
+    
+    name = "nearest"
+    
+    def choose(self, solver, pos_node, product, needed):
+        if not solver.depots_with_stock[product]:
+            return None
+        
+        stock = solver.depot_stock
+        fallback, fallback_stock = None, 0
+        for j in solver.depot_ranking[pos_node]:
+            remaining = stock[j][product]
+            if remaining >= needed:
+                return j
+            if remaining > fallback_stock:
+                fallback, fallback_stock = j, remaining
+        
+        return fallback
+
+
+class RoundTripPolicy(DepotPolicy):
+    """Minimise position -> dépôt -> station la plus proche ayant une demande"""
+    
+    name = "round_trip"
+    
+    def choose(self, solver, pos_node, product, needed):
+        if not solver.depots_with_stock[product]:
+            return None
+        
+        row = solver.dist[pos_node]
+        depot_nodes = solver.depot_nodes
+        stock = solver.depot_stock
+        
+        best, best_score = None, float('inf')
+        for j in solver.depot_ranking[pos_node]:
+            distance = row[depot_nodes[j]]
+            # Le second tronçon est positif: aucun dépôt plus lointain ne peut gagner
+            if distance >= best_score:
+                break
+            if stock[j][product] <= 0:
+                continue
+            depot = solver.instance.depots[j]
+            station = solver._closest_station_with_demand(depot, product, set())
+            if station is None:
+                return None
+            score = distance + solver.dist[depot_nodes[j]][solver.instance.station_node(station.id)]
+            if score < best_score:
+                best, best_score = j, score
+        
+        return best
+
+
+DEPOT_POLICIES: Dict[str, Type[DepotPolicy]] = {
+    cls.name: cls for cls in (RatioPolicy, NearestPolicy, RoundTripPolicy)
+}
+
+
+def get_depot_policy(policy) -> DepotPolicy:
+    """Instancie une politique à partir de son nom (ou la retourne telle quelle)"""
+    if isinstance(policy, DepotPolicy):
+        return policy
+    try:
+        return DEPOT_POLICIES[policy]()
+    except KeyError:
+        raise ValueError(
+            f"Politique de dépôt inconnue: {policy} "
+            f"(choix: {', '.join(DEPOT_POLICIES)})"
+        )
@@ -0,0 +1,222 @@
+"""
+Calcul des distances entre localisations
+Indexation des nœuds: dépôts, puis garages, puis stations
+
+Deux fournisseurs de distances, interchangeables pour les indexations
+utilisées par les solveurs (ligne, scalaire, blocs, np.ix_, paires):
+- la matrice dense NumPy (n² x 8 octets);
+- LazyDistanceMatrix, calculée à la volée depuis les coordonnées, pour les
+  instances dont la matrice dense dépasse le budget mémoire.
+"""
+
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+
+# Budget mémoire par défaut de la matrice dense (au-delà: calcul à la volée)
+DEFAULT_MEMORY_BUDGET = 1 << 30
+
+
+def node_coordinates(instance) -> np.ndarray:
+    """Coordonnées (n_nodes, 2) dans l'ordre dépôts, garages, stations"""
+    locations = list(instance.depots) + list(instance.garages) + list(instance.stations)
+    coords = np.empty((len(locations), 2), dtype=np.float64)
+    for i, loc in enumerate(locations):
+        coords[i, 0] = loc.x
+        coords[i, 1] = loc.y
+    return coords
+
+
+def dense_distance_matrix(coords: np.ndarray) -> np.ndarray:
+    """
+    Matrice dense des distances euclidiennes.
+    
+    Même formule que Location.distance_to, donc mêmes valeurs au bit près.
+    """
+    dx = coords[:, 0][:, None] - coords[:, 0][None, :]
+    dy = coords[:, 1][:, None] - coords[:, 1][None, :]
+    return np.sqrt(dx * dx + dy * dy)
+
+
+def k_nearest(block: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices (colonnes) des k plus petites valeurs de chaque ligne, triés.
+    
+    argpartition (O(n) par ligne) puis tri des k seuls candidats; les égalités
+    sont départagées par indice croissant comme le ferait un min() linéaire.
+    """
+    n_cols = block.shape[1]
+    k = min(k, n_cols)
+    if k <= 0:
+        return np.empty((block.shape[0], 0), dtype=np.intp)
+    
+    if k < n_cols:
+        idx = np.argpartition(block, k - 1, axis=1)[:, :k]
+    else:
+        idx = np.broadcast_to(np.arange(n_cols), block.shape).copy()
+    
+    values = np.take_along_axis(block, idx, axis=1)
+    order = np.lexsort((idx, values), axis=1)
+    return np.take_along_axis(idx, order, axis=1)
+
+
+def distance_provider(coords: np.ndarray, memory_budget: Optional[int] = DEFAULT_MEMORY_BUDGET):
+    """
+    Matrice dense si elle tient dans le budget mémoire, sinon LazyDistanceMatrix.
+    
+    Args:
+        coords: Coordonnées (n_nodes, 2)
+        memory_budget: Octets alloués aux distances (None = toujours dense)
+    """
+    n = len(coords)
+    if memory_budget is None or n * n * 8 <= memory_budget:
+        return dense_distance_matrix(coords)
+    return LazyDistanceMatrix(coords, memory_budget)
+
+
+class LazyDistanceMatrix:
+    """
+    Distances calculées à la volée, sans matrice n x n.
+    
+    - D[i] / D[i, :]: ligne complète, gardée dans un cache LRU borné;
+    - D[i, j]: scalaire;
+    - D[a, b] avec a, b tableaux (paires, np.ix_) ou tranches: calcul par
+      tuiles de taille bornée.
+    Les valeurs sont identiques au bit près à celles de la matrice dense
+    (même formule, calcul en float64). Les coordonnées sont stockées en
+    float32 quand la conversion est exacte.
+    """
+    
+    def __init__(
+        self,
+        coords: np.ndarray,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+        tile_elements: int = 1 << 22
+    ):
+        coords = np.asarray(coords, dtype=np.float64)
+        compact = coords.astype(np.float32)
+        if np.array_equal(compact.astype(np.float64), coords):
+            coords = compact
+        self._x = np.ascontiguousarray(coords[:, 0])
+        self._y = np.ascontiguousarray(coords[:, 1])
+        self.n = len(coords)
+        self.tile_elements = tile_elements
+        
+        # Cache LRU des lignes: au plus la moitié du budget
+        self.max_rows = max(16, memory_budget // 2 // max(8 * self.n, 1))
+        self._rows: "OrderedDict[int, np.ndarray]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    @property
+    def shape(self):
+        return (self.n, self.n)
+    
+    @property
+    def ndim(self) -> int:
+        return 2
+    
+    @property
+    def dtype(self):
+        return np.dtype(np.float64)
+    
+    def __len__(self) -> int:
+        return self.n
+    
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if len(key) == 1:
+            key = (key[0], slice(None))
+        if len(key) != 2:
+            raise IndexError(f"Indexation à {len(key)} dimensions non supportée")
+        rows, cols = key
+        
+        if _is_int(rows):
+            if isinstance(cols, slice) and cols == slice(None):
+                return self.row(int(rows))
+            if _is_int(cols):
+                return self._scalar(int(rows), int(cols))
+        
+        # Deux indices avancés: paires (broadcast), comme NumPy
+        if not isinstance(rows, slice) and not isinstance(cols, slice):
+            r, c = np.broadcast_arrays(np.asarray(rows), np.asarray(cols))
+            return self._pairs(r.ravel(), c.ravel()).reshape(r.shape)
+        
+        # Au moins une tranche: bloc produit cartésien
+        r_idx, r_shape = self._axis(rows)
+        c_idx, c_shape = self._axis(cols)
+        return self._block(r_idx, c_idx).reshape(r_shape + c_shape)
+    
+    def row(self, i: int) -> np.ndarray:
+        """Distances du nœud i à tous les nœuds (lecture seule, mise en cache)"""
+        i %= self.n
+        row = self._rows.get(i)
+        if row is not None:
+            self.hits += 1
+            self._rows.move_to_end(i)
+            return row
+        
+        self.misses += 1
+        row = self._pairwise(np.array([i]), np.arange(self.n))[0]
+        row.flags.writeable = False
+        self._rows[i] = row
+        if len(self._rows) > self.max_rows:
+            self._rows.popitem(last=False)
+        return row
+    
+    def _axis(self, key):
+        """Indices (aplatis) et forme de sortie d'un indice d'axe"""
+        if isinstance(key, slice):
+            idx = np.arange(self.n)[key]
+            return idx, idx.shape
+        if _is_int(key):
+            return np.array([key]), ()
+        idx = np.asarray(key)
+        return idx.ravel(), idx.shape
+    
+    def _coords(self, idx: np.ndarray):
+        return self._x[idx].astype(np.float64), self._y[idx].astype(np.float64)
+    
+    def _scalar(self, i: int, j: int) -> np.float64:
+        row = self._rows.get(i % self.n)
+        if row is not None:
+            return row[j]
+        x, y = self._coords(np.array([i, j]))
+        dx = x[0] - x[1]
+        dy = y[0] - y[1]
+        return np.sqrt(dx * dx + dy * dy)
+    
+    def _pairwise(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """Bloc len(rows) x len(cols), même formule que dense_distance_matrix"""
+        xr, yr = self._coords(rows)
+        xc, yc = self._coords(cols)
+        dx = xr[:, None] - xc[None, :]
+        dy = yr[:, None] - yc[None, :]
+        return np.sqrt(dx * dx + dy * dy)
+    
+    def _block(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """Bloc calculé par tuiles de lignes (temporaires bornés)"""
+        out = np.empty((len(rows), len(cols)), dtype=np.float64)
+        step = max(1, self.tile_elements // max(len(cols), 1))
+        for start in range(0, len(rows), step):
+            out[start:start + step] = self._pairwise(rows[start:start + step], cols)
+        return out
+    
+    def _pairs(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """Distances des paires (rows[k], cols[k]), par tuiles"""
+        out = np.empty(len(rows), dtype=np.float64)
+        step = self.tile_elements
+        for start in range(0, len(rows), step):
+            xr, yr = self._coords(rows[start:start + step])
+            xc, yc = self._coords(cols[start:start + step])
+            dx = xr - xc
+            dy = yr - yc
+            out[start:start + step] = np.sqrt(dx * dx + dy * dy)
+        return out
+
+
+def _is_int(key) -> bool:
+    return isinstance(key, (int, np.integer))
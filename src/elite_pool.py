@@ -0,0 +1,297 @@
+"""
+Pool de solutions élites
+Déduplication par empreinte canonique, diversité par distance entre
+affectations (station, produit, véhicule), éviction par coût et diversité
+(fitness biaisée), sauvegarde par instance et tirage de points de départ.
+"""
+
+import hashlib
+import json
+import os
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import FrozenSet, List, Optional, Tuple, Union
+
+from models import Instance, Solution, VehicleRoute, MiniRoute, Delivery
+from solver_simple import compute_metrics
+from validator import validate_solution
+
+
+def solution_signature(solution: Solution) -> str:
+    """
+    Empreinte canonique de la structure des routes.
+    
+    Les véhicules sont remplacés par leur profil (garage, capacité, produit
+    initial) et les routes triées: deux solutions qui ne diffèrent que par
+    une permutation de véhicules interchangeables ont la même empreinte.
+    """
+    instance = solution.instance
+    capacities = {v.id: v.capacity for v in instance.vehicles}
+    
+    routes = []
+    for route in solution.routes:
+        if not route.mini_routes:
+            continue
+        routes.append((
+            route.home_garage,
+            capacities.get(route.vehicle_id, 0),
+            route.initial_product,
+            tuple(
+                (mr.product, mr.depot_id, mr.quantity_loaded,
+                 tuple((d.station_id, d.quantity) for d in mr.deliveries))
+                for mr in route.mini_routes
+            )
+        ))
+    routes.sort()
+    return hashlib.sha1(repr(routes).encode()).hexdigest()
+
+
+def assignments(solution: Solution) -> FrozenSet[Tuple[int, int, int]]:
+    """Affectations (station, produit, véhicule) de la solution"""
+    return frozenset(
+        (d.station_id, mr.product, route.vehicle_id)
+        for route in solution.routes
+        for mr in route.mini_routes
+        for d in mr.deliveries
+    )
+
+
+def solution_distance(a: FrozenSet, b: FrozenSet) -> float:
+    """Distance de Jaccard entre deux ensembles d'affectations (0 = identiques)"""
+    union = len(a | b)
+    if union == 0:
+        return 0.0
+    return 1.0 - len(a & b) / union
+
+
+@dataclass(eq=False)
+class EliteEntry:
+    """Solution du pool et ses attributs précalculés"""
+    solution: Solution
+    cost: float
+    signature: str
+    assignments: FrozenSet[Tuple[int, int, int]]
+
+
+class ElitePool:
+    """Pool borné de solutions bonnes et diverses"""
+    
+    def __init__(
+        self,
+        instance: Instance,
+        capacity: int = 10,
+        min_distance: float = 0.02,
+        nb_elite: int = 4,
+        nb_close: int = 3
+    ):
+        """
+        Args:
+            instance: Instance résolue
+            capacity: Nombre maximal de solutions
+            min_distance: En dessous, deux solutions sont jugées quasi identiques
+                (seule la meilleure est gardée)
+            nb_elite: Nombre de solutions protégées par leur coût dans la
+                fitness biaisée
+            nb_close: Voisins considérés pour la contribution à la diversité
+        """
+        self.instance = instance
+        self.capacity = capacity
+        self.min_distance = min_distance
+        self.nb_elite = nb_elite
+        self.nb_close = nb_close
+        self.entries: List[EliteEntry] = []
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def __iter__(self):
+        return iter(sorted(self.entries, key=lambda e: e.cost))
+    
+    def best(self) -> Optional[Solution]:
+        """Meilleure solution du pool (copie)"""
+        if not self.entries:
+            return None
+        return min(self.entries, key=lambda e: e.cost).solution.copy()
+    
+    def accepts_cost(self, cost: float) -> bool:
+        """Une solution de ce coût a-t-elle une chance d'entrer?"""
+        return len(self.entries) < self.capacity or cost < max(e.cost for e in self.entries)
+    
+    def add(self, solution: Solution) -> bool:
+        """
+        Ajoute une solution (supposée valide).
+        
+        Rejetée si elle est déjà présente ou trop proche d'une solution au
+        moins aussi bonne; remplace les solutions proches moins bonnes. Si le
+        pool déborde, la solution de plus mauvaise fitness biaisée est évincée
+        (jamais la meilleure).
+        
+        Returns:
+            bool: True si la solution est dans le pool après l'ajout
+        """
+        signature = solution_signature(solution)
+        if any(e.signature == signature for e in self.entries):
+            return False
+        
+        cost = solution.total_cost()
+        entry_assignments = assignments(solution)
+        
+        close = [
+            e for e in self.entries
+            if solution_distance(e.assignments, entry_assignments) < self.min_distance
+        ]
+        if any(e.cost <= cost for e in close):
+            return False
+        for e in close:
+            self.entries.remove(e)
+        
+        entry = EliteEntry(solution.copy(), cost, signature, entry_assignments)
+        self.entries.append(entry)
+        
+        if len(self.entries) > self.capacity:
+            self.entries.remove(self._worst_entry())
+        
+        return entry in self.entries
+    
+    def seed(self, rng: random.Random) -> Optional[Solution]:
+        """
+        Point de départ pour un redémarrage (copie).
+        
+        Tirage par tournoi binaire sur la fitness biaisée: favorise les
+        solutions bonnes et éloignées des autres.
+        """
+        if not self.entries:
+            return None
+        if len(self.entries) == 1:
+            return self.entries[0].solution.copy()
+        
+        fitness = self._biased_fitness()
+        i, j = rng.sample(range(len(self.entries)), 2)
+        chosen = i if fitness[i] <= fitness[j] else j
+        return self.entries[chosen].solution.copy()
+    
+    def diversity(self) -> float:
+        """Distance moyenne entre paires de solutions du pool"""
+        n = len(self.entries)
+        if n < 2:
+            return 0.0
+        total = sum(
+            solution_distance(self.entries[i].assignments, self.entries[j].assignments)
+            for i in range(n) for j in range(i + 1, n)
+        )
+        return total / (n * (n - 1) / 2)
+    
+    def _biased_fitness(self) -> List[float]:
+        """Rang de coût + (1 - nb_elite / n) x rang de diversité (plus petit = meilleur)"""
+        n = len(self.entries)
+        
+        contributions = []
+        for i, e in enumerate(self.entries):
+            distances = sorted(
+                solution_distance(e.assignments, o.assignments)
+                for j, o in enumerate(self.entries) if j != i
+            )
+            close = distances[:self.nb_close]
+            contributions.append(sum(close) / len(close) if close else 0.0)
+        
+        cost_rank = [0] * n
+        for rank, i in enumerate(sorted(range(n), key=lambda i: self.entries[i].cost)):
+            cost_rank[i] = rank
+        diversity_rank = [0] * n
+        for rank, i in enumerate(sorted(range(n), key=lambda i: -contributions[i])):
+            diversity_rank[i] = rank
+        
+        weight = 1.0 - min(self.nb_elite, n) / n
+        return [cost_rank[i] + weight * diversity_rank[i] for i in range(n)]
+    
+    def _worst_entry(self) -> EliteEntry:
+        """Solution à évincer (la meilleure est toujours conservée)"""
+        fitness = self._biased_fitness()
+        best = min(self.entries, key=lambda e: e.cost)
+        candidates = [i for i, e in enumerate(self.entries) if e is not best]
+        return self.entries[max(candidates, key=lambda i: (fitness[i], self.entries[i].cost))]
+    
+    def save(self, filepath: Union[str, Path]):
+        """Sauvegarde le pool (JSON, écriture atomique)"""
+        filepath = Path(filepath)
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        
+        data = {
+            'instance': self.instance.uuid,
+            'entries': [
+                {'cost': e.cost, 'routes': [_route_to_dict(r) for r in e.solution.routes if r.mini_routes]}
+                for e in self
+            ]
+        }
+        
+        tmp_path = filepath.with_name(f".{filepath.name}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+    
+    @classmethod
+    def load(cls, instance: Instance, filepath: Union[str, Path], **kwargs) -> 'ElitePool':
+        """
+        Recharge un pool sauvegardé (pool vide si le fichier n'existe pas).
+        
+        Les solutions invalides pour l'instance sont ignorées.
+        """
+        pool = cls(instance, **kwargs)
+        filepath = Path(filepath)
+        if not filepath.exists():
+            return pool
+        
+        with open(filepath, 'r') as f:
+            data = json.load(f)
+        
+        if data.get('instance') != instance.uuid:
+            raise ValueError(f"Pool {filepath.name}: instance {data.get('instance')} != {instance.uuid}")
+        
+        for item in data.get('entries', []):
+            solution = Solution(
+                instance=instance,
+                routes=[_route_from_dict(r) for r in item['routes']]
+            )
+            compute_metrics(solution)
+            is_valid, _ = validate_solution(solution)
+            if is_valid:
+                pool.add(solution)
+        
+        return pool
+
+
+def _route_to_dict(route: VehicleRoute) -> dict:
+    return {
+        'vehicle_id': route.vehicle_id,
+        'home_garage': route.home_garage,
+        'initial_product': route.initial_product,
+        'mini_routes': [
+            {
+                'product': mr.product,
+                'depot_id': mr.depot_id,
+                'quantity_loaded': mr.quantity_loaded,
+                'deliveries': [[d.station_id, d.quantity] for d in mr.deliveries]
+            }
+            for mr in route.mini_routes
+        ]
+    }
+
+
+def _route_from_dict(data: dict) -> VehicleRoute:
+    return VehicleRoute(
+        vehicle_id=data['vehicle_id'],
+        home_garage=data['home_garage'],
+        initial_product=data['initial_product'],
+        mini_routes=[
+            MiniRoute(
+                product=mr['product'],
+                depot_id=mr['depot_id'],
+                quantity_loaded=mr['quantity_loaded'],
+                deliveries=[Delivery(s, q) for s, q in mr['deliveries']]
+            )
+            for mr in data['mini_routes']
+        ]
+    )
@@ -0,0 +1,311 @@
+"""
+Réoptimisation incrémentale
+Quand quelques stations changent de demande (ou des dépôts de stock) en cours
+de journée, seules les livraisons concernées sont retirées, réduites ou
+réinsérées, puis une courte ALNS limitée au voisinage du changement
+améliore le résultat. Le travail dépend de la taille du changement, pas de l'instance.
+"""
+
+import time
+from dataclasses import replace
+from typing import Dict, List, Optional, Sequence
+
+from models import Instance, Solution
+from alns import ALNS, ALNSParams, Request, _Slot
+
+
+# Précalculs qui dépendent des demandes / stocks (les autres sont géométriques)
+_QUANTITY_CACHE_KEYS = {'lower_bound'}
+
+Deltas = Dict[int, Sequence[int]]
+
+
+def apply_changes(
+    instance: Instance,
+    demand_deltas: Optional[Deltas] = None,
+    stock_deltas: Optional[Deltas] = None
+) -> Instance:
+    """
+    Nouvelle instance aux demandes / stocks modifiés.
+    
+    Les précalculs géométriques (matrice des distances, listes de voisins...)
+    sont partagés avec l'instance d'origine.
+    
+    Args:
+        instance: Instance courante
+        demand_deltas: station_id -> variation de demande par produit
+        stock_deltas: dépôt_id -> variation de stock par produit
+    
+    Returns:
+        Instance: Instance modifiée (l'originale est inchangée)
+    """
+    stations = {s.id: s for s in instance.stations}
+    depots = {d.id: d for d in instance.depots}
+    new_stations = _apply(stations, 'demands', demand_deltas or {}, instance.nb_products, "Station")
+    new_depots = _apply(depots, 'stocks', stock_deltas or {}, instance.nb_products, "Dépôt")
+    
+    changed = replace(
+        instance,
+        stations=[new_stations.get(s.id, s) for s in instance.stations],
+        depots=[new_depots.get(d.id, d) for d in instance.depots]
+    )
+    changed._cache.update(
+        (key, value) for key, value in instance._cache.items() if key not in _QUANTITY_CACHE_KEYS
+    )
+    return changed
+
+
+def _apply(items: dict, attribute: str, deltas: Deltas, nb_products: int, label: str) -> dict:
+    """Copies des stations / dépôts modifiés"""
+    changed = {}
+    for item_id, delta in deltas.items():
+        item = items.get(item_id)
+        if item is None:
+            raise ValueError(f"{label} {item_id} inconnu(e)")
+        if len(delta) != nb_products:
+            raise ValueError(f"{label} {item_id}: {len(delta)} variations pour {nb_products} produits")
+        values = [v + d for v, d in zip(getattr(item, attribute), delta)]
+        if min(values) < 0:
+            raise ValueError(f"{label} {item_id}: quantité négative après variation {list(delta)}")
+        changed[item_id] = replace(item, **{attribute: values})
+    return changed
+
+
+class IncrementalReoptimizer(ALNS):
+    """Réparation locale d'une solution après variation des demandes / stocks"""
+    
+    # Recherche courte: pas de copie O(n²) de la matrice des distances
+    dense_lists = False
+    
+    def __init__(
+        self,
+        instance: Instance,
+        params: Optional[ALNSParams] = None,
+        iterations_per_change: int = 10,
+        max_iterations: int = 500
+    ):
+        """
+        Args:
+            instance: Instance modifiée (voir apply_changes)
+            params: Paramètres de l'ALNS locale (iterations et max_removal
+                sont recalculés)
+            iterations_per_change: Itérations ALNS par livraison déplacée
+            max_iterations: Plafond d'itérations de l'ALNS locale
+        """
+        super().__init__(instance, params)
+        self.iterations_per_change = iterations_per_change
+        self.max_iterations = max_iterations
+    
+    def reoptimize(
+        self,
+        solution: Solution,
+        demand_deltas: Optional[Deltas] = None,
+        stock_deltas: Optional[Deltas] = None
+    ) -> Solution:
+        """
+        Adapte la solution (valide pour l'instance d'avant les variations).
+        
+        1. Demande en baisse: livraisons réduites (les plus petites d'abord,
+           qui disparaissent avec leur visite), chargements rééquilibrés.
+        2. Demande en hausse: quantité à livrer réinsérée (fusion avec une
+           visite existante si la capacité le permet).
+        3. Stock en baisse: les livraisons qui dépassent le nouveau stock d'un
+           dépôt sont retirées et réinsérées depuis un autre dépôt.
+        4. ALNS courte depuis l'état réparé: retraits limités aux stations
+           concernées et à leurs voisines, retraits et insertions aux routes
+           modifiées ou qui les visitent (les autres routes ne sont pas
+           parcourues et gardent leur coût en cache).
+        
+        Raises:
+            ValueError: Si les livraisons ne peuvent pas être réinsérées
+                (stocks ou capacités insuffisants)
+        """
+        start = time.perf_counter()
+        self._load(solution)
+        self._begin_move()
+        
+        requests: List[Request] = []
+        for station_id, deltas in (demand_deltas or {}).items():
+            for product, delta in enumerate(deltas):
+                if delta < 0:
+                    self._reduce(station_id, product, -delta)
+                elif delta > 0:
+                    requests.append(Request(station_id, product, delta))
+        for depot_id in (stock_deltas or {}):
+            for product in range(self.instance.nb_products):
+                requests.extend(self._evict(depot_id, product))
+        requests = [part for request in requests for part in self._split(request)]
+        
+        self._refresh_costs()
+        touched = set(self._backup)
+        self._commit_move()
+        self._begin_move()
+        if not self._repair(requests, regret=True):
+            # Stocks trop fragmentés pour les quantités groupées: insertion une
+            # à une, en découpant selon le stock restant des dépôts
+            self._rollback_move()
+            self._begin_move()
+            if not self._insert_splitting(requests):
+                raise ValueError("Réoptimisation: livraisons impossibles à réinsérer (stocks ou capacités)")
+        self._refresh_costs()
+        touched |= set(self._backup)
+        affected = len(touched)
+        self._commit_move()
+        repair_cost = self.total_cost
+        repair_time = time.perf_counter() - start
+        
+        changes = len(requests) + sum(1 for d in (demand_deltas or {}).values() for x in d if x < 0)
+        iterations = min(self.max_iterations, self.iterations_per_change * changes)
+        
+        # Voisinage du changement: stations modifiées ou déplacées et leurs voisines
+        focus = set(demand_deltas or {}) | {r.station_id for r in requests}
+        if self.near is not None:
+            focus |= {n for station_id in list(focus) for n in self.near[station_id]}
+        
+        # Routes modifiées et routes qui visitent le voisinage (la réparation
+        # ci-dessus a déjà pu ouvrir un véhicule vide)
+        scope = touched | {
+            v for v, route in enumerate(self.routes)
+            if any(d.station_id in focus for mr in route.mini_routes for d in mr.deliveries)
+        }
+        self.focus, self.scope = focus, sorted(scope)
+        
+        run_stats = {}
+        if affected and iterations > 0:
+            # Retraits par itération à l'échelle du changement (et non des
+            # livraisons du voisinage, nombreuses sur les grandes instances)
+            removal = min(self.params.max_removal, self.params.min_removal * changes)
+            self.params = replace(self.params, iterations=iterations, max_removal=removal)
+            result = self._search()
+            run_stats = self.stats
+        else:
+            result = self._build_solution(self.routes, 0.0)
+        
+        result.resolution_time = time.perf_counter() - start
+        self.stats = {
+            'changes': changes,
+            'reinserted': len(requests),
+            'affected_routes': affected,
+            'focus_stations': len(focus),
+            'scope_routes': len(self.scope),
+            'repair_cost': repair_cost,
+            'repair_time': repair_time,
+            'iterations': run_stats.get('iterations', 0),
+            'initial_cost': solution.total_cost(),
+            'best_cost': result.total_cost(),
+            'elapsed': result.resolution_time,
+        }
+        return result
+    
+    def _slots_of(self, station_id: Optional[int], product: int,
+                  depot_id: Optional[int] = None) -> List[_Slot]:
+        """Livraisons d'un produit (à une station, ou depuis un dépôt)"""
+        return [
+            _Slot(v, mr, dl)
+            for v, route in enumerate(self.routes)
+            for mr in route.mini_routes
+            if mr.product == product and (depot_id is None or mr.depot_id == depot_id)
+            for dl in mr.deliveries
+            if station_id is None or dl.station_id == station_id
+        ]
+    
+    def _take(self, slot: _Slot, quantity: int) -> Request:
+        """Retire quantity d'une livraison (la livraison entière si elle ne suffit pas)"""
+        if quantity >= slot.delivery.quantity:
+            return self._remove(slot)
+        self._touch(slot.vehicle)
+        slot.delivery.quantity -= quantity
+        slot.mini_route.quantity_loaded -= quantity
+        self.slack[slot.mini_route.depot_id][slot.mini_route.product] += quantity
+        return Request(slot.delivery.station_id, slot.mini_route.product, quantity)
+    
+    def _reduce(self, station_id: int, product: int, quantity: int):
+        """Baisse de demande: réduit les livraisons, les plus petites d'abord"""
+        slots = sorted(self._slots_of(station_id, product), key=lambda s: s.delivery.quantity)
+        for slot in slots:
+            if quantity <= 0:
+                break
+            quantity -= self._take(slot, quantity).quantity
+    
+    def _evict(self, depot_id: int, product: int) -> List[Request]:
+        """Stock négatif après baisse: retire des livraisons servies par ce dépôt"""
+        requests = []
+        while self.slack[depot_id][product] < 0:
+            deficit = -self.slack[depot_id][product]
+            slots = self._slots_of(None, product, depot_id)
+            if not slots:
+                break
+            # Une livraison qui couvre le déficit d'un coup, sinon la plus grosse
+            covering = [s for s in slots if s.delivery.quantity >= deficit]
+            if covering:
+                slot = min(covering, key=lambda s: s.delivery.quantity)
+            else:
+                slot = max(slots, key=lambda s: s.delivery.quantity)
+            requests.append(self._take(slot, deficit))
+        return requests
+    
+    def _insert_splitting(self, requests: List[Request]) -> bool:
+        """Insère les requêtes une à une (les plus grosses d'abord), par parts servies chacune par un dépôt"""
+        for request in sorted(requests, key=lambda r: -r.quantity):
+            quantity = request.quantity
+            while quantity > 0:
+                available = max(self.slack[d][request.product] for d in self.slack)
+                if available <= 0:
+                    return False
+                part = Request(request.station_id, request.product, min(quantity, available))
+                if not self._repair([part], regret=False):
+                    return False
+                quantity -= part.quantity
+        return True
+    
+    def _split(self, request: Request) -> List[Request]:
+        """
+        Découpe une quantité en livraisons transportables par un véhicule et
+        servies chacune par un seul dépôt (stock restant le plus grand).
+        """
+        available = max(self.slack[d][request.product] for d in self.slack)
+        capacity = min(max(self.capacity), max(available, 1))
+        parts = []
+        quantity = request.quantity
+        while quantity > 0:
+            part = min(quantity, capacity)
+            parts.append(Request(request.station_id, request.product, part))
+            quantity -= part
+        return parts
+
+
+def reoptimize(
+    solution: Solution,
+    demand_deltas: Optional[Deltas] = None,
+    stock_deltas: Optional[Deltas] = None,
+    seed: Optional[int] = None,
+    time_limit: Optional[float] = None,
+    neighbours: Optional[int] = 20,
+    iterations_per_change: int = 10,
+    max_iterations: int = 500
+) -> Solution:
+    """
+    Solution adaptée à des variations de demandes et/ou de stocks.
+    
+    Args:
+        solution: Solution courante (valide pour son instance)
+        demand_deltas: station_id -> variation de demande par produit
+            (ex: {12: [0, 150, -50]})
+        stock_deltas: dépôt_id -> variation de stock par produit
+        seed: Graine de l'ALNS locale
+        time_limit: Durée max. (s) de l'ALNS locale
+        neighbours: Taille des listes de voisins candidats
+        iterations_per_change: Itérations ALNS par livraison déplacée
+        max_iterations: Plafond d'itérations de l'ALNS locale
+    
+    Returns:
+        Solution: Solution pour la nouvelle instance (solution.instance)
+    """
+    instance = apply_changes(solution.instance, demand_deltas, stock_deltas)
+    engine = IncrementalReoptimizer(
+        instance,
+        ALNSParams(seed=seed, time_limit=time_limit, neighbours=neighbours),
+        iterations_per_change=iterations_per_change,
+        max_iterations=max_iterations
+    )
+    return engine.reoptimize(solution, demand_deltas, stock_deltas)
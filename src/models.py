@@ -4,9 +4,14 @@ Combine simplicité et robustesse
 """
 
 from dataclasses import dataclass, field
-from typing import List, Tuple
+from typing import Dict, List, Tuple
+import copy
 import math
 
+import numpy as np
+
+from distances import node_coordinates, distance_provider, k_nearest, DEFAULT_MEMORY_BUDGET
+
 
 @dataclass
 class Vehicle:
@@ -33,7 +38,11 @@ class Location:
     
     def distance_to(self, other: 'Location') -> float:
         """Calcule la distance euclidienne"""
-        return math.sqrt((self.x - other.x)**2 + (self.y - other.y)**2)
+        # dx*dx plutôt que dx**2: pow() de la libm n'est pas toujours
+        # correctement arrondi, et on doit coïncider avec la matrice numpy
+        dx = self.x - other.x
+        dy = self.y - other.y
+        return math.sqrt(dx * dx + dy * dy)
 
 
 @dataclass
@@ -73,6 +82,9 @@ class Instance:
     garages: List[Garage] = field(default_factory=list)
     stations: List[Station] = field(default_factory=list)
     
+    # Précalculs (index des nœuds, matrice de distances...) construits à la demande
+    _cache: Dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    
     def get_transition_cost(self, from_prod: int, to_prod: int) -> float:
         """Coût de changement de produit"""
         return self.transition_costs[from_prod][to_prod]
@@ -101,6 +113,117 @@ class Instance:
         """Récupère une station par ID"""
         return next((s for s in self.stations if s.id == station_id), None)
     
+    @property
+    def nb_nodes(self) -> int:
+        """Nombre total de nœuds (dépôts + garages + stations)"""
+        return len(self.depots) + len(self.garages) + len(self.stations)
+    
+    def _node_index(self) -> Dict[Tuple[str, int], int]:
+        """Index (type, id) -> nœud, dans l'ordre dépôts, garages, stations"""
+        index = self._cache.get('node_index')
+        if index is None:
+            index = {}
+            for kind, locations in (('depot', self.depots),
+                                    ('garage', self.garages),
+                                    ('station', self.stations)):
+                for loc in locations:
+                    index[(kind, loc.id)] = len(index)
+            self._cache['node_index'] = index
+        return index
+    
+    def depot_node(self, depot_id: int) -> int:
+        """Indice de nœud d'un dépôt"""
+        return self._node_index()[('depot', depot_id)]
+    
+    def garage_node(self, garage_id: int) -> int:
+        """Indice de nœud d'un garage"""
+        return self._node_index()[('garage', garage_id)]
+    
+    def station_node(self, station_id: int) -> int:
+        """Indice de nœud d'une station"""
+        return self._node_index()[('station', station_id)]
+    
+    def node_of(self, location: Location) -> int:
+        """Indice de nœud d'une localisation quelconque"""
+        if isinstance(location, Depot):
+            return self.depot_node(location.id)
+        if isinstance(location, Garage):
+            return self.garage_node(location.id)
+        return self.station_node(location.id)
+    
+    def coordinates(self):
+        """Coordonnées des nœuds (numpy, n_nodes x 2)"""
+        coords = self._cache.get('coordinates')
+        if coords is None:
+            coords = node_coordinates(self)
+            self._cache['coordinates'] = coords
+        return coords
+    
+    def distance_matrix(self):
+        """
+        Distances entre nœuds (créées une fois, mises en cache).
+        
+        Matrice NumPy dense si elle tient dans le budget mémoire, sinon
+        LazyDistanceMatrix (même indexation, calcul à la volée).
+        """
+        matrix = self._cache.get('distance_matrix')
+        if matrix is None:
+            budget = self._cache.get('memory_budget', DEFAULT_MEMORY_BUDGET)
+            matrix = distance_provider(self.coordinates(), budget)
+            self._cache['distance_matrix'] = matrix
+        return matrix
+    
+    def set_memory_budget(self, budget: int = DEFAULT_MEMORY_BUDGET):
+        """Budget mémoire (octets) des distances; None = matrice dense quelle que soit la taille"""
+        self._cache['memory_budget'] = budget
+        self._cache.pop('distance_matrix', None)
+    
+    def has_dense_distances(self) -> bool:
+        """La matrice des distances est-elle un tableau NumPy dense?"""
+        return isinstance(self.distance_matrix(), np.ndarray)
+    
+    def nearest_stations(self, k: int):
+        """
+        Listes candidates: pour chaque nœud, les k stations les plus proches.
+        
+        Returns:
+            np.ndarray (n_nodes, k): positions dans self.stations, par distance croissante
+            (une station n'est jamais sa propre voisine)
+        """
+        key = ('nearest_stations', k)
+        lists = self._cache.get(key)
+        if lists is None:
+            first = len(self.depots) + len(self.garages)
+            n_stations = len(self.stations)
+            k = min(k, max(n_stations - 1, 1))
+            matrix = self.distance_matrix()
+            # Par tuiles de lignes: jamais plus de ~4M distances en mémoire
+            step = max(1, (1 << 22) // max(n_stations, 1))
+            parts = []
+            for start in range(0, self.nb_nodes, step):
+                rows = np.arange(start, min(start + step, self.nb_nodes))
+                block = np.array(matrix[start:start + step, first:], dtype=np.float64)
+                own = rows >= first
+                block[np.flatnonzero(own), rows[own] - first] = np.inf
+                parts.append(k_nearest(block, k))
+            lists = np.concatenate(parts) if parts else np.empty((0, k), dtype=np.intp)
+            self._cache[key] = lists
+        return lists
+    
+    def nearest_depots(self, k: int):
+        """
+        Listes candidates: pour chaque nœud, les k dépôts les plus proches.
+        
+        Returns:
+            np.ndarray (n_nodes, k): positions dans self.depots, par distance croissante
+        """
+        key = ('nearest_depots', k)
+        lists = self._cache.get(key)
+        if lists is None:
+            lists = k_nearest(self.distance_matrix()[:, :len(self.depots)], k)
+            self._cache[key] = lists
+        return lists
+    
     def validate(self) -> Tuple[bool, List[str]]:
         """Valide la cohérence de l'instance"""
         errors = []
@@ -191,3 +314,12 @@ class Solution:
     
     def total_transitions(self) -> int:
         return sum(r.nb_transitions() for r in self.routes)
+    
+    def copy(self) -> 'Solution':
+        """Copie profonde des routes (l'instance est partagée)"""
+        return Solution(
+            instance=self.instance,
+            routes=copy.deepcopy(self.routes),
+            resolution_time=self.resolution_time,
+            processor=self.processor
+        )
@@ -15,9 +15,15 @@ def parse_instance(filepath: Union[str, Path]) -> Instance:
     if not filepath.exists():
         raise FileNotFoundError(f"Fichier introuvable: {filepath}")
     
+    with open(filepath, 'r') as f:
+        return parse_instance_text(f.read(), filepath.name)
+
+
+def parse_instance_text(content: str, name: str = "<texte>") -> Instance:
+    """Parse le contenu d'un fichier .dat (instance transmise sans fichier)"""
+    
     try:
-        with open(filepath, 'r') as f:
-            lines = [line.strip() for line in f if line.strip()]
+        lines = [line.strip() for line in content.splitlines() if line.strip()]
         
         if not lines:
             raise ValueError("Fichier vide")
@@ -96,4 +102,4 @@ def parse_instance(filepath: Union[str, Path]) -> Instance:
         )
     
     except Exception as e:
-        raise ValueError(f"Erreur parsing {filepath.name}: {e}")
+        raise ValueError(f"Erreur parsing {name}: {e}")
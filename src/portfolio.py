@@ -0,0 +1,454 @@
+"""
+Portefeuille d'algorithmes: choix de la stratégie de résolution d'après les
+caractéristiques de l'instance, dans un budget de latence (SLA)
+
+Le temps de chaque constructeur est prédit par un modèle log-linéaire en
+nombre de stations et de produits, ajusté sur les CSV de benchmark
+(solve_batch.py) avec une marge qui couvre le pire résidu. Le constructeur
+retenu est le meilleur (k plus proches instances de calibration, sinon
+rapport de coût moyen) dont le temps prédit tient dans le budget; le reste
+du budget va à l'ALNS.
+"""
+
+import csv
+import glob
+import json
+import math
+import os
+from dataclasses import dataclass, asdict, fields
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from models import Instance
+from parser import parse_instance
+
+
+DEFAULT_PORTFOLIO_PATH = Path("solutions") / "portfolio.json"
+
+# CSV de benchmark fournis (glouton, dans le dépôt) et sorties de solve_batch.py
+DEFAULT_BENCHMARKS = (
+    str(Path(__file__).resolve().parent.parent / "solutions" / "batch_results*.csv"),
+    str(Path("solutions") / "batch_results*.csv"),
+)
+
+CONSTRUCTORS = ('greedy', 'savings', 'products')
+
+# Temps des constructeurs sans mesures, relatif au glouton (moyennes sur les
+# 150 instances S/M/L, même machine)
+RELATIVE_LATENCY = {'greedy': 1.0, 'savings': 1.2, 'products': 1.7}
+
+# Réserve pour la validation, l'écriture et le dépassement de la dernière
+# itération ALNS: RESERVE_TIME + RESERVE_RATIO x budget
+RESERVE_TIME = 0.05
+RESERVE_RATIO = 0.05
+
+# En dessous, l'ALNS n'a pas le temps de faire mieux que la construction
+MIN_SEARCH_TIME = 0.2
+
+# Instances de calibration voisines consultées pour classer les constructeurs
+NEIGHBOURS = 5
+
+# Temps minimal pris en compte (log): les petites instances se résolvent en
+# moins que la résolution de l'horloge
+MIN_SAMPLE_TIME = 1e-4
+
+# Mesures prises en compte dans la marge relative des modèles de temps
+MARGIN_MIN_TIME = 0.01
+
+
+@dataclass
+class InstanceFeatures:
+    """Caractéristiques d'une instance, calculées en O(n) (sans matrice des distances)"""
+    nb_stations: int
+    nb_products: int
+    nb_depots: int
+    nb_vehicles: int
+    # Capacité totale de la flotte / demande totale (< 1: plusieurs tournées par camion)
+    capacity_demand_ratio: float
+    # Min. sur les produits du stock / demande (1 = stock juste suffisant)
+    stock_demand_ratio: float
+    # Distance moyenne des stations à leur barycentre / demi-diagonale du rectangle englobant
+    dispersion: float
+    # Coefficient de variation des coûts de changement de produit (hors diagonale)
+    transition_spread: float
+    # Coût moyen d'un changement de produit / distance moyenne au barycentre
+    transition_distance_ratio: float
+    
+    def vector(self) -> np.ndarray:
+        """Vecteur pour la recherche des voisins (tailles et rapports en log)"""
+        return np.array([
+            math.log(max(self.nb_stations, 1)),
+            math.log(max(self.nb_products, 1)),
+            math.log(max(self.nb_depots, 1)),
+            math.log(max(self.nb_vehicles, 1)),
+            math.log(max(self.capacity_demand_ratio, 1e-9)),
+            math.log(max(self.stock_demand_ratio, 1e-9)),
+            self.dispersion,
+            self.transition_spread,
+            math.log1p(self.transition_distance_ratio),
+        ])
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def extract_features(instance: Instance) -> InstanceFeatures:
+    """Caractéristiques de l'instance"""
+    demands = np.array([s.demands for s in instance.stations], dtype=np.float64).reshape(-1, instance.nb_products)
+    stocks = np.array([d.stocks for d in instance.depots], dtype=np.float64).reshape(-1, instance.nb_products)
+    demand_per_product = demands.sum(axis=0)
+    stock_per_product = stocks.sum(axis=0)
+    total_demand = demand_per_product.sum()
+    capacity = sum(v.capacity for v in instance.vehicles)
+    
+    demanded = demand_per_product > 0
+    stock_ratio = float((stock_per_product[demanded] / demand_per_product[demanded]).min()) if demanded.any() else 1.0
+    
+    coords = instance.coordinates()
+    spread_radius = 0.0
+    dispersion = 0.0
+    if instance.nb_stations:
+        # Stations en dernier dans l'ordre des nœuds
+        xy = coords[-instance.nb_stations:]
+        spread_radius = float(np.hypot(*(xy - xy.mean(axis=0)).T).mean())
+        half_diagonal = 0.5 * float(np.hypot(*(coords.max(axis=0) - coords.min(axis=0))))
+        dispersion = spread_radius / half_diagonal if half_diagonal > 0 else 0.0
+    
+    transitions = np.asarray(instance.transition_costs, dtype=np.float64)
+    off_diagonal = transitions[~np.eye(len(transitions), dtype=bool)] if transitions.size > 1 else np.zeros(0)
+    mean_transition = float(off_diagonal.mean()) if off_diagonal.size else 0.0
+    transition_spread = float(off_diagonal.std()) / mean_transition if mean_transition > 0 else 0.0
+    
+    return InstanceFeatures(
+        nb_stations=instance.nb_stations,
+        nb_products=instance.nb_products,
+        nb_depots=instance.nb_depots,
+        nb_vehicles=instance.nb_vehicles,
+        capacity_demand_ratio=capacity / total_demand if total_demand > 0 else float(capacity),
+        stock_demand_ratio=stock_ratio,
+        dispersion=dispersion,
+        transition_spread=transition_spread,
+        transition_distance_ratio=mean_transition / spread_radius if spread_radius > 0 else 0.0
+    )
+
+
+@dataclass
+class LatencyModel:
+    """log t = a + b log(stations) + c log(produits); borne haute = prédiction x marge + écart"""
+    coef: Tuple[float, float, float]
+    # Plus grand rapport mesure / prédiction (mesures d'au moins MARGIN_MIN_TIME)
+    margin: float
+    # Plus grand dépassement absolu restant (secondes): la borne couvre
+    # toutes les mesures de calibration
+    slack: float
+    samples: int
+    
+    def predict(self, nb_stations: int, nb_products: int) -> float:
+        a, b, c = self.coef
+        return math.exp(a + b * math.log(max(nb_stations, 1)) + c * math.log(max(nb_products, 1)))
+    
+    def upper(self, nb_stations: int, nb_products: int) -> float:
+        return self.predict(nb_stations, nb_products) * self.margin + self.slack
+
+
+def fit_latency(samples: Iterable[Tuple[int, int, float]]) -> Optional[LatencyModel]:
+    """Moindres carrés sur (stations, produits, temps); None avec moins de 3 mesures"""
+    samples = list(samples)
+    if len(samples) < 3:
+        return None
+    X = np.array([[1.0, math.log(max(n, 1)), math.log(max(p, 1))] for n, p, _ in samples])
+    times = np.array([t for _, _, t in samples])
+    coef, *_ = np.linalg.lstsq(X, np.log(np.maximum(times, MIN_SAMPLE_TIME)), rcond=None)
+    predicted = np.exp(X @ coef)
+    # Marge relative sur les mesures significatives; les petites (bruit de
+    # l'horloge, premier appel) ne comptent que par l'écart absolu
+    significant = times >= MARGIN_MIN_TIME
+    if not significant.any():
+        significant[:] = True
+    margin = max(float((times[significant] / predicted[significant]).max()), 1.0)
+    return LatencyModel(
+        coef=tuple(float(c) for c in coef),
+        margin=margin,
+        slack=max(float((times - margin * predicted).max()), 0.0),
+        samples=len(samples)
+    )
+
+
+@dataclass
+class Strategy:
+    """Stratégie retenue pour une instance"""
+    constructor: str
+    # Budget de l'ALNS après la construction (None = construction seule)
+    time_limit: Optional[float]
+    budget: float
+    # Part du budget réservée à la validation et à l'écriture
+    reserve: float
+    # Temps de construction prédit (borne haute)
+    predicted_time: float
+    # Construction prédite dans le budget
+    within_budget: bool
+    reason: str
+    
+    @property
+    def engine(self) -> str:
+        return "alns" if self.time_limit is not None else "greedy"
+    
+    @property
+    def name(self) -> str:
+        return f"{self.constructor}+alns" if self.time_limit is not None else self.constructor
+    
+    def remaining_search(self, elapsed: float) -> float:
+        """
+        Temps d'ALNS restant elapsed secondes après le choix de la stratégie:
+        une construction plus rapide que prévu laisse plus de temps à la
+        recherche, une initialisation lente en laisse moins.
+        """
+        return max(self.budget - self.reserve - elapsed, 0.0)
+    
+    def describe(self) -> str:
+        search = f", ALNS {self.time_limit:.2f}s" if self.time_limit is not None else ""
+        predicted = f"≤ {self.predicted_time:.3f}s" if math.isfinite(self.predicted_time) else "non calibrée"
+        return (f"{self.name} (construction {predicted}{search}, "
+                f"budget {self.budget:.2f}s; {self.reason})")
+
+
+def read_benchmarks(csv_paths: Iterable[Union[str, Path]]) -> List[Dict[str, Any]]:
+    """
+    Mesures des CSV de benchmark: une ligne par instance résolue.
+    
+    Sans colonne 'constructor' (CSV fournis), la construction est le glouton.
+    Le temps est celui de la construction seule (construct_time) quand la
+    résolution comprend aussi une ALNS, sinon solve_time.
+    """
+    rows = []
+    for path in csv_paths:
+        with open(path, 'r', newline='') as f:
+            for row in csv.DictReader(f):
+                try:
+                    rows.append({
+                        'instance': row['instance'],
+                        'constructor': row.get('constructor') or "greedy",
+                        'stations': int(row['stations']),
+                        'products': int(row['products']),
+                        'solve_time': float(row.get('construct_time') or row['solve_time']),
+                        'total_cost': float(row['total_cost']),
+                    })
+                except (KeyError, TypeError, ValueError):
+                    continue
+    return rows
+
+
+class Portfolio:
+    """Modèles de temps par constructeur et instances de référence (qualité)"""
+    
+    def __init__(
+        self,
+        latency: Dict[str, LatencyModel],
+        references: Optional[List[Dict[str, Any]]] = None,
+        sources: Optional[List[str]] = None
+    ):
+        """
+        Args:
+            latency: Modèle de temps par constructeur mesuré
+            references: Instances de calibration: rapports de coût de chaque
+                constructeur au meilleur ('ratios') et caractéristiques
+                ('features', absentes si l'instance n'a pas été trouvée)
+            sources: CSV de calibration
+        """
+        self.latency = latency
+        self.references = references or []
+        self.sources = sources or []
+        
+        # Normalisation des vecteurs de caractéristiques des références
+        located = [r for r in self.references if r.get('features')]
+        self._neighbours = None
+        if located:
+            vectors = np.array([InstanceFeatures(**r['features']).vector() for r in located])
+            mean = vectors.mean(axis=0)
+            std = vectors.std(axis=0)
+            std[std == 0] = 1.0
+            self._neighbours = (located, (vectors - mean) / std, mean, std)
+    
+    @classmethod
+    def calibrate(cls, csv_paths: Iterable[Union[str, Path]],
+                  instance_dirs: Iterable[Union[str, Path]] = ()) -> 'Portfolio':
+        """
+        Calibration sur des CSV de benchmark.
+        
+        Args:
+            csv_paths: CSV de solve_batch.py (colonnes instance, stations,
+                products, solve_time, total_cost, constructor optionnelle)
+            instance_dirs: Dossiers des instances mesurées, pour le choix par
+                caractéristiques (sinon rapports de coût moyens seulement)
+        """
+        csv_paths = [str(p) for p in csv_paths]
+        rows = read_benchmarks(csv_paths)
+        
+        samples: Dict[str, List[Tuple[int, int, float]]] = {}
+        costs: Dict[str, Dict[str, List[float]]] = {}
+        for row in rows:
+            samples.setdefault(row['constructor'], []).append(
+                (row['stations'], row['products'], row['solve_time'])
+            )
+            costs.setdefault(row['instance'], {}).setdefault(row['constructor'], []).append(row['total_cost'])
+        latency = {c: model for c, model in ((c, fit_latency(s)) for c, s in samples.items()) if model}
+        
+        paths = {}
+        for directory in instance_dirs:
+            for path in Path(directory).rglob("*.dat"):
+                paths.setdefault(path.name, path)
+        
+        references = []
+        for name, by_constructor in sorted(costs.items()):
+            means = {c: sum(v) / len(v) for c, v in by_constructor.items()}
+            best = min(means.values())
+            if best <= 0:
+                continue
+            reference = {'instance': name, 'ratios': {c: cost / best for c, cost in means.items()}}
+            if name in paths:
+                reference['features'] = extract_features(parse_instance(paths[name])).as_dict()
+            references.append(reference)
+        
+        return cls(latency, references, csv_paths)
+    
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'Portfolio':
+        with open(path, 'r') as f:
+            data = json.load(f)
+        names = {f.name for f in fields(InstanceFeatures)}
+        references = data.get('references', [])
+        for reference in references:
+            features = reference.get('features')
+            if features is not None and set(features) != names:
+                raise ValueError(f"Portefeuille invalide (caractéristiques): {path}")
+        latency = {
+            c: LatencyModel(tuple(m['coef']), m['margin'], m['slack'], m['samples'])
+            for c, m in data.get('latency', {}).items()
+        }
+        return cls(latency, references, data.get('sources'))
+    
+    @classmethod
+    def from_benchmarks(cls) -> 'Portfolio':
+        """Calibration à la volée sur les CSV de benchmark (temps seulement)"""
+        paths = {Path(p).resolve() for pattern in DEFAULT_BENCHMARKS for p in glob.glob(pattern)}
+        return cls.calibrate(sorted(paths))
+    
+    @classmethod
+    def default(cls, path: Optional[Union[str, Path]] = None) -> 'Portfolio':
+        """Calibration enregistrée, sinon calibration à la volée sur les CSV de benchmark"""
+        path = Path(path) if path else DEFAULT_PORTFOLIO_PATH
+        if path.exists():
+            return cls.load(path)
+        return cls.from_benchmarks()
+    
+    def save(self, path: Optional[Union[str, Path]] = None):
+        """Écriture atomique de la calibration"""
+        path = Path(path) if path else DEFAULT_PORTFOLIO_PATH
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'sources': self.sources,
+            'latency': {c: asdict(m) for c, m in self.latency.items()},
+            'references': self.references,
+        }
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+        os.replace(tmp_path, path)
+    
+    def predict_time(self, constructor: str, features: InstanceFeatures) -> float:
+        """
+        Borne haute du temps de construction.
+        
+        Un constructeur sans mesures reprend le modèle du glouton, multiplié
+        par son temps relatif; sans aucun modèle, la borne est infinie.
+        """
+        model = self.latency.get(constructor)
+        if model is not None:
+            return model.upper(features.nb_stations, features.nb_products)
+        greedy = self.latency.get('greedy')
+        if greedy is None:
+            return math.inf
+        return greedy.upper(features.nb_stations, features.nb_products) * RELATIVE_LATENCY.get(constructor, 2.0)
+    
+    def rank_constructors(self, features: InstanceFeatures) -> Tuple[List[str], str]:
+        """
+        Constructeurs du meilleur au moins bon, et justification.
+        
+        Rapport de coût moyen au meilleur sur les NEIGHBOURS instances de
+        calibration les plus proches, sinon sur toutes; les constructeurs
+        jamais comparés viennent ensuite, le glouton en tête.
+        """
+        references = self.references
+        scope = "toutes les instances"
+        if self._neighbours is not None:
+            located, vectors, mean, std = self._neighbours
+            distances = np.linalg.norm(vectors - (features.vector() - mean) / std, axis=1)
+            nearest = np.argsort(distances)[:NEIGHBOURS]
+            references = [located[i] for i in nearest]
+            scope = f"{len(references)} instances voisines"
+        
+        ratios: Dict[str, List[float]] = {}
+        for reference in references:
+            if len(reference['ratios']) > 1:
+                for c, ratio in reference['ratios'].items():
+                    ratios.setdefault(c, []).append(ratio)
+        scores = {c: sum(v) / len(v) for c, v in ratios.items()}
+        
+        unranked = [c for c in CONSTRUCTORS if c not in scores]
+        ranked = sorted(scores, key=scores.get) + unranked
+        if not scores:
+            return ranked, "aucune comparaison de constructeurs"
+        best = ranked[0]
+        return ranked, f"coût x{scores[best]:.3f} du meilleur sur {scope}"
+    
+    def select(
+        self,
+        features: InstanceFeatures,
+        budget: float,
+        preferred: Optional[str] = None
+    ) -> Strategy:
+        """
+        Stratégie dans le budget (secondes restantes pour la résolution).
+        
+        Le constructeur préféré (ligne de commande ou configuration réglée)
+        passe en tête s'il tient dans le budget; sinon le mieux classé qui
+        tient, à défaut le plus rapide (within_budget=False). Le temps
+        restant après la construction et la réserve va à l'ALNS s'il
+        dépasse MIN_SEARCH_TIME.
+        """
+        ranked, reason = self.rank_constructors(features)
+        if preferred in ranked:
+            ranked.remove(preferred)
+            ranked.insert(0, preferred)
+            reason = "constructeur demandé"
+        
+        reserve = RESERVE_TIME + RESERVE_RATIO * max(budget, 0.0)
+        available = budget - reserve
+        predictions = [(c, self.predict_time(c, features)) for c in ranked]
+        fitting = [(c, t) for c, t in predictions if t <= available]
+        if fitting:
+            constructor, predicted = fitting[0]
+            if constructor != ranked[0]:
+                reason = f"{ranked[0]} hors budget"
+        elif not self.latency:
+            constructor, predicted = predictions[0]
+            reason = "aucun CSV de benchmark, temps non prédit"
+        else:
+            constructor, predicted = min(predictions, key=lambda ct: ct[1])
+            reason = "aucun constructeur dans le budget, le plus rapide"
+        
+        remaining = available - predicted
+        return Strategy(
+            constructor=constructor,
+            time_limit=remaining if fitting and remaining >= MIN_SEARCH_TIME else None,
+            budget=budget,
+            reserve=reserve,
+            predicted_time=predicted,
+            within_budget=bool(fitting),
+            reason=reason
+        )
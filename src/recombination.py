@@ -0,0 +1,283 @@
+"""
+Recombinaison par partitionnement sur le pool de mini-routes (OR-Tools CP-SAT)
+
+Le modèle choisit combien de fois utiliser chaque mini-route du pool et
+les quantités qu'elle livre à chacune de ses stations (livraisons
+fractionnées): demandes couvertes exactement, charge d'une utilisation au
+plus la plus grande capacité, stocks des dépôts respectés. Le coût d'une
+mini-route est son trajet depuis le dépôt, sortie vers le dépôt le plus
+proche, indépendamment de l'enchaînement. Les mini-routes retenues sont
+ensuite affectées aux véhicules: à la place des mini-routes de même
+colonne dans l'incumbent (qui sert d'indice), les autres par insertion de
+moindre coût, ou toutes par ajouts successifs comme dans Clarke-Wright;
+chaque véhicule est réordonné (changeovers, trajets à vide) et la
+meilleure des deux affectations est retenue.
+"""
+
+import math
+import platform
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from ortools.sat.python import cp_model
+
+from models import Instance, Solution, VehicleRoute, MiniRoute, Delivery
+from route_pool import RoutePool, column_key
+from solver_cpsat import SCALE, DEFAULT_WORKERS, _STATUS
+from solver_products import ProductDecompositionSolver
+from solver_savings import _Trip
+from solver_simple import compute_metrics
+
+
+DEFAULT_TIME_LIMIT = 10.0
+
+
+class SetPartitioningRecombiner(ProductDecompositionSolver):
+    """Meilleure combinaison des mini-routes récoltées, puis séquencement par véhicule"""
+    
+    def __init__(
+        self,
+        instance: Instance,
+        pool: RoutePool,
+        time_limit: float = DEFAULT_TIME_LIMIT,
+        workers: int = DEFAULT_WORKERS,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            instance: Instance résolue
+            pool: Mini-routes récoltées
+            time_limit: Temps max. de la recherche CP-SAT (secondes)
+            workers: Threads de recherche CP-SAT en parallèle
+            seed: Graine de CP-SAT
+        """
+        super().__init__(instance)
+        self.pool = pool
+        self.time_limit = time_limit
+        self.workers = workers
+        self.seed = seed
+        self.stats: Dict = {}
+    
+    def solve(self, incumbent: Solution) -> Solution:
+        """
+        Recombine le pool; incumbent (valide) sert d'indice et est renvoyée
+        si la recombinaison ne l'améliore pas.
+        
+        stats: statut CP-SAT, coût des mini-routes (modèle) et sa borne,
+        mini-routes du pool et retenues, coût de l'incumbent, de la
+        recombinaison séquencée et retenu, source retenue.
+        """
+        start = time.perf_counter()
+        self.pool.protect(incumbent)
+        columns = list(self.pool)
+        
+        build_start = time.perf_counter()
+        model, counts, quantities = self._build_model(columns)
+        self._add_hint(model, columns, counts, quantities, incumbent)
+        build_time = time.perf_counter() - build_start
+        
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = self.time_limit
+        solver.parameters.num_workers = max(1, self.workers)
+        if self.seed is not None:
+            solver.parameters.random_seed = self.seed
+        status = solver.Solve(model)
+        
+        solution = None
+        selected = 0
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            trips = self._trips(solver, columns, counts, quantities)
+            selected = len(trips)
+            for routes in (self._sequence_like(trips, columns, incumbent),
+                           self._sequence_vehicles([trip for _, trip in trips])):
+                candidate = Solution(instance=self.instance, processor=platform.processor() or "Unknown")
+                candidate.routes = [self._resequence(r) for r in routes]
+                compute_metrics(candidate)
+                if solution is None or candidate.total_cost() < solution.total_cost():
+                    solution = candidate
+        
+        recombined_cost = solution.total_cost() if solution is not None else math.inf
+        source = "recombination"
+        if solution is None or solution.total_cost() >= incumbent.total_cost() - 1e-6:
+            solution, source = incumbent, "incumbent"
+        
+        solved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        self.stats = {
+            'status': _STATUS.get(status, "unknown"),
+            'columns': len(columns),
+            'selected': selected,
+            'model_cost': solver.ObjectiveValue() / SCALE if solved else math.inf,
+            'model_bound': solver.BestObjectiveBound() / SCALE if solved else math.inf,
+            'incumbent_cost': incumbent.total_cost(),
+            'recombined_cost': recombined_cost,
+            'cost': solution.total_cost(),
+            'gain': incumbent.total_cost() - solution.total_cost(),
+            'source': source,
+            'workers': solver.parameters.num_workers,
+            'build_time': build_time,
+            'search_time': solver.WallTime(),
+            'elapsed': time.perf_counter() - start,
+        }
+        return solution
+    
+    def _build_model(self, columns):
+        instance = self.instance
+        model = cp_model.CpModel()
+        demand = {s.id: s.demands for s in instance.stations}
+        
+        counts = []
+        quantities = {}
+        served = defaultdict(list)      # (station, produit) -> quantités
+        loaded = defaultdict(list)      # (dépôt, produit) -> quantités
+        objective = []
+        
+        for c, column in enumerate(columns):
+            p = column.product
+            total = sum(demand[s][p] for s in column.stations)
+            # Utilisations: de quoi livrer toutes ses stations à pleine capacité
+            upper = math.ceil(total / self.capacity) + 1
+            n = model.NewIntVar(0, upper, f"n_{c}")
+            counts.append(n)
+            objective.append(math.floor(column.cost * SCALE) * n)
+            
+            column_quantities = []
+            for s in column.stations:
+                q = model.NewIntVar(0, demand[s][p], f"q_{c}_{s}")
+                model.Add(q <= demand[s][p] * n)
+                quantities[c, s] = q
+                column_quantities.append(q)
+                served[s, p].append(q)
+                loaded[column.depot_id, p].append(q)
+            model.Add(sum(column_quantities) <= self.capacity * n)
+        
+        for station in instance.stations:
+            for p, d in enumerate(station.demands):
+                if d > 0:
+                    model.Add(sum(served[station.id, p]) == d)
+        for depot in instance.depots:
+            for p, stock in enumerate(depot.stocks):
+                if loaded[depot.id, p]:
+                    model.Add(sum(loaded[depot.id, p]) <= stock)
+        
+        model.Minimize(sum(objective))
+        return model, counts, quantities
+    
+    def _add_hint(self, model, columns, counts, quantities, incumbent: Solution):
+        """Utilisations et quantités de l'incumbent (toutes ses mini-routes sont dans le pool)"""
+        index = {column.key: c for c, column in enumerate(columns)}
+        uses = defaultdict(int)
+        delivered = defaultdict(int)
+        for route in incumbent.routes:
+            for mr in route.mini_routes:
+                c = index.get(column_key(mr))
+                if c is None:
+                    continue
+                uses[c] += 1
+                for d in mr.deliveries:
+                    delivered[c, d.station_id] += d.quantity
+        for c, n in enumerate(counts):
+            model.AddHint(n, uses[c])
+        for (c, s), q in quantities.items():
+            model.AddHint(q, delivered[c, s])
+    
+    def _trips(self, solver, columns, counts, quantities) -> List[Tuple[int, _Trip]]:
+        """
+        Utilisations retenues (colonne, mini-route), quantités réparties à
+        pleine capacité dans l'ordre des stations
+        """
+        trips = []
+        for c, column in enumerate(columns):
+            n = solver.Value(counts[c])
+            if n == 0:
+                continue
+            remaining = [(s, solver.Value(quantities[c, s])) for s in column.stations]
+            remaining = [(s, q) for s, q in remaining if q > 0]
+            while remaining:
+                trip = _Trip(column.product, column.depot_id)
+                room = self.capacity
+                while remaining and room > 0:
+                    s, q = remaining[0]
+                    take = min(q, room)
+                    trip.stations.append(s)
+                    trip.quantities.append(take)
+                    room -= take
+                    if take == q:
+                        remaining.pop(0)
+                    else:
+                        remaining[0] = (s, q - take)
+                trips.append((c, trip))
+        return trips
+    
+    def _sequence_like(self, trips, columns, incumbent: Solution) -> List[VehicleRoute]:
+        """
+        Affectation calquée sur l'incumbent: chaque mini-route retenue prend la
+        place d'une mini-route de même colonne (si la capacité le permet), les
+        autres sont insérées à la position de moindre coût
+        D[fin_précédente, dépôt] + T[produit_précédent, produit] + D[dernière, début_suivant]
+        + T[produit, produit_suivant] - (coût de l'enchaînement remplacé).
+        """
+        instance = self.instance
+        transitions = instance.transition_costs
+        index = {column.key: c for c, column in enumerate(columns)}
+        available = defaultdict(list)
+        for c, trip in trips:
+            available[c].append(trip)
+        
+        vehicles = {v.id: v for v in instance.vehicles}
+        slots = {v.id: [] for v in instance.vehicles}
+        for route in incumbent.routes:
+            capacity = vehicles[route.vehicle_id].capacity
+            for mr in route.mini_routes:
+                candidates = available.get(index.get(column_key(mr)), [])
+                fit = next((t for t in candidates if t.load <= capacity), None)
+                if fit is not None:
+                    candidates.remove(fit)
+                    slots[route.vehicle_id].append(fit)
+        
+        def link(a_node, a_product, trip, b_node, b_product):
+            cost = self.dist[a_node, instance.depot_node(trip.depot_id)]
+            cost += self.dist[instance.station_node(trip.stations[-1]), b_node]
+            if a_product != trip.product:
+                cost += transitions[a_product][trip.product]
+            if b_product is not None and b_product != trip.product:
+                cost += transitions[trip.product][b_product]
+            return cost
+        
+        for trip in sorted((t for ts in available.values() for t in ts), key=lambda t: -t.load):
+            best = (math.inf, None, 0)
+            for v in instance.vehicles:
+                if trip.load > v.capacity:
+                    continue
+                garage = instance.garage_node(v.home_garage)
+                sequence = slots[v.id]
+                # Enchaînements: garage -> m_0 -> ... -> m_n-1 -> garage
+                ends = [(garage, v.initial_product - 1)]
+                ends += [(instance.station_node(t.stations[-1]), t.product) for t in sequence]
+                starts = [(instance.depot_node(t.depot_id), t.product) for t in sequence]
+                starts.append((garage, None))
+                for i in range(len(sequence) + 1):
+                    (a_node, a_product), (b_node, b_product) = ends[i], starts[i]
+                    current = self.dist[a_node, b_node]
+                    if b_product is not None and a_product != b_product:
+                        current += transitions[a_product][b_product]
+                    delta = link(a_node, a_product, trip, b_node, b_product) - current
+                    if delta < best[0]:
+                        best = (delta, v.id, i)
+            _, vehicle_id, position = best
+            slots[vehicle_id].insert(position, trip)
+        
+        routes = []
+        for v in instance.vehicles:
+            if not slots[v.id]:
+                continue
+            routes.append(VehicleRoute(v.id, v.home_garage, v.initial_product - 1, [
+                MiniRoute(
+                    product=t.product,
+                    depot_id=t.depot_id,
+                    quantity_loaded=t.load,
+                    deliveries=[Delivery(s, q) for s, q in zip(t.stations, t.quantities)]
+                )
+                for t in slots[v.id]
+            ]))
+        return routes
@@ -0,0 +1,153 @@
+"""
+Cache des résultats de résolution (SQLite)
+Une entrée = solution finale et métriques pour une instance (empreinte du
+contenu), un solveur, ses paramètres et une version du code. Éviction LRU
+quand la taille totale dépasse le budget.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+
+DEFAULT_MAX_MB = 256.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key        TEXT PRIMARY KEY,
+    solution   TEXT NOT NULL,
+    metrics    TEXT,
+    size       INTEGER NOT NULL,
+    created    REAL NOT NULL,
+    last_used  REAL NOT NULL,
+    hits       INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries(last_used);
+"""
+
+_code_version: Optional[str] = None
+
+
+def code_version() -> str:
+    """
+    Version du solveur: empreinte des sources (main.py et src/*.py).
+    
+    Toute modification du code invalide les entrées existantes, y compris
+    sur un arbre git non commité.
+    """
+    global _code_version
+    if _code_version is None:
+        root = Path(__file__).resolve().parent
+        digest = hashlib.sha1()
+        for path in sorted(root.glob("*.py")) + [root.parent / "main.py"]:
+            if path.exists():
+                digest.update(path.name.encode())
+                digest.update(path.read_bytes())
+        _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+
+def cache_key(instance_content: bytes, solver: str, parameters: Dict[str, Any],
+              version: Optional[str] = None) -> str:
+    """Clé: empreinte du contenu de l'instance, solveur, paramètres et version"""
+    digest = hashlib.sha256()
+    digest.update(hashlib.sha256(instance_content).digest())
+    digest.update(json.dumps(
+        {'solver': solver, 'parameters': parameters, 'version': version or code_version()},
+        sort_keys=True, default=str
+    ).encode())
+    return digest.hexdigest()
+
+
+@dataclass
+class CachedResult:
+    """Solution (texte .dat) et métriques d'une entrée du cache"""
+    solution: str
+    metrics: Dict[str, Any]
+    hits: int
+
+
+class ResultCache:
+    """Cache LRU borné en taille de solutions finales"""
+    
+    def __init__(self, db_path: Union[str, Path], max_mb: float = DEFAULT_MAX_MB):
+        """
+        Args:
+            db_path: Base SQLite du cache
+            max_mb: Taille max. (Mo) des solutions stockées; au-delà, les
+                entrées les moins récemment utilisées sont supprimées
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_mb * 2 ** 20)
+        # Plusieurs processus (relances) peuvent partager le cache
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30)
+        self.conn.executescript(SCHEMA)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        self.conn.close()
+    
+    def get(self, key: str) -> Optional[CachedResult]:
+        """Entrée du cache (None si absente); la marque comme récemment utilisée"""
+        row = self.conn.execute(
+            "SELECT solution, metrics, hits FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self.conn.execute(
+            "UPDATE entries SET last_used = ?, hits = hits + 1 WHERE key = ?",
+            (time.time(), key)
+        )
+        self.conn.commit()
+        return CachedResult(row[0], json.loads(row[1]) if row[1] else {}, row[2] + 1)
+    
+    def put(self, key: str, solution: str, metrics: Optional[Dict[str, Any]] = None):
+        """Ajoute (ou remplace) une entrée puis applique le budget de taille"""
+        size = len(solution.encode())
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO entries (key, solution, metrics, size, created, last_used, hits) "
+            "VALUES (?, ?, ?, ?, ?, ?, 0)",
+            (key, solution, json.dumps(metrics or {}, default=str), size, now, now)
+        )
+        self._evict()
+        self.conn.commit()
+    
+    def _evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà du budget"""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in self.conn.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            if freed >= excess:
+                break
+            victims.append((key,))
+            freed += size
+        self.conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+    
+    def clear(self):
+        self.conn.execute("DELETE FROM entries")
+        self.conn.commit()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Nombre d'entrées, taille totale et nombre de hits"""
+        count, size, hits = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) FROM entries"
+        ).fetchone()
+        return {'entries': count, 'size_mb': size / 2 ** 20, 'max_mb': self.max_bytes / 2 ** 20, 'hits': hits}
@@ -0,0 +1,188 @@
+"""
+Historique des résultats de batch (SQLite)
+Un "run" = une exécution de solve_batch; un résultat = une instance d'un run
+"""
+
+import json
+import sqlite3
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at    TEXT NOT NULL,
+    git_revision  TEXT,
+    instance_dir  TEXT,
+    parameters    TEXT,
+    label         TEXT
+);
+
+CREATE TABLE IF NOT EXISTS results (
+    run_id           INTEGER NOT NULL REFERENCES runs(run_id),
+    instance         TEXT NOT NULL,
+    stations         INTEGER,
+    products         INTEGER,
+    vehicles_used    INTEGER,
+    distance         REAL,
+    transition_cost  REAL,
+    total_cost       REAL,
+    transitions      INTEGER,
+    lower_bound      REAL,
+    gap              REAL,
+    solve_time       REAL,
+    valid_local      INTEGER,
+    valid_api        INTEGER,
+    metrics          TEXT,
+    PRIMARY KEY (run_id, instance)
+);
+
+CREATE INDEX IF NOT EXISTS idx_results_instance ON results(instance);
+CREATE INDEX IF NOT EXISTS idx_results_run ON results(run_id);
+"""
+
+# Colonnes dédiées; les autres clés d'un résultat vont dans metrics (JSON)
+RESULT_COLUMNS = [
+    'instance', 'stations', 'products', 'vehicles_used', 'distance',
+    'transition_cost', 'total_cost', 'transitions', 'lower_bound', 'gap',
+    'solve_time', 'valid_local', 'valid_api'
+]
+
+
+def git_revision(repo_dir: Optional[Union[str, Path]] = None) -> str:
+    """Révision git courte (suffixe -dirty si l'arbre est modifié), ou 'unknown'"""
+    repo_dir = Path(repo_dir) if repo_dir else Path(__file__).resolve().parent.parent
+    try:
+        rev = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=repo_dir, capture_output=True, text=True, timeout=10
+        ).stdout.strip()
+        if not rev:
+            return "unknown"
+        dirty = subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'],
+            cwd=repo_dir, capture_output=True, text=True, timeout=10
+        ).stdout.strip()
+        return f"{rev}-dirty" if dirty else rev
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+class ResultsStore:
+    """Stockage SQLite des runs et résultats de batch"""
+    
+    def __init__(self, db_path: Union[str, Path]):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        self.conn.close()
+    
+    def start_run(
+        self,
+        parameters: Dict[str, Any],
+        instance_dir: Optional[Union[str, Path]] = None,
+        label: Optional[str] = None
+    ) -> int:
+        """Enregistre un nouveau run et retourne son identifiant"""
+        cur = self.conn.execute(
+            "INSERT INTO runs (started_at, git_revision, instance_dir, parameters, label) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                datetime.now().isoformat(timespec='seconds'),
+                git_revision(),
+                str(instance_dir) if instance_dir else None,
+                json.dumps(parameters, sort_keys=True),
+                label
+            )
+        )
+        self.conn.commit()
+        return cur.lastrowid
+    
+    def record(self, run_id: int, result: Dict[str, Any]):
+        """Enregistre le résultat d'une instance (remplace un éventuel précédent)"""
+        values = [result.get(col) for col in RESULT_COLUMNS]
+        extra = {k: v for k, v in result.items() if k not in RESULT_COLUMNS}
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO results (run_id, {', '.join(RESULT_COLUMNS)}, metrics) "
+            f"VALUES (?, {', '.join('?' * len(RESULT_COLUMNS))}, ?)",
+            [run_id] + values + [json.dumps(extra) if extra else None]
+        )
+        self.conn.commit()
+    
+    def runs(self) -> List[Dict[str, Any]]:
+        """Liste des runs avec leur nombre d'instances et coût moyen"""
+        rows = self.conn.execute(
+            "SELECT r.*, COUNT(x.instance) AS nb_instances, AVG(x.total_cost) AS avg_cost "
+            "FROM runs r LEFT JOIN results x ON x.run_id = r.run_id "
+            "GROUP BY r.run_id ORDER BY r.run_id"
+        ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def results(self, run_id: int) -> List[Dict[str, Any]]:
+        """Résultats d'un run"""
+        rows = self.conn.execute(
+            "SELECT * FROM results WHERE run_id = ? ORDER BY instance", (run_id,)
+        ).fetchall()
+        return [self._row_to_result(row) for row in rows]
+    
+    def history(self, instance: str) -> List[Dict[str, Any]]:
+        """Historique d'une instance sur tous les runs"""
+        rows = self.conn.execute(
+            "SELECT x.*, r.started_at, r.git_revision FROM results x "
+            "JOIN runs r ON r.run_id = x.run_id "
+            "WHERE x.instance = ? ORDER BY x.run_id", (instance,)
+        ).fetchall()
+        return [self._row_to_result(row) for row in rows]
+    
+    def compare(self, run_a: int, run_b: int) -> List[Dict[str, Any]]:
+        """
+        Compare deux runs sur leurs instances communes.
+        
+        Returns:
+            list: Par instance: coûts, écart de coût (b - a), temps et
+            accélération (temps_a / temps_b)
+        """
+        rows = self.conn.execute(
+            "SELECT a.instance, a.total_cost AS cost_a, b.total_cost AS cost_b, "
+            "a.solve_time AS time_a, b.solve_time AS time_b "
+            "FROM results a JOIN results b ON a.instance = b.instance "
+            "WHERE a.run_id = ? AND b.run_id = ? ORDER BY a.instance",
+            (run_a, run_b)
+        ).fetchall()
+        
+        comparison = []
+        for row in rows:
+            cost_a, cost_b = row['cost_a'], row['cost_b']
+            time_a, time_b = row['time_a'], row['time_b']
+            comparison.append({
+                'instance': row['instance'],
+                'cost_a': cost_a,
+                'cost_b': cost_b,
+                'cost_delta': cost_b - cost_a,
+                'cost_delta_pct': 100 * (cost_b - cost_a) / cost_a if cost_a else 0.0,
+                'time_a': time_a,
+                'time_b': time_b,
+                'speedup': time_a / time_b if time_b else float('inf'),
+            })
+        return comparison
+    
+    @staticmethod
+    def _row_to_result(row: sqlite3.Row) -> Dict[str, Any]:
+        result = dict(row)
+        metrics = result.pop('metrics', None)
+        if metrics:
+            result.update(json.loads(metrics))
+        return result
@@ -0,0 +1,144 @@
+"""
+Pool de mini-routes
+Collecte les mini-routes distinctes de toutes les solutions produites pour
+une instance (constructions, redémarrages, ALNS, pool élite) avec leur
+coût. Une mini-route est identifiée par son produit, son dépôt et son
+ensemble de stations: seul le meilleur ordre de visite est gardé, les
+quantités sont laissées libres (recombination.py les refixe). Le pool est
+borné: au-delà de sa capacité, les mini-routes de plus mauvais coût par
+unité livrée sont évincées, jamais celles de l'incumbent.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from models import Instance, Solution, MiniRoute
+
+
+ColumnKey = Tuple[int, int, FrozenSet[int]]
+
+DEFAULT_CAPACITY = 5000
+
+
+@dataclass(eq=False)
+class Column:
+    """Mini-route du pool: chargement au dépôt puis stations dans l'ordre"""
+    product: int
+    depot_id: int
+    stations: Tuple[int, ...]
+    # Dépôt -> stations -> dépôt le plus proche: ne dépend pas de l'enchaînement
+    cost: float
+    # Plus grande quantité chargée observée
+    load: int
+    # Nombre de solutions où elle est apparue
+    hits: int = 1
+    
+    @property
+    def key(self) -> ColumnKey:
+        return (self.product, self.depot_id, frozenset(self.stations))
+    
+    @property
+    def unit_cost(self) -> float:
+        return self.cost / max(self.load, 1)
+
+
+def column_key(mini_route: MiniRoute) -> ColumnKey:
+    return (mini_route.product, mini_route.depot_id, frozenset(d.station_id for d in mini_route.deliveries))
+
+
+class RoutePool:
+    """Pool borné et dédupliqué des mini-routes rencontrées"""
+    
+    def __init__(self, instance: Instance, capacity: int = DEFAULT_CAPACITY):
+        """
+        Args:
+            instance: Instance résolue
+            capacity: Nombre maximal de mini-routes conservées
+        """
+        self.instance = instance
+        self.capacity = capacity
+        self.dist = instance.distance_matrix()
+        self._depot_nodes = [instance.depot_node(d.id) for d in instance.depots]
+        self.columns: Dict[ColumnKey, Column] = {}
+        self.protected: Set[ColumnKey] = set()
+        self.stats = {'solutions': 0, 'mini_routes': 0, 'duplicates': 0, 'evicted': 0}
+    
+    def __len__(self) -> int:
+        return len(self.columns)
+    
+    def __iter__(self):
+        return iter(self.columns.values())
+    
+    def add(self, solution: Solution) -> int:
+        """
+        Récolte les mini-routes d'une solution.
+        
+        Returns:
+            int: Nombre de mini-routes nouvelles dans le pool
+        """
+        self.stats['solutions'] += 1
+        added = 0
+        for route in solution.routes:
+            for mr in route.mini_routes:
+                if mr.deliveries:
+                    added += self._add_mini_route(mr)
+        if len(self.columns) > self.capacity:
+            self._evict()
+        return added
+    
+    def add_all(self, solutions: Iterable[Solution]) -> int:
+        return sum(self.add(s) for s in solutions)
+    
+    def protect(self, solution: Solution):
+        """Mini-routes de l'incumbent: ajoutées si absentes et exclues de l'éviction"""
+        self.protected = set()
+        for route in solution.routes:
+            for mr in route.mini_routes:
+                if mr.deliveries:
+                    key = column_key(mr)
+                    if key not in self.columns:
+                        self._add_mini_route(mr)
+                    self.protected.add(key)
+    
+    def get(self, mini_route: MiniRoute) -> Optional[Column]:
+        return self.columns.get(column_key(mini_route))
+    
+    def _add_mini_route(self, mr: MiniRoute) -> int:
+        self.stats['mini_routes'] += 1
+        key = column_key(mr)
+        stations = tuple(d.station_id for d in mr.deliveries)
+        column = self.columns.get(key)
+        if column is not None:
+            self.stats['duplicates'] += 1
+            column.hits += 1
+            column.load = max(column.load, mr.quantity_loaded)
+            if stations != column.stations:
+                cost = self._column_cost(mr.depot_id, stations)
+                if cost < column.cost - 1e-9:
+                    column.stations, column.cost = stations, cost
+            return 0
+        
+        self.columns[key] = Column(mr.product, mr.depot_id, stations,
+                                   self._column_cost(mr.depot_id, stations), mr.quantity_loaded)
+        return 1
+    
+    def _column_cost(self, depot_id: int, stations: Tuple[int, ...]) -> float:
+        """Trajet depuis le dépôt, sortie vers le dépôt le plus proche (chargement suivant)"""
+        instance = self.instance
+        nodes = [instance.depot_node(depot_id)] + [instance.station_node(s) for s in stations]
+        path = sum(self.dist[a, b] for a, b in zip(nodes, nodes[1:]))
+        return float(path + min(self.dist[nodes[-1], d] for d in self._depot_nodes))
+    
+    def _evict(self):
+        """Ramène le pool à 90% de sa capacité (éviction par lots)"""
+        target = int(self.capacity * 0.9)
+        candidates: List[Column] = sorted(
+            (c for k, c in self.columns.items() if k not in self.protected),
+            key=lambda c: (c.unit_cost, -c.hits)
+        )
+        overflow = len(self.columns) - target
+        if overflow <= 0:
+            return
+        for column in candidates[max(len(candidates) - overflow, 0):]:
+            del self.columns[column.key]
+            self.stats['evicted'] += 1
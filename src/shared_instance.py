@@ -0,0 +1,288 @@
+"""
+Instance en mémoire partagée pour les workers multiprocessus
+Les tableaux de l'instance (coordonnées, demandes, stocks, transitions,
+véhicules) et ses précalculs NumPy (matrice des distances, listes de
+voisins) sont publiés une fois dans un segment multiprocessing.shared_memory;
+les workers s'y attachent via un handle léger, sans copie des tableaux.
+"""
+
+import atexit
+import pickle
+import signal
+import sys
+from dataclasses import dataclass
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models import Instance, Vehicle, Depot, Garage, Station
+
+
+_ALIGN = 64
+
+
+@dataclass(frozen=True)
+class SharedInstanceHandle:
+    """Handle picklable (quelques centaines d'octets) d'une instance publiée"""
+    shm_name: str
+    uuid: str
+    nb_products: int
+    # (nom, offset, forme, dtype) des tableaux de données
+    arrays: Tuple[Tuple[str, int, Tuple[int, ...], str], ...]
+    # (clé de cache, offset, forme, dtype) des précalculs
+    cached: Tuple[Tuple[Any, int, Tuple[int, ...], str], ...]
+    memory_budget: Any = None
+
+
+class SharedInstance:
+    """
+    Publie une instance en mémoire partagée (côté processus parent).
+    
+    Usage:
+        with SharedInstance(instance, k_neighbors=16) as shared:
+            pool = ProcessPoolExecutor(initializer=init_worker, initargs=(shared.handle,))
+    
+    Le segment est détruit à la sortie du bloc with, par close(), ou à la
+    fin du processus parent en dernier recours.
+    """
+    
+    def __init__(self, instance: Instance, k_neighbors: Optional[int] = None):
+        """
+        Args:
+            instance: Instance à publier
+            k_neighbors: Si fourni, les listes de k voisins sont calculées
+                avant publication et partagées avec les workers
+        """
+        # Précalculs partagés: matrice dense (si dans le budget), classement des dépôts
+        instance.distance_matrix()
+        instance.nearest_depots(len(instance.depots))
+        if k_neighbors:
+            instance.nearest_stations(k_neighbors)
+        
+        arrays = _instance_arrays(instance)
+        cached = {
+            key: value for key, value in instance._cache.items()
+            if isinstance(value, np.ndarray) and key != 'coordinates'
+        }
+        
+        layout, size = _layout(list(arrays.items()) + list(cached.items()))
+        self.shm = SharedMemory(create=True, size=max(size, 1))
+        self._closed = False
+        
+        entries = []
+        for (key, value), offset in zip(list(arrays.items()) + list(cached.items()), layout):
+            view = np.ndarray(value.shape, dtype=value.dtype, buffer=self.shm.buf, offset=offset)
+            view[...] = value
+            entries.append((key, offset, tuple(value.shape), value.dtype.str))
+        
+        self.handle = SharedInstanceHandle(
+            shm_name=self.shm.name,
+            uuid=instance.uuid,
+            nb_products=instance.nb_products,
+            arrays=tuple(entries[:len(arrays)]),
+            cached=tuple(entries[len(arrays):]),
+            memory_budget=instance._cache.get('memory_budget', _UNSET)
+        )
+        self.instance = instance
+        atexit.register(self.close)
+    
+    @property
+    def nbytes(self) -> int:
+        """Taille du segment partagé"""
+        return self.shm.size
+    
+    def close(self):
+        """Libère et détruit le segment (idempotent)"""
+        if self._closed:
+            return
+        self._closed = True
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+        atexit.unregister(self.close)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def memory_report(self, n_workers: int) -> Dict[str, int]:
+        """
+        Mémoire des données d'instance pour n_workers workers.
+        
+        Sans partage, chaque worker reçoit l'instance picklée et recalcule
+        ses précalculs; avec partage, le segment existe une seule fois et
+        chaque worker ne reçoit que le handle.
+        """
+        pickled = len(pickle.dumps(_without_cache(self.instance)))
+        private_cache = sum(
+            np.prod(shape) * np.dtype(dtype).itemsize for _, _, shape, dtype in self.handle.cached
+        )
+        handle = len(pickle.dumps(self.handle))
+        
+        private_total = n_workers * (pickled + int(private_cache))
+        shared_total = self.nbytes + n_workers * handle
+        return {
+            'workers': n_workers,
+            'pickled_instance': pickled,
+            'precomputed_per_worker': int(private_cache),
+            'handle': handle,
+            'shared_segment': self.nbytes,
+            'private_total': private_total,
+            'shared_total': shared_total,
+            'saved': private_total - shared_total,
+        }
+
+
+_UNSET = "unset"
+
+
+def attach_instance(handle: SharedInstanceHandle) -> Instance:
+    """
+    Reconstruit l'instance dans un worker à partir du segment partagé.
+    
+    Les tableaux (coordonnées, matrice, listes de voisins) sont des vues en
+    lecture seule sur le segment; seuls les petits objets Python (dépôts,
+    stations...) sont recréés. Le segment reste ouvert tant que l'instance vit.
+    """
+    shm = _open_untracked(handle.shm_name)
+    
+    def view(offset, shape, dtype):
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+        array.flags.writeable = False
+        return array
+    
+    a = {name: view(offset, shape, dtype) for name, offset, shape, dtype in handle.arrays}
+    P = handle.nb_products
+    coords = a['coordinates']
+    depot_ids, garage_ids, station_ids = a['depot_ids'], a['garage_ids'], a['station_ids']
+    n_depots, n_garages = len(depot_ids), len(garage_ids)
+    
+    depots = [
+        Depot(int(i), float(x), float(y), a['stocks'][k].tolist())
+        for k, (i, (x, y)) in enumerate(zip(depot_ids, coords[:n_depots]))
+    ]
+    garages = [
+        Garage(int(i), float(x), float(y))
+        for i, (x, y) in zip(garage_ids, coords[n_depots:n_depots + n_garages])
+    ]
+    stations = [
+        Station(int(i), float(x), float(y), a['demands'][k].tolist())
+        for k, (i, (x, y)) in enumerate(zip(station_ids, coords[n_depots + n_garages:]))
+    ]
+    vehicles = [Vehicle(*map(int, row)) for row in a['vehicles']]
+    
+    instance = Instance(
+        uuid=handle.uuid,
+        nb_products=P,
+        nb_depots=n_depots,
+        nb_garages=n_garages,
+        nb_stations=len(stations),
+        nb_vehicles=len(vehicles),
+        transition_costs=a['transition_costs'].reshape(P, P).tolist(),
+        vehicles=vehicles,
+        depots=depots,
+        garages=garages,
+        stations=stations
+    )
+    
+    instance._cache['coordinates'] = coords
+    if handle.memory_budget != _UNSET:
+        instance._cache['memory_budget'] = handle.memory_budget
+    for key, offset, shape, dtype in handle.cached:
+        instance._cache[key] = view(offset, shape, dtype)
+    # Garde le segment ouvert aussi longtemps que les vues
+    instance._cache['shared_memory'] = shm
+    return instance
+
+
+# Instance du worker courant (initializer de pool)
+_worker_instance: Optional[Instance] = None
+
+
+def init_worker(handle: SharedInstanceHandle):
+    """
+    Initializer de ProcessPoolExecutor/Pool: attache l'instance partagée.
+    
+    Le SIGINT (Ctrl+C, envoyé à tout le groupe de processus) est ignoré:
+    c'est le processus parent qui arrête proprement la résolution.
+    """
+    global _worker_instance
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_instance = attach_instance(handle)
+
+
+def worker_instance() -> Instance:
+    """Instance attachée par init_worker"""
+    if _worker_instance is None:
+        raise RuntimeError("Aucune instance partagée attachée (init_worker non appelé)")
+    return _worker_instance
+
+
+def _instance_arrays(instance: Instance) -> Dict[str, np.ndarray]:
+    """Données de l'instance sous forme de tableaux NumPy"""
+    P = instance.nb_products
+    return {
+        'coordinates': np.asarray(instance.coordinates(), dtype=np.float64),
+        'depot_ids': np.array([d.id for d in instance.depots], dtype=np.int64),
+        'garage_ids': np.array([g.id for g in instance.garages], dtype=np.int64),
+        'station_ids': np.array([s.id for s in instance.stations], dtype=np.int64),
+        'stocks': np.array([d.stocks for d in instance.depots], dtype=np.int64).reshape(-1, P),
+        'demands': np.array([s.demands for s in instance.stations], dtype=np.int64).reshape(-1, P),
+        'transition_costs': np.array(instance.transition_costs, dtype=np.float64).reshape(-1),
+        'vehicles': np.array(
+            [(v.id, v.capacity, v.home_garage, v.initial_product) for v in instance.vehicles],
+            dtype=np.int64
+        ).reshape(-1, 4),
+    }
+
+
+def _layout(items: List[Tuple[Any, np.ndarray]]) -> Tuple[List[int], int]:
+    """Offsets alignés des tableaux dans le segment et taille totale"""
+    offsets = []
+    size = 0
+    for _, value in items:
+        size = (size + _ALIGN - 1) // _ALIGN * _ALIGN
+        offsets.append(size)
+        size += value.nbytes
+    return offsets, size
+
+
+def _without_cache(instance: Instance) -> Instance:
+    """Copie superficielle sans précalculs (ce que recevrait un worker)"""
+    return Instance(
+        uuid=instance.uuid,
+        nb_products=instance.nb_products,
+        nb_depots=instance.nb_depots,
+        nb_garages=instance.nb_garages,
+        nb_stations=instance.nb_stations,
+        nb_vehicles=instance.nb_vehicles,
+        transition_costs=instance.transition_costs,
+        vehicles=instance.vehicles,
+        depots=instance.depots,
+        garages=instance.garages,
+        stations=instance.stations
+    )
+
+
+def _open_untracked(name: str) -> SharedMemory:
+    """
+    Ouvre un segment existant sans l'enregistrer auprès du resource_tracker.
+    
+    Avant Python 3.13, l'attache l'enregistre comme si le worker en était
+    propriétaire: le tracker le détruirait à la sortie du worker.
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
@@ -0,0 +1,159 @@
+"""
+Lecture de solutions au format .dat (celui produit par write_solution)
+Permet de repartir d'une solution existante (démarrage à chaud)
+"""
+
+import re
+from pathlib import Path
+from typing import List, Optional, Union
+from models import Instance, Solution, VehicleRoute, MiniRoute, Delivery
+from solver_simple import compute_metrics
+from validator import validate_solution
+
+
+_DEPOT = re.compile(r"^(\d+)\s*\[(\d+)\]$")
+_STATION = re.compile(r"^(\d+)\s*\((\d+)\)$")
+_PRODUCT = re.compile(r"^(\d+)\s*\(([-\d.]+)\)$")
+_ROUTE_LINE = re.compile(r"^\d+\s*:")
+
+
+def read_solution(instance: Instance, filepath: Union[str, Path]) -> Solution:
+    """
+    Reconstruit une Solution à partir d'un fichier solution.
+    
+    Format (par véhicule utilisé):
+        <v>: <garage> - <dépôt> [<chargé>] - <station> (<livré>) - ... - <garage>
+        <v>: <produit>(<coût cumulé>) - ...     (un élément par visite)
+    suivi des 6 lignes de métriques. Distances et coûts sont recalculés.
+    
+    Args:
+        instance: Instance correspondante
+        filepath: Chemin du fichier solution
+    
+    Returns:
+        Solution: Solution reconstruite (métriques recalculées)
+    """
+    filepath = Path(filepath)
+    
+    if not filepath.exists():
+        raise FileNotFoundError(f"Fichier introuvable: {filepath}")
+    
+    with open(filepath, 'r') as f:
+        return parse_solution_text(instance, f.read(), filepath.name)
+
+
+def parse_solution_text(instance: Instance, content: str, name: str = "<texte>") -> Solution:
+    """Reconstruit une Solution à partir du contenu d'un fichier solution"""
+    try:
+        lines = [line.strip() for line in content.splitlines() if line.strip()]
+        
+        route_lines = [line for line in lines if _ROUTE_LINE.match(line)]
+        metric_lines = [line for line in lines if not _ROUTE_LINE.match(line)]
+        
+        if len(route_lines) % 2 != 0:
+            raise ValueError("Nombre impair de lignes de route")
+        
+        solution = Solution(instance=instance)
+        for i in range(0, len(route_lines), 2):
+            solution.routes.append(_parse_route(route_lines[i], route_lines[i + 1]))
+        
+        # Processeur et temps de résolution (2 dernières lignes de métriques)
+        if len(metric_lines) >= 2:
+            solution.processor = metric_lines[-2]
+            solution.resolution_time = float(metric_lines[-1])
+        
+        compute_metrics(solution)
+        return solution
+    
+    except Exception as e:
+        raise ValueError(f"Erreur lecture solution {name}: {e}")
+
+
+def _parse_route(visits_line: str, products_line: str) -> VehicleRoute:
+    """Reconstruit la route d'un véhicule à partir de ses 2 lignes"""
+    vehicle_id, visits = _split_line(visits_line)
+    products_vehicle_id, products = _split_line(products_line)
+    
+    if vehicle_id != products_vehicle_id:
+        raise ValueError(f"Véhicule {vehicle_id}: lignes visites/produits incohérentes")
+    if len(visits) != len(products) or len(visits) < 2:
+        raise ValueError(f"Véhicule {vehicle_id}: {len(visits)} visites pour {len(products)} produits")
+    
+    product_ids = []
+    for token in products:
+        match = _PRODUCT.match(token)
+        if not match:
+            raise ValueError(f"Véhicule {vehicle_id}: produit invalide '{token}'")
+        product_ids.append(int(match.group(1)))
+    
+    home_garage = int(visits[0])
+    if int(visits[-1]) != home_garage:
+        raise ValueError(f"Véhicule {vehicle_id}: retour au garage {visits[-1]} != {home_garage}")
+    
+    route = VehicleRoute(
+        vehicle_id=vehicle_id,
+        home_garage=home_garage,
+        initial_product=product_ids[0]
+    )
+    
+    mini_route = None
+    for token, product in zip(visits[1:-1], product_ids[1:-1]):
+        depot = _DEPOT.match(token)
+        if depot:
+            mini_route = MiniRoute(
+                product=product,
+                depot_id=int(depot.group(1)),
+                quantity_loaded=int(depot.group(2))
+            )
+            route.mini_routes.append(mini_route)
+            continue
+        
+        station = _STATION.match(token)
+        if not station:
+            raise ValueError(f"Véhicule {vehicle_id}: visite invalide '{token}'")
+        if mini_route is None:
+            raise ValueError(f"Véhicule {vehicle_id}: livraison avant tout chargement")
+        mini_route.deliveries.append(Delivery(int(station.group(1)), int(station.group(2))))
+    
+    return route
+
+
+def _split_line(line: str):
+    """'<v>: a - b - c' -> (v, ['a', 'b', 'c'])"""
+    head, _, body = line.partition(':')
+    tokens = [t.strip() for t in body.split(' - ')]
+    return int(head), tokens
+
+
+def load_warm_start(instance: Instance, filepath: Union[str, Path]) -> Optional[Solution]:
+    """
+    Solution stockée utilisable comme point de départ.
+    
+    Returns:
+        Solution: La solution si le fichier existe, se lit et est valide
+        pour l'instance, sinon None
+    """
+    filepath = Path(filepath)
+    if not filepath.exists():
+        return None
+    
+    try:
+        solution = read_solution(instance, filepath)
+    except ValueError as e:
+        print(f"⚠️  Démarrage à chaud ignoré: {e}")
+        return None
+    
+    is_valid, errors = validate_solution(solution)
+    if not is_valid:
+        print(f"⚠️  Démarrage à chaud ignoré: {filepath.name} invalide ({len(errors)} erreurs)")
+        return None
+    
+    return solution
+
+
+def best_solution(*solutions: Optional[Solution]) -> Optional[Solution]:
+    """Solution de coût minimal parmi celles fournies (None ignorés, la première gagne à égalité)"""
+    candidates: List[Solution] = [s for s in solutions if s is not None]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda s: s.total_cost())
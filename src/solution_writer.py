@@ -3,9 +3,11 @@ Export de solutions au format .dat
 Format conforme aux spécifications MPVRP-CC
 """
 
+import os
 from pathlib import Path
-from typing import Union
+from typing import Optional, Union
 from models import Solution
+from bounds import compute_lower_bound
 
 
 def write_solution(solution: Solution, filepath: Union[str, Path]):
@@ -17,13 +19,32 @@ def write_solution(solution: Solution, filepath: Union[str, Path]):
     - Ligne vide entre véhicules
     - 6 lignes de métriques finales
     
+    L'écriture est atomique (fichier temporaire puis renommage): un lecteur
+    concurrent voit toujours l'ancienne ou la nouvelle solution complète.
+    
     Args:
         solution: La solution à écrire
         filepath: Chemin du fichier de sortie
     """
+    write_solution_text(format_solution(solution), filepath)
+
+
+def write_solution_text(content: str, filepath: Union[str, Path]):
+    """Écrit atomiquement un contenu de solution déjà formaté (ex: cache)"""
     filepath = Path(filepath)
     filepath.parent.mkdir(parents=True, exist_ok=True)
     
+    # Écrire le fichier
+    tmp_path = filepath.with_name(f".{filepath.name}.tmp")
+    with open(tmp_path, 'w') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filepath)
+
+
+def format_solution(solution: Solution) -> str:
+    """Contenu du fichier solution (format .dat requis)"""
     lines = []
     
     # Routes des véhicules
@@ -89,17 +110,17 @@ def write_solution(solution: Solution, filepath: Union[str, Path]):
     lines.append(solution.processor)
     lines.append(f"{solution.resolution_time:.2f}")
     
-    # Écrire le fichier
-    with open(filepath, 'w') as f:
-        f.write('\n'.join(lines))
+    return '\n'.join(lines)
 
 
-def format_solution_summary(solution: Solution) -> str:
+def format_solution_summary(solution: Solution, lower_bound: Optional[float] = None) -> str:
     """
     Formate un résumé de la solution pour affichage console.
     
     Args:
         solution: La solution
+        lower_bound: Borne inférieure prouvée par le solveur (ex: CP-SAT sur
+            le modèle complet); sinon bounds.compute_lower_bound
     
     Returns:
         str: Résumé formaté
@@ -116,6 +137,13 @@ def format_solution_summary(solution: Solution) -> str:
     lines.append(f"Coût transition       : {solution.total_transition_cost():.2f}")
     lines.append(f"Nombre transitions    : {solution.total_transitions()}")
     lines.append(f"COÛT TOTAL            : {solution.total_cost():.2f}")
+    
+    if lower_bound is None:
+        lower_bound = compute_lower_bound(solution.instance).total
+    cost = solution.total_cost()
+    gap = max(0.0, (cost - lower_bound) / cost) if cost > 0 else 0.0
+    lines.append(f"Borne inférieure      : {lower_bound:.2f}")
+    lines.append(f"Écart (gap)           : {100 * gap:.2f}%")
     lines.append(f"Temps de résolution   : {solution.resolution_time:.2f}s")
     
     # Détails par véhicule
@@ -0,0 +1,82 @@
+"""
+Configuration des paramètres du solveur par classe d'instances
+Fichier JSON produit par scripts/tune.py et lu par main.py / solve_batch.py:
+les paramètres passés en ligne de commande restent prioritaires.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from solver_simple import DEFAULT_K_NEIGHBORS
+
+
+DEFAULT_CONFIG_PATH = Path("solver_config.json")
+
+INSTANCE_CLASSES = ('small', 'medium', 'large')
+
+# Paramètres réglables et valeurs par défaut (sans fichier de configuration)
+DEFAULTS: Dict[str, Any] = {
+    'changeover_weight': 0.5,
+    'constructor': "greedy",
+    'depot_policy': "ratio",
+    'k_neighbors': DEFAULT_K_NEIGHBORS,
+}
+
+_CLASS_LETTERS = {'S': 'small', 'M': 'medium', 'L': 'large'}
+
+
+def instance_class(name: str, nb_stations: Optional[int] = None) -> str:
+    """
+    Classe d'une instance: lettre du nom (MPVRP_S_/M_/L_...), sinon nombre
+    de stations (bornes du tableau des instances: 50, 100).
+    """
+    match = re.match(r"MPVRP_([SML])_", Path(name).name)
+    if match:
+        return _CLASS_LETTERS[match.group(1)]
+    if nb_stations is None:
+        return 'medium'
+    if nb_stations <= 50:
+        return 'small'
+    return 'medium' if nb_stations <= 100 else 'large'
+
+
+def load_config(path: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+    """Fichier de configuration (vide s'il n'existe pas)"""
+    path = Path(path) if path else DEFAULT_CONFIG_PATH
+    if not path.exists():
+        return {}
+    with open(path, 'r') as f:
+        config = json.load(f)
+    if not isinstance(config, dict) or not isinstance(config.get('classes', {}), dict):
+        raise ValueError(f"Configuration invalide: {path}")
+    return config
+
+
+def save_config(config: Dict[str, Any], path: Optional[Union[str, Path]] = None):
+    """Écriture atomique du fichier de configuration"""
+    path = Path(path) if path else DEFAULT_CONFIG_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(config, f, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def resolve_parameters(
+    config: Dict[str, Any],
+    cls: str,
+    overrides: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Paramètres effectifs: ligne de commande (valeurs non None) > classe de
+    la configuration > valeurs par défaut.
+    """
+    parameters = dict(DEFAULTS)
+    tuned = config.get('classes', {}).get(cls, {})
+    parameters.update({k: v for k, v in tuned.items() if k in DEFAULTS})
+    parameters.update({k: v for k, v in (overrides or {}).items() if v is not None})
+    return parameters
@@ -0,0 +1,447 @@
+"""
+Modèle exact CP-SAT (OR-Tools) pour les petites instances
+
+Chaque mini-route est un motif (produit, dépôt de chargement, ensemble de
+stations, point de sortie: dépôt suivant ou garage) dont l'ordre de visite
+optimal est précalculé. Pour chaque véhicule, un graphe d'états
+(dépôt, produit en cuve) porte un flot entier: arcs de départ du garage,
+arcs de changement de produit (coût de transition) et arcs de motifs
+(distance); les quantités livrées par motif sont partagées entre les
+véhicules (capacités, stocks des dépôts, demandes, livraisons fractionnées).
+La connexité de chaque tournée est imposée par un arbre couvrant des états
+visités, à partir du garage.
+
+Le modèle est complet (borne prouvée valable pour le problème) quand
+max_stops couvre toutes les stations demandant un même produit; sinon il
+est restreint aux mini-routes d'au plus max_stops stations et sa borne
+ne vaut que pour lui.
+"""
+
+import itertools
+import math
+import platform
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from ortools.sat.python import cp_model
+
+from models import Instance, Solution, VehicleRoute, MiniRoute, Delivery
+from solver_simple import SimpleSolver, compute_metrics
+from bounds import compute_lower_bound
+
+
+DEFAULT_MAX_STOPS = 3
+DEFAULT_TIME_LIMIT = 60.0
+DEFAULT_WORKERS = 8
+
+# Coûts entiers du modèle: arrondis par défaut (x SCALE), la borne du
+# modèle reste donc une borne inférieure du coût réel
+SCALE = 1000
+
+_STATUS = {
+    cp_model.OPTIMAL: "optimal",
+    cp_model.FEASIBLE: "feasible",
+    cp_model.INFEASIBLE: "infeasible",
+    cp_model.MODEL_INVALID: "invalid",
+    cp_model.UNKNOWN: "unknown",
+}
+
+
+class Pattern:
+    """Mini-route candidate: chargement au dépôt, stations dans l'ordre optimal, sortie"""
+    __slots__ = ('product', 'depot', 'stations', 'exit', 'cost')
+    
+    def __init__(self, product: int, depot: int, stations: Tuple[int, ...], exit: Tuple[str, int], cost: float):
+        self.product = product
+        self.depot = depot
+        # Ids des stations, dans l'ordre de visite
+        self.stations = stations
+        # ('depot', id) ou ('garage', id)
+        self.exit = exit
+        self.cost = cost
+
+
+class CPSATSolver:
+    """Résolution exacte (ou bornée par le temps) avec CP-SAT"""
+    
+    def __init__(
+        self,
+        instance: Instance,
+        time_limit: float = DEFAULT_TIME_LIMIT,
+        workers: int = DEFAULT_WORKERS,
+        max_stops: int = DEFAULT_MAX_STOPS,
+        hint: bool = True,
+        seed: Optional[int] = None,
+        log: bool = False
+    ):
+        """
+        Args:
+            instance: Instance (petite: le nombre de motifs croît en
+                stations^max_stops)
+            time_limit: Temps max. de la recherche CP-SAT (secondes)
+            workers: Threads de recherche CP-SAT en parallèle
+            max_stops: Stations par mini-route au plus
+            hint: Solution de SimpleSolver comme point de départ
+            seed: Graine de CP-SAT
+            log: Journal de recherche CP-SAT sur la sortie standard
+        """
+        self.instance = instance
+        self.time_limit = time_limit
+        self.workers = workers
+        self.max_stops = max_stops
+        self.hint = hint
+        self.seed = seed
+        self.log = log
+        self.stats: Dict = {}
+    
+    def solve(self) -> Solution:
+        """
+        Résout l'instance; stats: statut, coût, borne du modèle, borne
+        inférieure prouvée du problème (celle du modèle s'il est complet,
+        sinon bounds.compute_lower_bound), écarts, solution gloutonne
+        (indice) et source retenue.
+        
+        Sans solution CP-SAT dans le temps imparti (ou si elle est moins
+        bonne), la solution gloutonne est renvoyée.
+        """
+        start = time.perf_counter()
+        instance = self.instance
+        
+        greedy = SimpleSolver(instance).solve()
+        
+        build_start = time.perf_counter()
+        patterns = self._patterns()
+        model, variables = self._build_model(patterns)
+        hinted = self._add_hint(model, variables, patterns, greedy) if self.hint else False
+        build_time = time.perf_counter() - build_start
+        
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = self.time_limit
+        solver.parameters.num_workers = max(1, self.workers)
+        solver.parameters.log_search_progress = self.log
+        if self.seed is not None:
+            solver.parameters.random_seed = self.seed
+        status = solver.Solve(model)
+        
+        solution = None
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            solution = self._extract(solver, variables, patterns)
+        
+        source = "cpsat"
+        if solution is None or solution.total_cost() > greedy.total_cost() + 1e-6:
+            solution, source = greedy, "greedy"
+        
+        bound = solver.BestObjectiveBound() / SCALE if status != cp_model.INFEASIBLE else math.inf
+        complete = self.is_complete()
+        lower_bound = compute_lower_bound(instance).total
+        if complete and math.isfinite(bound):
+            lower_bound = max(lower_bound, bound)
+        cost = solution.total_cost()
+        solution.processor = platform.processor() or "Unknown"
+        solution.resolution_time = time.perf_counter() - start
+        
+        self.stats = {
+            'status': _STATUS.get(status, "unknown"),
+            'cost': cost,
+            'bound': bound,
+            'gap': (cost - bound) / cost if cost > 0 and math.isfinite(bound) else 0.0,
+            'complete': complete,
+            'lower_bound': lower_bound,
+            'proven_gap': max(cost - lower_bound, 0.0) / cost if cost > 0 else 0.0,
+            'max_stops': self.max_stops,
+            'patterns': len(patterns),
+            'variables': len(model.Proto().variables),
+            'constraints': len(model.Proto().constraints),
+            'greedy_cost': greedy.total_cost(),
+            'hinted': hinted,
+            'source': source,
+            'workers': solver.parameters.num_workers,
+            'build_time': build_time,
+            'search_time': solver.WallTime(),
+            'elapsed': solution.resolution_time,
+        }
+        return solution
+    
+    def is_complete(self) -> bool:
+        """Toutes les mini-routes possibles sont des motifs du modèle"""
+        instance = self.instance
+        return all(
+            sum(1 for s in instance.stations if s.demands[p] > 0) <= self.max_stops
+            for p in range(instance.nb_products)
+        )
+    
+    # ------------------------------------------------------------------
+    # Motifs
+    # ------------------------------------------------------------------
+    
+    def _patterns(self) -> List[Pattern]:
+        """Motifs: produit x dépôt avec stock x ensemble de stations x sortie"""
+        instance = self.instance
+        dist = instance.distance_matrix()
+        exits = [('depot', d.id, instance.depot_node(d.id)) for d in instance.depots]
+        exits += [('garage', g.id, instance.garage_node(g.id)) for g in instance.garages]
+        
+        patterns = []
+        for p in range(instance.nb_products):
+            stations = [s.id for s in instance.stations if s.demands[p] > 0]
+            depots = [d for d in instance.depots if d.stocks[p] > 0]
+            for size in range(1, min(self.max_stops, len(stations)) + 1):
+                for subset in itertools.combinations(stations, size):
+                    nodes = [instance.station_node(s) for s in subset]
+                    for depot in depots:
+                        start = instance.depot_node(depot.id)
+                        for kind, exit_id, end in exits:
+                            # Ordre de visite optimal (énumération, size <= max_stops)
+                            best_cost, best_order = math.inf, None
+                            for order in itertools.permutations(range(size)):
+                                cost = dist[start, nodes[order[0]]] + dist[nodes[order[-1]], end]
+                                for a, b in zip(order, order[1:]):
+                                    cost += dist[nodes[a], nodes[b]]
+                                if cost < best_cost:
+                                    best_cost, best_order = cost, order
+                            patterns.append(Pattern(
+                                p, depot.id, tuple(subset[i] for i in best_order), (kind, exit_id), float(best_cost)
+                            ))
+        return patterns
+    
+    # ------------------------------------------------------------------
+    # Modèle
+    # ------------------------------------------------------------------
+    
+    def _build_model(self, patterns: List[Pattern]):
+        instance = self.instance
+        model = cp_model.CpModel()
+        P = instance.nb_products
+        depot_ids = [d.id for d in instance.depots]
+        demand = {s.id: s.demands for s in instance.stations}
+        total_demand = sum(sum(s.demands) for s in instance.stations)
+        
+        # Quantités livrées par motif (tous véhicules confondus)
+        quantities = {}
+        for m, pattern in enumerate(patterns):
+            for s in pattern.stations:
+                quantities[m, s] = model.NewIntVar(0, demand[s][pattern.product], f"q_{m}_{s}")
+        
+        counts = defaultdict(list)      # motif -> [(véhicule, variable)]
+        objective = []
+        vehicles = {}
+        
+        for vehicle in instance.vehicles:
+            k = vehicle.id
+            garage = instance.get_garage(vehicle.home_garage)
+            initial = vehicle.initial_product - 1
+            
+            # États: source, puits, ('at', dépôt, produit), ('ready', dépôt, produit)
+            nodes = ['src', 'sink']
+            nodes += [('at', d, p) for d in depot_ids for p in range(P)]
+            nodes += [('ready', d, p) for d in depot_ids for p in range(P)]
+            arcs = []  # (origine, destination, variable, coût, genre, données)
+            
+            unused = model.NewBoolVar(f"unused_{k}")
+            arcs.append(('src', 'sink', unused, 0.0, 'unused', None))
+            for d in depot_ids:
+                var = model.NewBoolVar(f"start_{k}_{d}")
+                cost = garage.distance_to(instance.get_depot(d))
+                arcs.append(('src', ('at', d, initial), var, cost, 'start', d))
+            for d in depot_ids:
+                for q in range(P):
+                    for p in range(P):
+                        var = model.NewIntVar(0, total_demand, f"chg_{k}_{d}_{q}_{p}")
+                        cost = instance.get_transition_cost(q, p) if p != q else 0.0
+                        arcs.append((('at', d, q), ('ready', d, p), var, cost, 'changeover', (d, q, p)))
+            for m, pattern in enumerate(patterns):
+                kind, exit_id = pattern.exit
+                if kind == 'garage':
+                    if exit_id != vehicle.home_garage:
+                        continue
+                    target = 'sink'
+                else:
+                    target = ('at', exit_id, pattern.product)
+                upper = min(demand[s][pattern.product] for s in pattern.stations)
+                var = model.NewIntVar(0, upper, f"n_{k}_{m}")
+                counts[m].append((vehicle, var))
+                arcs.append((('ready', pattern.depot, pattern.product), target, var, pattern.cost, 'pattern', m))
+            
+            # Conservation du flot (une unité du garage au puits)
+            inflow = defaultdict(list)
+            outflow = defaultdict(list)
+            for u, v, var, cost, _, _ in arcs:
+                outflow[u].append(var)
+                inflow[v].append(var)
+                if cost:
+                    objective.append(math.floor(cost * SCALE) * var)
+            model.Add(sum(outflow['src']) == 1)
+            model.Add(sum(inflow['sink']) == 1)
+            for node in nodes[2:]:
+                model.Add(sum(inflow[node]) == sum(outflow[node]))
+            
+            # Connexité: chaque état visité a un parent visité de rang inférieur
+            # (arbre couvrant depuis le garage, pas de cycle isolé)
+            rank = {node: model.NewIntVar(0, len(nodes), f"rank_{k}_{i}") for i, node in enumerate(nodes)}
+            model.Add(rank['src'] == 0)
+            pair_arcs = defaultdict(list)
+            for u, v, var, _, _, _ in arcs:
+                pair_arcs[u, v].append(var)
+            parents = defaultdict(list)
+            for (u, v), pair_vars in pair_arcs.items():
+                if u == v:
+                    continue
+                parent = model.NewBoolVar("")
+                model.Add(sum(pair_vars) >= 1).OnlyEnforceIf(parent)
+                model.Add(rank[v] >= rank[u] + 1).OnlyEnforceIf(parent)
+                parents[v].append(parent)
+            for node in nodes[1:]:
+                visited = model.NewBoolVar("")
+                model.Add(sum(inflow[node]) >= 1).OnlyEnforceIf(visited)
+                model.Add(sum(inflow[node]) == 0).OnlyEnforceIf(visited.Not())
+                model.Add(sum(parents[node]) == visited)
+            
+            vehicles[k] = arcs
+        
+        # Quantités: au moins une unité par station et par passage, capacité
+        # des véhicules, rien sans passage
+        for m, pattern in enumerate(patterns):
+            uses = counts.get(m, [])
+            total_uses = sum(var for _, var in uses)
+            for s in pattern.stations:
+                model.Add(quantities[m, s] >= total_uses)
+                model.Add(quantities[m, s] <= demand[s][pattern.product] * total_uses)
+            model.Add(sum(quantities[m, s] for s in pattern.stations)
+                      <= sum(vehicle.capacity * var for vehicle, var in uses))
+        
+        # Demandes satisfaites (livraisons fractionnées) et stocks des dépôts
+        delivered = defaultdict(list)
+        loaded = defaultdict(list)
+        visits = defaultdict(list)
+        trips = defaultdict(list)
+        for m, pattern in enumerate(patterns):
+            uses = [var for _, var in counts.get(m, [])]
+            trips[pattern.product].extend(uses)
+            for s in pattern.stations:
+                delivered[s, pattern.product].append(quantities[m, s])
+                loaded[pattern.depot, pattern.product].append(quantities[m, s])
+                visits[s, pattern.product].extend(uses)
+        
+        # Coupes (renforcent la relaxation linéaire): passages par station et
+        # mini-routes par produit au moins demande / plus grande capacité
+        max_capacity = max(v.capacity for v in instance.vehicles)
+        for station in instance.stations:
+            for p in range(P):
+                if station.demands[p] > 0:
+                    model.Add(sum(visits[station.id, p]) >= -(-station.demands[p] // max_capacity))
+        for p in range(P):
+            product_demand = instance.get_total_demand(p)
+            if product_demand > 0:
+                model.Add(sum(trips[p]) >= -(-product_demand // max_capacity))
+        for station in instance.stations:
+            for p in range(P):
+                model.Add(sum(delivered[station.id, p]) == station.demands[p])
+        for depot in instance.depots:
+            for p in range(P):
+                if loaded[depot.id, p]:
+                    model.Add(sum(loaded[depot.id, p]) <= depot.stocks[p])
+        
+        model.Minimize(sum(objective))
+        return model, {'quantities': quantities, 'vehicles': vehicles}
+    
+    def _add_hint(self, model: cp_model.CpModel, variables, patterns: List[Pattern], solution: Solution) -> bool:
+        """
+        Solution gloutonne comme indice; False si l'une de ses mini-routes
+        n'est pas un motif du modèle (trop de stations): indice partiel,
+        complété par CP-SAT.
+        """
+        instance = self.instance
+        index = {(pt.product, pt.depot, frozenset(pt.stations), pt.exit): m for m, pt in enumerate(patterns)}
+        routes = {r.vehicle_id: r for r in solution.routes}
+        complete = True
+        hinted_quantities = defaultdict(int)
+        
+        for k, arcs in variables['vehicles'].items():
+            route = routes.get(k)
+            values = defaultdict(int)
+            vehicle = instance.get_vehicle(k)
+            minis = route.mini_routes if route else []
+            if not minis:
+                values['unused', None] = 1
+            else:
+                values['start', minis[0].depot_id] = 1
+                product = vehicle.initial_product - 1
+                for i, mini in enumerate(minis):
+                    values['changeover', (mini.depot_id, product, mini.product)] += 1
+                    exit = (('depot', minis[i + 1].depot_id) if i + 1 < len(minis)
+                            else ('garage', vehicle.home_garage))
+                    key = (mini.product, mini.depot_id, frozenset(d.station_id for d in mini.deliveries), exit)
+                    m = index.get(key)
+                    if m is None or len(key[2]) != len(mini.deliveries):
+                        complete = False
+                        break
+                    values['pattern', m] += 1
+                    for delivery in mini.deliveries:
+                        hinted_quantities[m, delivery.station_id] += delivery.quantity
+                    product = mini.product
+            for _, _, var, _, kind, data in arcs:
+                model.AddHint(var, values.get((kind, data), 0))
+        
+        if complete:
+            for key, var in variables['quantities'].items():
+                model.AddHint(var, hinted_quantities.get(key, 0))
+        return complete
+    
+    # ------------------------------------------------------------------
+    # Extraction
+    # ------------------------------------------------------------------
+    
+    def _extract(self, solver: cp_model.CpSolver, variables, patterns: List[Pattern]) -> Solution:
+        """Tournées (chemin eulérien du flot de chaque véhicule) et quantités"""
+        instance = self.instance
+        solution = Solution(instance=instance)
+        uses = defaultdict(list)   # motif -> [(mini-route, capacité)]
+        
+        for k, arcs in variables['vehicles'].items():
+            vehicle = instance.get_vehicle(k)
+            route = VehicleRoute(
+                vehicle_id=k,
+                home_garage=vehicle.home_garage,
+                initial_product=vehicle.initial_product - 1
+            )
+            adjacency = defaultdict(list)
+            for u, v, var, _, kind, data in arcs:
+                for _ in range(solver.Value(var)):
+                    adjacency[u].append((v, kind, data))
+            
+            # Hierholzer: arcs du chemin eulérien de la source au puits
+            path, stack = [], [('src', None, None)]
+            while stack:
+                node = stack[-1][0]
+                if adjacency[node]:
+                    stack.append(adjacency[node].pop())
+                else:
+                    path.append(stack.pop())
+            path.reverse()
+            
+            for _, kind, data in path[1:]:
+                if kind != 'pattern':
+                    continue
+                pattern = patterns[data]
+                mini = MiniRoute(product=pattern.product, depot_id=pattern.depot, quantity_loaded=0)
+                route.mini_routes.append(mini)
+                uses[data].append((mini, vehicle.capacity))
+            solution.routes.append(route)
+        
+        # Quantités de chaque motif réparties entre ses passages: une unité
+        # par station, puis remplissage jusqu'à la capacité
+        for m, pattern_uses in uses.items():
+            stations = patterns[m].stations
+            remaining = {s: solver.Value(variables['quantities'][m, s]) - len(pattern_uses) for s in stations}
+            for mini, capacity in pattern_uses:
+                room = capacity - len(stations)
+                for s in stations:
+                    extra = min(room, remaining[s])
+                    remaining[s] -= extra
+                    room -= extra
+                    mini.deliveries.append(Delivery(station_id=s, quantity=1 + extra))
+                mini.quantity_loaded = mini.total_delivered()
+        
+        compute_metrics(solution)
+        return solution
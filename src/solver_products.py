@@ -0,0 +1,193 @@
+"""
+Décomposition par produit
+Chaque mini-route ne porte qu'un produit: la partie distance du problème se
+sépare par produit. Les mini-routes de chaque produit (stocks des dépôts
+respectés produit par produit) sont construites en parallèle, puis
+affectées aux véhicules et réordonnées pour limiter changeovers et trajets
+à vide.
+"""
+
+import multiprocessing
+import platform
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict
+
+import numpy as np
+
+from models import Instance, Solution, VehicleRoute
+from solver_savings import SavingsSolver
+from solver_simple import SimpleSolver, compute_metrics
+from shared_instance import SharedInstance, init_worker, worker_instance
+
+
+def _product_trips(product: int):
+    """Tâche worker: mini-routes d'un produit sur l'instance partagée"""
+    start = time.perf_counter()
+    trips = SavingsSolver(worker_instance())._product_trips(product)
+    return trips, time.perf_counter() - start
+
+
+class ProductDecompositionSolver(SavingsSolver):
+    """Un sous-problème de tournées par produit, en parallèle, puis affectation aux véhicules"""
+    
+    def __init__(
+        self,
+        instance: Instance,
+        workers: int = 1,
+        compare: bool = False,
+        mp_context: str = "spawn"
+    ):
+        """
+        Args:
+            instance: Instance à résoudre
+            workers: Processus pour les sous-problèmes produit (1 = séquentiel)
+            compare: Résout aussi l'instance avec le glouton monolithique
+                (SimpleSolver) pour rapporter écart de coût et accélération
+        """
+        super().__init__(instance)
+        self.workers = workers
+        self.compare = compare
+        self.mp_context = mp_context
+        self.stats: Dict = {}
+    
+    def solve(self) -> Solution:
+        """Résout l'instance"""
+        start = time.perf_counter()
+        
+        solution = Solution(
+            instance=self.instance,
+            processor=platform.processor() or "Unknown"
+        )
+        
+        per_product = self._solve_products()
+        trips_wall = time.perf_counter() - start
+        trips = [trip for product_trips, _ in per_product for trip in product_trips]
+        
+        packing_start = time.perf_counter()
+        routes = self._sequence_vehicles(trips)
+        solution.routes = routes
+        compute_metrics(solution)
+        packed_cost = solution.total_cost()
+        
+        solution.routes = [self._resequence(r) for r in routes]
+        compute_metrics(solution)
+        packing_time = time.perf_counter() - packing_start
+        
+        elapsed = time.perf_counter() - start
+        solution.resolution_time = elapsed
+        product_times = [t for _, t in per_product]
+        self.stats = {
+            'products': len(per_product),
+            'workers': self.workers,
+            'trips': len(trips),
+            'product_times': product_times,
+            'critical_path': max(product_times, default=0.0),
+            'sequential_time': sum(product_times),
+            'trips_wall': trips_wall,
+            'packing_time': packing_time,
+            'packed_cost': packed_cost,
+            'resequencing_gain': packed_cost - solution.total_cost(),
+            'elapsed': elapsed,
+        }
+        
+        if self.compare:
+            greedy_start = time.perf_counter()
+            greedy = SimpleSolver(self.instance).solve()
+            greedy_time = time.perf_counter() - greedy_start
+            self.stats.update({
+                'greedy_cost': greedy.total_cost(),
+                'greedy_time': greedy_time,
+                'cost_ratio': solution.total_cost() / greedy.total_cost() if greedy.total_cost() else 1.0,
+                'speedup': greedy_time / elapsed if elapsed > 0 else 0.0,
+                'parallel_speedup': sum(product_times) / trips_wall if trips_wall > 0 else 0.0,
+            })
+        
+        return solution
+    
+    def _solve_products(self):
+        """(mini-routes, durée) par produit, dans un pool de processus ou séquentiellement"""
+        products = range(self.instance.nb_products)
+        if self.workers <= 1 or self.instance.nb_products == 1:
+            return [self._timed_trips(p) for p in products]
+        
+        with SharedInstance(self.instance) as shared:
+            pool = ProcessPoolExecutor(
+                max_workers=min(self.workers, self.instance.nb_products),
+                mp_context=multiprocessing.get_context(self.mp_context),
+                initializer=init_worker,
+                initargs=(shared.handle,)
+            )
+            try:
+                futures = [pool.submit(_product_trips, p) for p in products]
+                return [f.result() for f in futures]
+            except BrokenProcessPool as e:
+                print(f"\n⚠️  Workers indisponibles ({e}), produits résolus séquentiellement")
+                pool.shutdown(wait=False, cancel_futures=True)
+                return [self._timed_trips(p) for p in products]
+            finally:
+                pool.shutdown(wait=True, cancel_futures=True)
+    
+    def _timed_trips(self, product: int):
+        start = time.perf_counter()
+        trips = self._product_trips(product)
+        return trips, time.perf_counter() - start
+    
+    def _resequence(self, route: VehicleRoute, max_passes: int = 50) -> VehicleRoute:
+        """
+        Réordonne les mini-routes d'un véhicule (déplacements d'une mini-route,
+        première amélioration) pour réduire trajets à vide et changeovers.
+        
+        Coût d'un enchaînement a -> b: D[fin_a, dépôt_b] + T[produit_a, produit_b];
+        le départ est le garage avec le produit initial, l'arrivée le garage.
+        """
+        mrs = route.mini_routes
+        n = len(mrs)
+        if n < 2:
+            return route
+        
+        instance = self.instance
+        garage = instance.garage_node(route.home_garage)
+        starts = np.array([instance.depot_node(mr.depot_id) for mr in mrs])
+        ends = np.array([instance.station_node(mr.deliveries[-1].station_id) for mr in mrs])
+        products = np.array([mr.product for mr in mrs])
+        transitions = np.array(instance.transition_costs, dtype=np.float64)
+        np.fill_diagonal(transitions, 0.0)
+        
+        # C[a, b]: lignes = mini-routes + départ (n), colonnes = mini-routes + arrivée (n)
+        from_nodes = np.append(ends, garage)
+        from_products = np.append(products, route.initial_product)
+        C = np.empty((n + 1, n + 1))
+        C[:, :n] = self.dist[np.ix_(from_nodes, starts)] + transitions[np.ix_(from_products, products)]
+        C[:, n] = self.dist[from_nodes, garage]
+        
+        def cost(seq):
+            path = [n] + seq
+            return float(C[path, seq + [n]].sum())
+        
+        seq = list(range(n))
+        initial_cost = cost(seq)
+        for _ in range(max_passes):
+            improved = False
+            for i in range(n):
+                x = seq[i]
+                prev = seq[i - 1] if i else n
+                nxt = seq[i + 1] if i + 1 < n else n
+                gain = C[prev, x] + C[x, nxt] - C[prev, nxt]
+                rest = seq[:i] + seq[i + 1:]
+                before = np.array([n] + rest)
+                after = np.array(rest + [n])
+                insertion = C[before, x] + C[x, after] - C[before, after]
+                insertion[i] = np.inf
+                j = int(np.argmin(insertion))
+                if insertion[j] - gain < -1e-9:
+                    seq = rest[:j] + [x] + rest[j:]
+                    improved = True
+            if not improved:
+                break
+        
+        if cost(seq) >= initial_cost - 1e-9:
+            return route
+        route.mini_routes = [mrs[k] for k in seq]
+        return route
@@ -0,0 +1,249 @@
+"""
+Constructeur Clarke-Wright (économies parallèles) par produit et par dépôt
+Les mini-routes sont ensuite affectées aux véhicules en tenant compte des changeovers
+"""
+
+import time
+import platform
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from models import Instance, Solution, VehicleRoute, MiniRoute, Delivery
+from solver_simple import compute_metrics
+
+
+@dataclass
+class _Trip:
+    """Mini-route construite, avant affectation à un véhicule"""
+    product: int
+    depot_id: int
+    stations: List[int] = field(default_factory=list)    # ids de station
+    quantities: List[int] = field(default_factory=list)
+    
+    @property
+    def load(self) -> int:
+        return sum(self.quantities)
+
+
+class _UnionFind:
+    """Union-find (chemins compressés) portant l'état des routes à la racine"""
+    
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+    
+    def find(self, i: int) -> int:
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+    
+    def union(self, a: int, b: int) -> int:
+        """Rattache la racine b à la racine a, retourne la nouvelle racine"""
+        self.parent[b] = a
+        return a
+
+
+class SavingsSolver:
+    """Constructeur par économies de Clarke-Wright, produit par produit"""
+    
+    def __init__(self, instance: Instance):
+        self.instance = instance
+        self.dist = instance.distance_matrix()
+        self.capacity = max(v.capacity for v in instance.vehicles)
+    
+    def solve(self) -> Solution:
+        """Résout l'instance"""
+        start = time.time()
+        
+        solution = Solution(
+            instance=self.instance,
+            processor=platform.processor() or "Unknown"
+        )
+        
+        trips = []
+        for p in range(self.instance.nb_products):
+            trips.extend(self._product_trips(p))
+        
+        solution.routes = self._sequence_vehicles(trips)
+        
+        compute_metrics(solution)
+        solution.resolution_time = time.time() - start
+        
+        return solution
+    
+    def _product_trips(self, product: int) -> List[_Trip]:
+        """Mini-routes d'un produit (sous-problème indépendant des autres produits)"""
+        trips = []
+        for depot_id, pieces in self._assign_depots(product).items():
+            trips.extend(self._savings_trips(product, depot_id, pieces))
+        return trips
+    
+    def _assign_depots(self, product: int) -> Dict[int, List[Tuple[int, int]]]:
+        """
+        Répartit la demande d'un produit entre dépôts (le plus proche ayant du stock).
+        
+        Returns:
+            dict: depot_id -> [(station_id, quantité), ...]
+        """
+        instance = self.instance
+        stock = {d.id: d.stocks[product] for d in instance.depots}
+        depot_ids = [d.id for d in instance.depots]
+        depot_nodes = np.array([instance.depot_node(d) for d in depot_ids])
+        
+        stations = [s for s in instance.stations if s.demands[product] > 0]
+        if not stations:
+            return {}
+        
+        station_nodes = np.array([instance.station_node(s.id) for s in stations])
+        to_depots = self.dist[np.ix_(station_nodes, depot_nodes)]
+        
+        # Stations les plus "contraintes" (loin de tout dépôt) servies en premier
+        order = np.argsort(-to_depots.min(axis=1), kind='stable')
+        
+        pieces: Dict[int, List[Tuple[int, int]]] = {}
+        for i in order:
+            station = stations[i]
+            remaining = station.demands[product]
+            for j in np.argsort(to_depots[i], kind='stable'):
+                if remaining <= 0:
+                    break
+                depot_id = depot_ids[j]
+                take = min(remaining, stock[depot_id])
+                if take <= 0:
+                    continue
+                pieces.setdefault(depot_id, []).append((station.id, take))
+                stock[depot_id] -= take
+                remaining -= take
+            if remaining > 0:
+                raise ValueError(f"Stock insuffisant pour le produit {product + 1}")
+        
+        return pieces
+    
+    def _savings_trips(self, product: int, depot_id: int, pieces: List[Tuple[int, int]]) -> List[_Trip]:
+        """Clarke-Wright parallèle sur les livraisons d'un (produit, dépôt)"""
+        Q = self.capacity
+        trips = []
+        
+        # Demandes > capacité: allers-retours pleins, le reliquat passe dans les économies
+        rest = []
+        for station_id, qty in pieces:
+            while qty > Q:
+                trips.append(_Trip(product, depot_id, [station_id], [Q]))
+                qty -= Q
+            if qty > 0:
+                rest.append((station_id, qty))
+        
+        n = len(rest)
+        if n == 0:
+            return trips
+        
+        depot_node = self.instance.depot_node(depot_id)
+        nodes = np.array([self.instance.station_node(s) for s, _ in rest])
+        d0 = self.dist[depot_node, nodes]
+        dss = self.dist[np.ix_(nodes, nodes)]
+        
+        # Économies calculées et triées une seule fois
+        iu, ju = np.triu_indices(n, 1)
+        savings = d0[iu] + d0[ju] - dss[iu, ju]
+        order = np.argsort(-savings, kind='stable')
+        order = order[savings[order] > 0]
+        
+        # État des routes porté par la racine: séquence et charge
+        uf = _UnionFind(n)
+        seq = {i: [i] for i in range(n)}
+        load = {i: rest[i][1] for i in range(n)}
+        
+        for k in order:
+            i, j = int(iu[k]), int(ju[k])
+            ri, rj = uf.find(i), uf.find(j)
+            if ri == rj or load[ri] + load[rj] > Q:
+                continue
+            
+            a, b = seq[ri], seq[rj]
+            # i et j doivent être des extrémités de leurs routes
+            if i not in (a[0], a[-1]) or j not in (b[0], b[-1]):
+                continue
+            
+            if a[-1] != i:
+                a = a[::-1]
+            if b[0] != j:
+                b = b[::-1]
+            
+            root = uf.union(ri, rj)
+            seq[root] = a + b
+            load[root] = load[ri] + load[rj]
+            del seq[rj], load[rj]
+        
+        for root, members in seq.items():
+            # Commencer par l'extrémité la plus proche du dépôt
+            if d0[members[-1]] < d0[members[0]]:
+                members = members[::-1]
+            trips.append(_Trip(
+                product, depot_id,
+                [rest[m][0] for m in members],
+                [rest[m][1] for m in members]
+            ))
+        
+        return trips
+    
+    def _sequence_vehicles(self, trips: List[_Trip]) -> List[VehicleRoute]:
+        """
+        Affecte les mini-routes aux véhicules par ajouts successifs de moindre coût.
+        
+        Coût d'ajout de la mini-route r au véhicule v (vectorisé sur v x r):
+        D[fin_v, dépôt_r] + D[dernière_r, garage_v] - D[fin_v, garage_v] + T[produit_v, produit_r]
+        """
+        instance = self.instance
+        vehicles = instance.vehicles
+        
+        routes = [
+            VehicleRoute(v.id, v.home_garage, v.initial_product - 1)
+            for v in vehicles
+        ]
+        if not trips:
+            return []
+        
+        transitions = np.array(instance.transition_costs, dtype=np.float64)
+        np.fill_diagonal(transitions, 0.0)
+        
+        garage = np.array([instance.garage_node(v.home_garage) for v in vehicles])
+        capacity = np.array([v.capacity for v in vehicles])
+        end = garage.copy()
+        product = np.array([v.initial_product - 1 for v in vehicles])
+        
+        depot = np.array([instance.depot_node(t.depot_id) for t in trips])
+        last = np.array([instance.station_node(t.stations[-1]) for t in trips])
+        trip_product = np.array([t.product for t in trips])
+        trip_load = np.array([t.load for t in trips])
+        
+        back = self.dist[np.ix_(last, garage)].T                    # (V, R)
+        infeasible = trip_load[None, :] > capacity[:, None]         # (V, R)
+        remaining = np.ones(len(trips), dtype=bool)
+        
+        for _ in range(len(trips)):
+            cost = (
+                self.dist[np.ix_(end, depot)]
+                + back
+                - self.dist[end, garage][:, None]
+                + transitions[np.ix_(product, trip_product)]
+            )
+            cost[infeasible] = np.inf
+            cost[:, ~remaining] = np.inf
+            
+            v, r = np.unravel_index(np.argmin(cost), cost.shape)
+            trip = trips[r]
+            routes[v].mini_routes.append(MiniRoute(
+                product=trip.product,
+                depot_id=trip.depot_id,
+                quantity_loaded=trip.load,
+                deliveries=[Delivery(s, q) for s, q in zip(trip.stations, trip.quantities)]
+            ))
+            end[v] = last[r]
+            product[v] = trip.product
+            remaining[r] = False
+        
+        return [r for r in routes if r.mini_routes]
@@ -3,17 +3,41 @@ Solveur glouton amélioré avec gestion des stocks
 """
 
 import time
+import random
 import platform
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 from models import Instance, Solution, VehicleRoute, MiniRoute, Delivery, Station, Location, Depot
+from depot_policy import DepotPolicy, get_depot_policy
+
+
+# Taille par défaut des listes de voisins candidats
+DEFAULT_K_NEIGHBORS = 16
 
 
 class SimpleSolver:
     """Solveur glouton optimisé avec gestion des stocks"""
     
-    def __init__(self, instance: Instance, changeover_weight: float = 0.5):
+    def __init__(
+        self,
+        instance: Instance,
+        changeover_weight: float = 0.5,
+        rng: Optional[random.Random] = None,
+        k_neighbors: Optional[int] = DEFAULT_K_NEIGHBORS,
+        depot_policy: Union[str, DepotPolicy] = "ratio"
+    ):
         self.instance = instance
         self.changeover_weight = changeover_weight
+        self.depot_policy = get_depot_policy(depot_policy)
+        
+        # Listes candidates des k stations les plus proches (None = parcours complet)
+        self.candidates = None
+        if k_neighbors:
+            self.candidates = instance.nearest_stations(k_neighbors).tolist()
+        
+        # Ordre des véhicules (mélangé si un générateur est fourni, pour le multi-start)
+        self.vehicles = list(instance.vehicles)
+        if rng is not None:
+            rng.shuffle(self.vehicles)
         
         # Demandes restantes par station
         self.remaining_demand = {}
@@ -24,6 +48,26 @@ class SimpleSolver:
         self.remaining_stock = {}
         for d in instance.depots:
             self.remaining_stock[d.id] = list(d.stocks)
+        
+        # Demande restante par produit (tenue à jour à chaque livraison)
+        self.product_demand = [instance.get_total_demand(p) for p in range(instance.nb_products)]
+        
+        # Choix du dépôt: classement des dépôts par distance pour chaque nœud,
+        # stocks alignés sur instance.depots (mêmes listes que remaining_stock)
+        # et index par produit des dépôts ayant encore du stock
+        self.dist = instance.distance_matrix()
+        self.depot_nodes = [instance.depot_node(d.id) for d in instance.depots]
+        self.depot_ranking = instance.nearest_depots(len(instance.depots)).tolist()
+        self.depot_stock = [self.remaining_stock[d.id] for d in instance.depots]
+        self.max_initial_stock = [
+            max((d.stocks[p] for d in instance.depots), default=0)
+            for p in range(instance.nb_products)
+        ]
+        self.depots_with_stock = [
+            {j for j, d in enumerate(instance.depots) if d.stocks[p] > 0}
+            for p in range(instance.nb_products)
+        ]
+        self._depot_position = {d.id: j for j, d in enumerate(instance.depots)}
     
     def solve(self) -> Solution:
         """Résout l'instance"""
@@ -35,7 +79,7 @@ class SimpleSolver:
         )
         
         # Créer les routes
-        for vehicle in self.instance.vehicles:
+        for vehicle in self.vehicles:
             route = self._build_route(vehicle)
             solution.routes.append(route)
             
@@ -43,7 +87,7 @@ class SimpleSolver:
                 break
         
         # Calculer métriques
-        self._compute_metrics(solution)
+        compute_metrics(solution)
         solution.resolution_time = time.time() - start
         
         return solution
@@ -119,7 +163,8 @@ class SimpleSolver:
     def _build_mini_route(self, vehicle, product, current_pos):
         """Construit une mini-route"""
         # NOUVEAU: Choisir dépôt avec stock disponible
-        depot = self._best_depot_with_stock(current_pos, product)
+        needed = min(vehicle.capacity, self.product_demand[product])
+        depot = self._best_depot_with_stock(current_pos, product, needed)
         if not depot:
             return None
         
@@ -159,35 +204,29 @@ class SimpleSolver:
             
             # Mettre à jour demande
             self.remaining_demand[station.id][product] -= to_deliver
+            self.product_demand[product] -= to_deliver
             capacity -= to_deliver
             pos = station
         
         # NOUVEAU: Mettre à jour le stock du dépôt
         if mini_route.quantity_loaded > 0:
             self.remaining_stock[depot.id][product] -= mini_route.quantity_loaded
+            if self.remaining_stock[depot.id][product] <= 0:
+                self.depots_with_stock[product].discard(self._depot_position[depot.id])
         
         return mini_route
     
     def _has_remaining_demand(self) -> bool:
         """Y a-t-il encore de la demande?"""
-        for demands in self.remaining_demand.values():
-            if sum(demands) > 0:
-                return True
-        return False
+        return any(d > 0 for d in self.product_demand)
     
     def _has_demand_for_product(self, product: int) -> bool:
         """Y a-t-il de la demande pour ce produit?"""
-        for demands in self.remaining_demand.values():
-            if demands[product] > 0:
-                return True
-        return False
+        return self.product_demand[product] > 0
     
     def _has_stock_for_product(self, product: int) -> bool:
         """Y a-t-il du stock disponible pour ce produit?"""
-        for stocks in self.remaining_stock.values():
-            if stocks[product] > 0:
-                return True
-        return False
+        return bool(self.depots_with_stock[product])
     
     def _avg_distance_to_product(self, pos: Location, product: int) -> float:
         """Distance moyenne aux stations demandant ce produit"""
@@ -205,27 +244,21 @@ class SimpleSolver:
         
         return min(self.instance.depots, key=lambda d: pos.distance_to(d))
     
-    def _best_depot_with_stock(self, pos: Location, product: int) -> Optional[Depot]:
-        """Meilleur dépôt avec stock disponible pour le produit"""
-        candidates = [
-            d for d in self.instance.depots
-            if self.remaining_stock[d.id][product] > 0
-        ]
-        
-        if not candidates:
-            return None
-        
-        # Choisir le dépôt avec le meilleur ratio stock/distance
-        def score(depot):
-            distance = pos.distance_to(depot)
-            stock = self.remaining_stock[depot.id][product]
-            # Plus de stock et moins de distance = meilleur score
-            return distance / max(stock, 1)
-        
-        return min(candidates, key=score)
+    def _best_depot_with_stock(self, pos: Location, product: int, needed: int = 0) -> Optional[Depot]:
+        """Meilleur dépôt avec stock disponible pour le produit (selon la politique)"""
+        j = self.depot_policy.choose(self, self.instance.node_of(pos), product, needed)
+        return self.instance.depots[j] if j is not None else None
     
     def _closest_station_with_demand(self, pos: Location, product: int, visited: set):
         """Station la plus proche avec demande pour le produit"""
+        # Listes triées par distance: la première station éligible est la plus proche
+        if self.candidates is not None:
+            for idx in self.candidates[self.instance.node_of(pos)]:
+                station = self.instance.stations[idx]
+                if station.id not in visited and self.remaining_demand[station.id][product] > 0:
+                    return station
+        
+        # Repli: parcours complet
         candidates = [
             s for s in self.instance.stations
             if s.id not in visited and self.remaining_demand[s.id][product] > 0
@@ -235,42 +268,47 @@ class SimpleSolver:
             return None
         
         return min(candidates, key=lambda s: pos.distance_to(s))
+
+
+def compute_metrics(solution: Solution):
+    """Calcule les métriques (distance, coût de transition) de chaque route"""
+    instance = solution.instance
     
-    def _compute_metrics(self, solution: Solution):
-        """Calcule les métriques de la solution"""
-        for route in solution.routes:
-            if not route.mini_routes:
-                continue
-            
-            # Calculer distance et coût transition
-            garage = self.instance.get_garage(route.home_garage)
-            current_pos = garage
-            current_product = route.initial_product
-            
-            total_distance = 0.0
-            total_transition = 0.0
-            
-            for mini_route in route.mini_routes:
-                # Distance garage -> dépôt
-                depot = self.instance.get_depot(mini_route.depot_id)
-                total_distance += current_pos.distance_to(depot)
-                current_pos = depot
-                
-                # Coût transition
-                if mini_route.product != current_product:
-                    total_transition += self.instance.get_transition_cost(
-                        current_product, mini_route.product
-                    )
-                    current_product = mini_route.product
-                
-                # Distance dépôt -> stations
-                for delivery in mini_route.deliveries:
-                    station = self.instance.get_station(delivery.station_id)
-                    total_distance += current_pos.distance_to(station)
-                    current_pos = station
+    for route in solution.routes:
+        if not route.mini_routes:
+            route.total_distance = 0.0
+            route.total_transition_cost = 0.0
+            continue
+        
+        # Calculer distance et coût transition
+        garage = instance.get_garage(route.home_garage)
+        current_pos = garage
+        current_product = route.initial_product
+        
+        total_distance = 0.0
+        total_transition = 0.0
+        
+        for mini_route in route.mini_routes:
+            # Distance garage -> dépôt
+            depot = instance.get_depot(mini_route.depot_id)
+            total_distance += current_pos.distance_to(depot)
+            current_pos = depot
             
-            # Distance retour garage
-            total_distance += current_pos.distance_to(garage)
+            # Coût transition
+            if mini_route.product != current_product:
+                total_transition += instance.get_transition_cost(
+                    current_product, mini_route.product
+                )
+                current_product = mini_route.product
             
-            route.total_distance = total_distance
-            route.total_transition_cost = total_transition
+            # Distance dépôt -> stations
+            for delivery in mini_route.deliveries:
+                station = instance.get_station(delivery.station_id)
+                total_distance += current_pos.distance_to(station)
+                current_pos = station
+        
+        # Distance retour garage
+        total_distance += current_pos.distance_to(garage)
+        
+        route.total_distance = total_distance
+        route.total_transition_cost = total_transition
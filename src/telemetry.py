@@ -0,0 +1,225 @@
+"""
+Télémétrie des résolutions (flux d'événements JSONL)
+Début / fin de phases, améliorations de l'incumbent, statistiques des
+opérateurs, mémoire et durées de validation, une ligne JSON par événement.
+
+Un seul enregistreur actif par processus: sans enregistreur, emit() et les
+autres fonctions du module reviennent immédiatement (coût quasi nul).
+Les événements périodiques (opérateurs, mémoire, durées cumulées) sont
+échantillonnés: au plus un par intervalle et par type.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+DEFAULT_INTERVAL = 1.0
+
+_active: Optional['Telemetry'] = None
+
+
+class Telemetry:
+    """Enregistreur d'événements dans un fichier JSONL"""
+    
+    def __init__(self, path: Union[str, Path], interval: float = DEFAULT_INTERVAL):
+        """
+        Args:
+            path: Fichier JSONL (écrasé)
+            interval: Intervalle minimal (s) entre deux événements
+                échantillonnés du même type (0 = tous)
+        """
+        self.path = Path(path)
+        self.interval = interval
+        self._start = time.perf_counter()
+        self._last: Dict[str, float] = {}
+        self._timings: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'w')
+    
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._start
+    
+    def emit(self, event: str, **fields):
+        """Écrit un événement (horodaté depuis le début de l'enregistrement)"""
+        record = {'t': round(self.elapsed(), 4), 'event': event}
+        record.update(fields)
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line)
+                self._file.flush()
+    
+    def due(self, kind: str) -> bool:
+        """Un événement échantillonné de ce type peut-il être émis maintenant?"""
+        now = time.perf_counter()
+        last = self._last.get(kind)
+        if last is not None and now - last < self.interval:
+            return False
+        self._last[kind] = now
+        return True
+    
+    def timing(self, name: str, seconds: float):
+        """Cumule une durée (nombre, total, max); émise périodiquement"""
+        with self._lock:
+            entry = self._timings.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+        if self.due('timings'):
+            self.flush_timings()
+    
+    def flush_timings(self):
+        """Émet les durées cumulées depuis le début"""
+        with self._lock:
+            timings = {
+                name: {'count': n, 'total': round(total, 6), 'max': round(peak, 6)}
+                for name, (n, total, peak) in self._timings.items()
+            }
+        if timings:
+            self.emit('timings', timings=timings)
+    
+    def close(self):
+        self.flush_timings()
+        self.emit('end', **memory_usage())
+        with self._lock:
+            self._file.close()
+            self._file = None
+
+
+def start(path: Union[str, Path], interval: float = DEFAULT_INTERVAL, **meta) -> Telemetry:
+    """Active l'enregistrement (remplace l'enregistreur courant)"""
+    global _active
+    stop()
+    _active = Telemetry(path, interval)
+    _active.emit('start', pid=os.getpid(), argv=sys.argv, interval=interval, **meta)
+    return _active
+
+
+def stop():
+    """Termine l'enregistrement en cours, s'il y en a un"""
+    global _active
+    recorder, _active = _active, None
+    if recorder is not None:
+        recorder.close()
+
+
+@contextmanager
+def recording(path: Optional[Union[str, Path]], interval: float = DEFAULT_INTERVAL, **meta):
+    """Enregistrement le temps d'un bloc (rien si path est None)"""
+    if path is None:
+        yield None
+        return
+    recorder = start(path, interval, **meta)
+    try:
+        yield recorder
+    finally:
+        if _active is recorder:
+            stop()
+
+
+def enabled() -> bool:
+    return _active is not None
+
+
+def emit(event: str, **fields):
+    """Événement ponctuel (ignoré sans enregistreur)"""
+    if _active is not None:
+        _active.emit(event, **fields)
+
+
+def due(kind: str) -> bool:
+    """Vrai si un événement échantillonné de ce type doit être émis"""
+    return _active is not None and _active.due(kind)
+
+
+def timing(name: str, seconds: float):
+    """Durée cumulée sous un nom (ex: validation)"""
+    if _active is not None:
+        _active.timing(name, seconds)
+
+
+def memory_usage() -> Dict[str, float]:
+    """Mémoire résidente courante et pic du processus (Mo), si disponibles"""
+    usage = {}
+    try:
+        with open('/proc/self/statm') as f:
+            usage['rss_mb'] = round(int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20, 1)
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Ko sous Linux, octets sous macOS
+        usage['peak_mb'] = round(peak / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10), 1)
+    return usage
+
+
+def reset_peak_memory() -> bool:
+    """
+    Remet à zéro le pic de mémoire résidente du processus (Linux:
+    /proc/self/clear_refs), pour mesurer le pic d'une étape.
+    
+    Returns:
+        bool: False si le système ne le permet pas (le pic reste celui du processus)
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_memory_mb() -> Optional[float]:
+    """Pic de mémoire résidente (Mo) depuis le dernier reset_peak_memory(), sinon depuis le démarrage"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 2 ** 10, 1)
+    except (OSError, ValueError, IndexError):
+        pass
+    return memory_usage().get('peak_mb')
+
+
+def sample_memory(**fields):
+    """Instantané mémoire échantillonné"""
+    if _active is not None and _active.due('memory'):
+        _active.emit('memory', **memory_usage(), **fields)
+
+
+def phase(name: str, **fields):
+    """
+    Contexte qui émet phase_start / phase_end (durée, mémoire, statut).
+    
+    Sans enregistreur, retourne un contexte vide.
+    """
+    if _active is None:
+        return nullcontext()
+    return _phase(_active, name, fields)
+
+
+@contextmanager
+def _phase(recorder: Telemetry, name: str, fields: dict):
+    recorder.emit('phase_start', phase=name, **fields)
+    start = time.perf_counter()
+    status = 'ok'
+    try:
+        yield
+    except BaseException as e:
+        status = type(e).__name__
+        raise
+    finally:
+        recorder.emit('phase_end', phase=name, duration=round(time.perf_counter() - start, 6),
+                      status=status, **memory_usage(), **fields)
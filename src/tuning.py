@@ -0,0 +1,404 @@
+"""
+Réglage des paramètres du solveur par course (racing, type F-Race)
+Des configurations tirées dans l'espace des paramètres sont évaluées
+instance par instance; dès que le test de Friedman détecte une différence,
+les configurations significativement moins bonnes que la meilleure (test de
+Wilcoxon apparié, correction de Holm) sont éliminées. Les évaluations
+tournent dans un pool de processus, sous un budget total de temps CPU.
+"""
+
+import math
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from models import Instance, Solution
+from parser import parse_instance
+from solver_simple import SimpleSolver
+from solver_savings import SavingsSolver
+from solver_products import ProductDecompositionSolver
+from depot_policy import DEPOT_POLICIES
+from alns import ALNS, ALNSParams
+from validator import validate_solution
+from solver_config import DEFAULTS
+
+
+# Espace de recherche: ('float', min, max) ou ('choice', valeurs)
+PARAMETER_SPACE: Dict[str, tuple] = {
+    'changeover_weight': ('float', 0.0, 2.0),
+    'constructor': ('choice', ['greedy', 'savings', 'products']),
+    'depot_policy': ('choice', sorted(DEPOT_POLICIES)),
+    'k_neighbors': ('choice', [0, 8, 16, 32]),
+}
+
+
+def sample_configurations(n: int, rng: random.Random, include_default: bool = True,
+                          iterations: int = 0) -> List[Dict[str, Any]]:
+    """n configurations distinctes (la configuration par défaut en premier)"""
+    configurations = [dict(DEFAULTS)] if include_default else []
+    seen = {tuple(sorted(c.items())) for c in configurations}
+    attempts = 0
+    while len(configurations) < n and attempts < 100 * n:
+        attempts += 1
+        config = {}
+        for name, spec in PARAMETER_SPACE.items():
+            if spec[0] == 'float':
+                config[name] = round(rng.uniform(spec[1], spec[2]), 2)
+            else:
+                config[name] = rng.choice(spec[1])
+        config = canonical(config, iterations)
+        key = tuple(sorted(config.items()))
+        if key not in seen:
+            seen.add(key)
+            configurations.append(config)
+    return configurations
+
+
+def canonical(config: Dict[str, Any], iterations: int = 0) -> Dict[str, Any]:
+    """
+    Paramètres sans effet remis à leur valeur par défaut (Clarke-Wright et
+    décomposition par produit n'utilisent ni le poids changeover ni la
+    politique de dépôt, ni les voisins sans ALNS), pour ne pas faire courir
+    des doublons.
+    """
+    config = dict(config)
+    if config.get('constructor') in ('savings', 'products'):
+        config['changeover_weight'] = DEFAULTS['changeover_weight']
+        config['depot_policy'] = DEFAULTS['depot_policy']
+        if not iterations:
+            config['k_neighbors'] = DEFAULTS['k_neighbors']
+    return config
+
+
+def build_solution(instance: Instance, config: Dict[str, Any], iterations: int = 0,
+                   seed: Optional[int] = None) -> Solution:
+    """Construction (et ALNS optionnel) selon une configuration, comme main.py"""
+    constructor = config.get('constructor', DEFAULTS['constructor'])
+    k_neighbors = config.get('k_neighbors', DEFAULTS['k_neighbors'])
+    if constructor == "savings":
+        builder = SavingsSolver(instance)
+    elif constructor == "products":
+        builder = ProductDecompositionSolver(instance)
+    else:
+        builder = SimpleSolver(
+            instance,
+            config.get('changeover_weight', DEFAULTS['changeover_weight']),
+            k_neighbors=k_neighbors or None,
+            depot_policy=config.get('depot_policy', DEFAULTS['depot_policy'])
+        )
+    solution = builder.solve()
+    if iterations:
+        engine = ALNS(instance, ALNSParams(iterations=iterations, seed=seed, neighbours=k_neighbors or None))
+        solution = engine.run(solution)
+    return solution
+
+
+# Instances parsées gardées par le worker (chaque instance sert à plusieurs configurations)
+_instances: Dict[str, Instance] = {}
+
+
+def _evaluate(config: Dict[str, Any], instance_path: str, iterations: int,
+              seed: Optional[int]) -> Tuple[float, float]:
+    """Tâche worker: (coût, temps CPU) d'une configuration sur une instance"""
+    cpu_start = time.process_time()
+    instance = _instances.get(instance_path)
+    if instance is None:
+        instance = _instances[instance_path] = parse_instance(instance_path)
+    solution = build_solution(instance, config, iterations, seed)
+    is_valid, _ = validate_solution(solution)
+    cost = solution.total_cost() if is_valid else math.inf
+    return cost, time.process_time() - cpu_start
+
+
+class Evaluator:
+    """Pool de processus des évaluations (séquentiel si workers <= 1 ou pool indisponible)"""
+    
+    def __init__(self, workers: int = 1, mp_context: str = "spawn"):
+        self.workers = workers
+        self.mp_context = mp_context
+        self._pool: Optional[ProcessPoolExecutor] = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.shutdown()
+    
+    def map(self, tasks: Sequence[tuple]) -> List[Tuple[float, float]]:
+        """Évalue les tâches (arguments de _evaluate), résultats dans l'ordre"""
+        if self.workers <= 1:
+            return [_evaluate(*task) for task in tasks]
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(self.mp_context)
+            )
+        try:
+            futures = [self._pool.submit(_evaluate, *task) for task in tasks]
+            return [f.result() for f in futures]
+        except BrokenProcessPool as e:
+            print(f"\n⚠️  Workers indisponibles ({e}), évaluations séquentielles")
+            self.shutdown()
+            self.workers = 1
+            return [_evaluate(*task) for task in tasks]
+    
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+# ----------------------------------------------------------------------
+# Tests statistiques (sans dépendance: chi², loi normale)
+# ----------------------------------------------------------------------
+
+def _upper_gamma_regularized(a: float, x: float) -> float:
+    """Q(a, x) = Γ(a, x) / Γ(a): série si x < a + 1, fraction continue sinon"""
+    if x <= 0:
+        return 1.0
+    log_prefix = -x + a * math.log(x) - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1.0 / a
+        n = a
+        for _ in range(500):
+            n += 1
+            term *= x / n
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1.0 - total * math.exp(log_prefix))
+    # Lentz
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 500):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return math.exp(log_prefix) * h
+
+
+def chi2_sf(x: float, dof: int) -> float:
+    """P(X >= x) pour X ~ chi²(dof)"""
+    return _upper_gamma_regularized(dof / 2, x / 2)
+
+
+def _ranks(values: Sequence[float]) -> List[float]:
+    """Rangs (1 = plus petit), rang moyen pour les ex aequo"""
+    order = sorted(range(len(values)), key=lambda i: values[i])
+    ranks = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2 + 1
+        i = j + 1
+    return ranks
+
+
+def friedman_test(blocks: Sequence[Sequence[float]]) -> Tuple[float, List[float]]:
+    """
+    Test de Friedman (blocs = instances, traitements = configurations).
+    
+    Returns:
+        (p-valeur, somme des rangs par configuration)
+    """
+    n, k = len(blocks), len(blocks[0])
+    rank_sums = [0.0] * k
+    for block in blocks:
+        for j, r in enumerate(_ranks(block)):
+            rank_sums[j] += r
+    if k < 2 or n < 2:
+        return 1.0, rank_sums
+    statistic = 12.0 / (n * k * (k + 1)) * sum(r * r for r in rank_sums) - 3.0 * n * (k + 1)
+    # Correction des ex aequo
+    ties = 0.0
+    for block in blocks:
+        counts: Dict[float, int] = {}
+        for v in block:
+            counts[v] = counts.get(v, 0) + 1
+        ties += sum(t ** 3 - t for t in counts.values())
+    denominator = 1.0 - ties / (n * (k ** 3 - k))
+    if denominator <= 0:
+        return 1.0, rank_sums
+    return chi2_sf(statistic / denominator, k - 1), rank_sums
+
+
+def wilcoxon_greater(differences: Sequence[float]) -> float:
+    """
+    p-valeur unilatérale (approximation normale) du test des rangs signés:
+    les différences sont-elles positives (configuration moins bonne)?
+    """
+    d = [x for x in differences if x != 0]
+    n = len(d)
+    if n == 0:
+        return 1.0
+    ranks = _ranks([abs(x) for x in d])
+    w_plus = sum(r for r, x in zip(ranks, d) if x > 0)
+    mean = n * (n + 1) / 4
+    sd = math.sqrt(n * (n + 1) * (2 * n + 1) / 24)
+    z = (w_plus - mean - 0.5) / sd
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+# ----------------------------------------------------------------------
+# Course
+# ----------------------------------------------------------------------
+
+@dataclass
+class RaceResult:
+    """Issue d'une course sur une classe d'instances"""
+    best: Dict[str, Any]
+    survivors: List[Dict[str, Any]]
+    instances_used: int
+    evaluations: int
+    cpu_time: float
+    wall_time: float
+    mean_costs: Dict[int, float] = field(default_factory=dict)
+    eliminated: List[Tuple[int, int]] = field(default_factory=list)
+    default_gain: Optional[float] = None
+
+
+class Race:
+    """Course entre configurations sur une suite d'instances"""
+    
+    def __init__(
+        self,
+        configurations: List[Dict[str, Any]],
+        instances: Sequence[Path],
+        evaluator: Evaluator,
+        cpu_budget: float,
+        first_test: int = 5,
+        alpha: float = 0.05,
+        iterations: int = 0,
+        seed: Optional[int] = None,
+        verbose: bool = True
+    ):
+        """
+        Args:
+            configurations: Configurations candidates (la première sert de
+                référence pour le gain rapporté, en général la configuration par défaut)
+            instances: Instances, dans l'ordre d'évaluation
+            evaluator: Pool d'évaluation
+            cpu_budget: Temps CPU total (s, somme sur les workers) de la course
+            first_test: Nombre d'instances avant le premier test
+            alpha: Seuil des tests
+            iterations: Itérations ALNS après la construction (0 = construction seule)
+        """
+        self.configurations = configurations
+        self.instances = list(instances)
+        self.evaluator = evaluator
+        self.cpu_budget = cpu_budget
+        self.first_test = first_test
+        self.alpha = alpha
+        self.iterations = iterations
+        self.seed = seed
+        self.verbose = verbose
+    
+    def run(self) -> RaceResult:
+        start = time.perf_counter()
+        alive = list(range(len(self.configurations)))
+        costs: Dict[int, List[float]] = {c: [] for c in alive}
+        eliminated: List[Tuple[int, int]] = []
+        cpu_used = 0.0
+        evaluations = 0
+        blocks = 0
+        
+        for b, instance_path in enumerate(self.instances):
+            # Budget: un bloc n'est lancé que si son coût estimé tient dans le reste
+            if evaluations:
+                estimate = cpu_used / evaluations * len(alive)
+                if cpu_used + estimate > self.cpu_budget:
+                    break
+            seed = None if self.seed is None else self.seed + b
+            tasks = [(self.configurations[c], str(instance_path), self.iterations, seed) for c in alive]
+            for c, (cost, cpu) in zip(alive, self.evaluator.map(tasks)):
+                costs[c].append(cost)
+                cpu_used += cpu
+            evaluations += len(tasks)
+            blocks += 1
+            
+            if blocks >= self.first_test and len(alive) > 1:
+                removed = self._eliminate(alive, costs, blocks)
+                if removed:
+                    eliminated.extend((c, blocks) for c in removed)
+                    alive = [c for c in alive if c not in removed]
+                    if self.verbose:
+                        print(f"   [{blocks:>3}] {len(removed)} configuration(s) éliminée(s), "
+                              f"{len(alive)} en course (CPU {cpu_used:.1f}s)")
+            if len(alive) == 1:
+                break
+        
+        # Meilleure survivante: coût relatif moyen sur les blocs communs
+        recent = {c: costs[c][-blocks:] for c in alive}
+        best = min(alive, key=lambda c: _mean_relative(recent[c], [recent[a] for a in alive]))
+        default_gain = None
+        if 0 in costs and best != 0:
+            common = min(len(costs[0]), len(costs[best]))
+            if common:
+                reference = sum(costs[0][:common])
+                default_gain = 1.0 - sum(costs[best][:common]) / reference if reference else None
+        
+        return RaceResult(
+            best=self.configurations[best],
+            survivors=[self.configurations[c] for c in alive],
+            instances_used=blocks,
+            evaluations=evaluations,
+            cpu_time=cpu_used,
+            wall_time=time.perf_counter() - start,
+            mean_costs={c: sum(v) / len(v) for c, v in costs.items() if v},
+            eliminated=eliminated,
+            default_gain=default_gain
+        )
+    
+    def _eliminate(self, alive: List[int], costs: Dict[int, List[float]], blocks: int) -> List[int]:
+        """Configurations à éliminer après le bloc courant"""
+        # Les configurations en course ont toutes été évaluées sur les `blocks` dernières instances
+        matrix = [[costs[c][len(costs[c]) - blocks + i] for c in alive] for i in range(blocks)]
+        p_value, rank_sums = friedman_test(matrix)
+        if p_value >= self.alpha:
+            return []
+        
+        best_j = min(range(len(alive)), key=lambda j: rank_sums[j])
+        # Différences relatives à la meilleure, par instance
+        p_values = []
+        for j, c in enumerate(alive):
+            if j == best_j:
+                continue
+            diffs = [(row[j] - row[best_j]) / max(abs(row[best_j]), 1e-9) for row in matrix]
+            p_values.append((wilcoxon_greater(diffs), c))
+        
+        # Holm: p-valeurs croissantes, seuils alpha / (m - i)
+        removed = []
+        m = len(p_values)
+        for i, (p, c) in enumerate(sorted(p_values)):
+            if p >= self.alpha / (m - i):
+                break
+            removed.append(c)
+        return removed
+
+
+def _mean_relative(values: List[float], all_values: List[List[float]]) -> float:
+    """Coût moyen relatif au meilleur coût de chaque instance"""
+    total = 0.0
+    for i, v in enumerate(values):
+        best = min(other[i] for other in all_values)
+        total += v / best if best > 0 else 1.0
+    return total / max(len(values), 1)
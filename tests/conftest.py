@@ -0,0 +1,33 @@
+"""
+Configuration commune des tests: src dans le path et instances fournies
+(archives instances/<catégorie>/*.zip lues sans extraction)
+"""
+
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from parser import parse_instance_text
+
+
+def load_bundled(category: str, limit: int = None):
+    """Instances d'une catégorie (small, medium, high), dans l'ordre des noms"""
+    archive = next((ROOT / "instances" / category).glob("*.zip"))
+    with zipfile.ZipFile(archive) as z:
+        names = sorted(n for n in z.namelist() if n.endswith(".dat"))[:limit]
+        return [parse_instance_text(z.read(n).decode(), Path(n).name) for n in names]
+
+
+@pytest.fixture(scope="session")
+def small_instances():
+    return load_bundled("small", 10)
+
+
+@pytest.fixture(scope="session")
+def medium_instances():
+    return load_bundled("medium", 3)
@@ -0,0 +1,60 @@
+"""
+batch_eval doit rester identique (au bit près) aux coûts de Solution
+"""
+
+import random
+
+import numpy as np
+
+from batch_eval import encode_solutions, evaluate_batch, evaluate_solutions
+from solver_simple import SimpleSolver
+from solver_savings import SavingsSolver
+from solver_products import ProductDecompositionSolver
+
+
+def _solutions(instance, restarts=3):
+    rng = random.Random(0)
+    solutions = [SimpleSolver(instance).solve(), SavingsSolver(instance).solve(),
+                 ProductDecompositionSolver(instance).solve()]
+    solutions += [SimpleSolver(instance, rng.uniform(0.0, 1.0), rng=rng).solve() for _ in range(restarts)]
+    return solutions
+
+
+def _assert_exact(solutions, costs):
+    for i, solution in enumerate(solutions):
+        assert costs.distance[i] == solution.total_distance()
+        assert costs.transition_cost[i] == solution.total_transition_cost()
+        assert costs.total_cost[i] == solution.total_cost()
+        assert costs.transitions[i] == solution.total_transitions()
+        assert costs.vehicles_used[i] == solution.nb_vehicles_used()
+
+
+def test_matches_solution_costs_small(small_instances):
+    for instance in small_instances:
+        solutions = _solutions(instance)
+        _assert_exact(solutions, evaluate_solutions(solutions))
+
+
+def test_matches_solution_costs_medium(medium_instances):
+    for instance in medium_instances:
+        solutions = _solutions(instance, restarts=1)
+        _assert_exact(solutions, evaluate_solutions(solutions))
+
+
+def test_route_details_and_padding(small_instances):
+    instance = small_instances[0]
+    solutions = _solutions(instance)
+    # Solution sans route: entièrement complétée, coût nul
+    empty = solutions[0].copy()
+    empty.routes = []
+    batch = encode_solutions(instance, solutions + [empty])
+    costs = evaluate_batch(instance, batch)
+    
+    assert costs.total_cost[-1] == 0.0
+    assert costs.transitions[-1] == 0
+    for i, solution in enumerate(solutions):
+        routes = solution.routes
+        np.testing.assert_array_equal(costs.route_distance[i, :len(routes)],
+                                      [r.total_distance for r in routes])
+        np.testing.assert_array_equal(costs.route_transition_cost[i, :len(routes)],
+                                      [r.total_transition_cost for r in routes])
@@ -0,0 +1,115 @@
+"""
+Réoptimisation incrémentale: solutions valides et stocks respectés après
+baisse / hausse de demande et baisse de stock
+"""
+
+from collections import defaultdict
+
+import pytest
+
+from incremental import IncrementalReoptimizer, reoptimize
+from solver_simple import SimpleSolver
+from validator import validate_solution
+
+
+def _check(solution):
+    """Solution valide pour sa (nouvelle) instance, stocks des dépôts respectés"""
+    is_valid, errors = validate_solution(solution)
+    assert is_valid, errors[:3]
+    
+    # Le validateur ne vérifie pas les stocks
+    used = defaultdict(int)
+    for route in solution.routes:
+        for mr in route.mini_routes:
+            used[mr.depot_id, mr.product] += mr.quantity_loaded
+    for depot in solution.instance.depots:
+        for p, stock in enumerate(depot.stocks):
+            assert used[depot.id, p] <= stock, f"dépôt {depot.id}, produit {p}: {used[depot.id, p]} > {stock}"
+
+
+def _served(instance, product):
+    return [s for s in instance.stations if s.demands[product] > 0]
+
+
+def _spy(monkeypatch, name):
+    """Compte les appels d'une méthode de IncrementalReoptimizer (sans en changer le comportement)"""
+    calls = []
+    original = getattr(IncrementalReoptimizer, name)
+    
+    def wrapper(self, *args):
+        result = original(self, *args)
+        calls.append(result)
+        return result
+    
+    monkeypatch.setattr(IncrementalReoptimizer, name, wrapper)
+    return calls
+
+
+def test_demand_decrease(small_instances):
+    for instance in small_instances:
+        solution = SimpleSolver(instance).solve()
+        station = _served(instance, 0)[0]
+        delta = [0] * instance.nb_products
+        delta[0] = -(station.demands[0] // 2 or station.demands[0])
+        
+        new = reoptimize(solution, demand_deltas={station.id: delta}, seed=0)
+        
+        _check(new)
+        assert new.instance.get_station(station.id).demands[0] == station.demands[0] + delta[0]
+
+
+def test_demand_increase(small_instances):
+    for instance in small_instances:
+        solution = SimpleSolver(instance).solve()
+        product = max(range(instance.nb_products),
+                      key=lambda p: instance.get_total_stock(p) - instance.get_total_demand(p))
+        slack = instance.get_total_stock(product) - instance.get_total_demand(product)
+        if slack <= 0:
+            continue
+        station = _served(instance, product)[-1]
+        delta = [0] * instance.nb_products
+        delta[product] = min(slack, max(v.capacity for v in instance.vehicles) + 1)
+        
+        new = reoptimize(solution, demand_deltas={station.id: delta}, seed=0)
+        
+        _check(new)
+        assert new.instance.get_station(station.id).demands[product] == station.demands[product] + delta[product]
+
+
+def test_stock_cut_evicts_and_splits(medium_instances, monkeypatch):
+    """Stock coupé au maximum possible: livraisons évincées, réinsertion par parts"""
+    evicted = _spy(monkeypatch, '_evict')
+    splitting = _spy(monkeypatch, '_insert_splitting')
+    instance = medium_instances[0]
+    solution = SimpleSolver(instance).solve()
+    
+    for depot in instance.depots:
+        for p in range(instance.nb_products):
+            slack = instance.get_total_stock(p) - instance.get_total_demand(p)
+            cut = min(depot.stocks[p], slack)
+            if cut <= 0:
+                continue
+            delta = [0] * instance.nb_products
+            delta[p] = -cut
+            evicted.clear()
+            splitting.clear()
+            
+            new = reoptimize(solution, stock_deltas={depot.id: delta}, seed=0)
+            
+            _check(new)
+            if splitting:
+                assert any(evicted), "réinsertion par parts sans éviction"
+                assert splitting == [True]
+                return
+    pytest.fail("aucune baisse de stock n'a nécessité la réinsertion par parts")
+
+
+def test_impossible_change_raises(small_instances):
+    instance = small_instances[0]
+    solution = SimpleSolver(instance).solve()
+    station = _served(instance, 0)[0]
+    delta = [0] * instance.nb_products
+    delta[0] = instance.get_total_stock(0) - instance.get_total_demand(0) + 1
+    
+    with pytest.raises(ValueError):
+        reoptimize(solution, demand_deltas={station.id: delta}, seed=0)